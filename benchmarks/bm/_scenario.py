@@ -38,7 +38,11 @@ def _register(scenario_cls):
     }
     scenario = scenario_cls(**config_dict)
 
-    runner.bench_time_func(scenario.scenario_name, scenario._pyperf)
+    metadata = scenario.metadata()
+    if metadata:
+        runner.bench_time_func(scenario.scenario_name, scenario._pyperf, metadata=metadata)
+    else:
+        runner.bench_time_func(scenario.scenario_name, scenario._pyperf)
 
 
 class ScenarioMeta(abc.ABCMeta):
@@ -63,6 +67,10 @@ class Scenario(six.with_metaclass(ScenarioMeta)):
     def scenario_name(self):
         return "{}-{}".format(self.__class__.__name__.lower(), self.name)
 
+    def metadata(self):
+        """Returns extra metadata to store along with the benchmark results, e.g. payload sizes."""
+        return {}
+
     @abc.abstractmethod
     def run(self):
         """Returns a context manager that yields a function to be run for performance testing."""
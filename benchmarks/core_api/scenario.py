@@ -0,0 +1,45 @@
+import bm
+
+from ddtrace.internal import core
+
+
+class CoreAPI(bm.Scenario):
+    listeners = bm.var(type=int)
+    api = bm.var(type=str)
+    nevents = bm.var(type=int)
+    context_depth = bm.var(type=int)
+
+    def run(self):
+        event_name = "my.cool.event"
+        core.reset_listeners()
+        for _ in range(self.listeners):
+            # Each listener has to be a different function to be registered
+            core.on(event_name, lambda arg1, arg2: None)
+
+        if self.api == "get_item":
+            # Nest the contexts, the data is set on the outermost one.
+            # DEV: Keep references to the context managers, the contexts end when they are collected
+            managers = [core.context_with_data("context.0", data_key="value")]
+            managers[0].__enter__()
+            for depth in range(1, self.context_depth):
+                managers.append(core.context_with_data("context.%d" % depth))
+                managers[-1].__enter__()
+
+        def _(loops):
+            for _ in range(loops):
+                if self.api == "get_item":
+                    for _ in range(self.nevents):
+                        core.get_item("data_key")
+                        core.get_item("missing_key")
+                elif self.api == "dispatch":
+                    for _ in range(self.nevents):
+                        core.dispatch(event_name, [1, 2])
+                elif self.api == "notify":
+                    for _ in range(self.nevents):
+                        core.notify(event_name, 1, 2)
+                else:
+                    for _ in range(self.nevents):
+                        if core.has_listeners(event_name):
+                            core.notify(event_name, 1, 2)
+
+        yield _
@@ -1,3 +1,6 @@
+import threading
+import tracemalloc
+
 import bm
 import utils
 
@@ -10,15 +13,94 @@ class Encoder(bm.Scenario):
     nmetrics = bm.var(type=int)
     dd_origin = bm.var_bool()
     encoding = bm.var(type=str)
+    nbuffers = bm.var(type=int)
+    concurrent_flush = bm.var_bool()
+    compression = bm.var(type=str)
+    unicode_tags = bm.var_bool()
+    trace_id_128bit = bm.var_bool()
+    nlinks = bm.var(type=int)
 
-    def run(self):
+    def metadata(self):
+        """Report the size of the payloads and the peak memory used to encode them.
+
+        Along with the time of a loop, which encodes ``ntraces * nspans`` spans,
+        this gives the throughput of the encoder and what it costs in memory and
+        bytes on the wire.
+        """
+        compress = utils.init_compressor(self.compression)
         encoder = utils.init_encoder(self.encoding)
         traces = utils.gen_traces(self)
+        payload_bytes = wire_bytes = peak_memory_bytes = 0
+        for trace in traces:
+            # DEV: Only trace the allocations of the encoder, not those of the
+            # payloads kept from the previous traces or of the compression.
+            tracemalloc.start()
+            try:
+                encoder.put(trace)
+                payload = encoder.encode()
+                peak_memory_bytes = max(peak_memory_bytes, tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+            payload_bytes += len(payload)
+            if compress is not None:
+                wire_bytes += len(compress(payload))
+
+        metadata = {
+            "spans": sum(len(trace) for trace in traces),
+            "payload_bytes": payload_bytes,
+            "peak_memory_bytes": peak_memory_bytes,
+        }
+        if compress is not None:
+            # Report the bytes on the wire along with the CPU cost of compressing them
+            metadata["wire_bytes"] = wire_bytes
+        return metadata
+
+    def run(self):
+        encoder = utils.init_encoder(self.encoding, nbuffers=self.nbuffers)
+        compress = utils.init_compressor(self.compression)
+        traces = utils.gen_traces(self)
+
+        if not self.concurrent_flush:
+            if compress is not None:
+
+                def _(loops):
+                    for _ in range(loops):
+                        for trace in traces:
+                            encoder.put(trace)
+                            compress(encoder.encode())
+
+            else:
+
+                def _(loops):
+                    for _ in range(loops):
+                        for trace in traces:
+                            encoder.put(trace)
+                            encoder.encode()
+
+            yield _
+            return
+
+        # Measure the latency of put while another thread keeps flushing the
+        # encoder, as the periodic thread of the writer would do.
+        done = threading.Event()
+
+        def flush():
+            while not done.is_set():
+                encoder.encode()
+
+        flusher = threading.Thread(target=flush)
+        flusher.daemon = True
+        flusher.start()
 
         def _(loops):
             for _ in range(loops):
                 for trace in traces:
-                    encoder.put(trace)
-                    encoder.encode()
+                    try:
+                        encoder.put(trace)
+                    except utils.BufferFull:
+                        pass
 
         yield _
+
+        done.set()
+        flusher.join()
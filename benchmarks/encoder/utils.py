@@ -1,6 +1,7 @@
 from functools import partial
 import random
 import string
+import zlib
 
 from ddtrace import Span
 from ddtrace import __version__ as ddtrace_version
@@ -13,27 +14,67 @@ _Span = Span
 if ddtrace_version.split(".")[0] == "0":
     _Span = partial(_Span, None)
 
+try:
+    from ddtrace.internal._encoding import BufferFull
+except ImportError:
+
+    class BufferFull(Exception):
+        pass
+
+
+try:
+    from ddtrace.internal._encoding import MultiBufferedEncoder
+except ImportError:
+    # Versions without multi-buffered encoders fall back to a single buffer
+    MultiBufferedEncoder = None
+
+
 try:
     # the introduction of the buffered encoder changed the internal api
     # see https://github.com/DataDog/dd-trace-py/pull/2422
     from ddtrace.internal._encoding import BufferedEncoder  # noqa: F401
 
-    def init_encoder(encoding, max_size=8 << 20, max_item_size=8 << 20):
+    def init_encoder(encoding, max_size=8 << 20, max_item_size=8 << 20, nbuffers=1):
+        if nbuffers > 1 and MultiBufferedEncoder is not None:
+            return MultiBufferedEncoder(MSGPACK_ENCODERS[encoding], max_size, max_item_size, nbuffers)
         return MSGPACK_ENCODERS[encoding](max_size, max_item_size)
 
 
 except ImportError:
 
-    def init_encoder(encoding):
+    def init_encoder(encoding, nbuffers=1):
         return MSGPACK_ENCODERS[encoding]()
 
 
+try:
+    from ddtrace.internal.writer.writer_client import COMPRESSORS
+except ImportError:
+    # Versions without payload compression compress with the same settings
+    def _gzip(payload, level=1):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress(payload) + compressor.flush()
+
+    COMPRESSORS = {"gzip": _gzip}
+
+
+def init_compressor(compression):
+    if compression in (None, "none"):
+        return None
+    return COMPRESSORS[compression]
+
+
+# Latin-1, CJK and emoji characters, encoded with 2, 3 and 4 bytes in UTF-8
+_UNICODE_CHARS = (
+    string.ascii_letters + "\u00e9\u00e8\u00fc\u00df\u00f8\u65e5\u672c\u8a9e\ud55c\uad6d\U0001f600\U0001f680"
+)
+
+
 def _rands(size=6, chars=string.ascii_uppercase + string.digits):
     return "".join(random.choice(chars) for _ in range(size))
 
 
-def _random_values(k, size):
-    return list(dict.fromkeys([_rands(size=size) for _ in range(k)]))
+def _random_values(k, size, chars=string.ascii_uppercase + string.digits):
+    return list(dict.fromkeys([_rands(size=size, chars=chars) for _ in range(k)]))
 
 
 def gen_traces(config):
@@ -45,26 +86,31 @@ def gen_traces(config):
     span_names = _random_values(256, 16)
     resources = _random_values(256, 16)
     services = _random_values(16, 16)
-    tag_keys = _random_values(config.ntags, 16)
+    tag_chars = _UNICODE_CHARS if config.unicode_tags else string.ascii_uppercase + string.digits
+    tag_keys = _random_values(config.ntags, 16, chars=tag_chars)
     metric_keys = _random_values(config.nmetrics, 16)
     dd_origin_values = ["synthetics", "ciapp-test"]
 
     for _ in range(config.ntraces):
         trace = []
+        # DEV: Without a trace id, every span generates its own 64-bit one
+        trace_id = random.getrandbits(128) if config.trace_id_128bit else None
         for i in range(0, config.nspans):
             # first span is root so has no parent otherwise parent is root span
             parent_id = trace[0].span_id if i > 0 else None
             span_name = random.choice(span_names)
             resource = random.choice(resources)
             service = random.choice(services)
-            with _Span(span_name, resource=resource, service=service, parent_id=parent_id) as span:
+            with _Span(span_name, resource=resource, service=service, trace_id=trace_id, parent_id=parent_id) as span:
                 if i == 0 and config.dd_origin:
                     # Since we're not using the tracer API, a span's context isn't automatically propagated
                     # to its children. The encoder only checks the root span's context in a trace for dd_origin, so
                     # here we need to add dd_origin to the root span's context.
                     span.context.dd_origin = random.choice(dd_origin_values)
                 if config.ntags > 0:
-                    span.set_tags(dict(zip(tag_keys, [_rands(size=config.ltags) for _ in range(config.ntags)])))
+                    span.set_tags(
+                        dict(zip(tag_keys, [_rands(size=config.ltags, chars=tag_chars) for _ in range(config.ntags)]))
+                    )
                 if config.nmetrics > 0:
                     span.set_metrics(
                         dict(
@@ -74,6 +120,16 @@ def gen_traces(config):
                             )
                         )
                     )
+                # DEV: Span links are only supported by recent versions
+                if config.nlinks > 0 and hasattr(span, "_set_span_link"):
+                    for _ in range(config.nlinks):
+                        span._set_span_link(
+                            trace_id=random.getrandbits(128),
+                            span_id=random.getrandbits(64),
+                            tracestate="dd=s:1;o:rum",
+                            traceflags=1,
+                            attributes={"link.name": random.choice(span_names)},
+                        )
                 trace.append(span)
         traces.append(trace)
     return traces
@@ -10,6 +10,7 @@ class HTTPPropagationExtract(bm.Scenario):
     headers = bm.var(type=str)
     extra_headers = bm.var(type=int)
     wsgi_style = bm.var(type=bool)
+    asgi_style = bm.var(type=bool)
 
     def generate_headers(self):
         headers = json.loads(self.headers)
@@ -22,6 +23,8 @@ class HTTPPropagationExtract(bm.Scenario):
                 header = utils.get_wsgi_header(header)
             headers[header] = str(i)
 
+        if self.asgi_style:
+            return [(header.encode("latin-1"), value.encode("latin-1")) for header, value in headers.items()]
         return headers
 
     def run(self):
@@ -10,6 +10,8 @@ class HTTPPropagationInject(bm.Scenario):
     sampling_priority = bm.var(type=str)
     dd_origin = bm.var(type=str)
     meta = bm.var(type=str)
+    styles = bm.var(type=str)
+    new_context = bm.var(type=bool)
 
     def run(self):
         sampling_priority = None
@@ -21,17 +23,23 @@ class HTTPPropagationInject(bm.Scenario):
         if self.meta:
             meta = json.loads(self.meta)
 
-        ctx = Context(
-            trace_id=8336172473188639332,
-            span_id=6804240797025004118,
-            sampling_priority=sampling_priority,
-            dd_origin=dd_origin,
-            meta=meta,
-        )
+        if self.styles:
+            http.config._propagation_style_inject = self.styles.split(",")
+
+        def new_context():
+            return Context(
+                trace_id=8336172473188639332,
+                span_id=6804240797025004118,
+                sampling_priority=sampling_priority,
+                dd_origin=dd_origin,
+                meta=dict(meta) if meta else None,
+            )
+
+        ctx = new_context()
 
         def _(loops):
             for _ in range(loops):
                 # Just pass in a new/empty dict, we don't care about the result
-                http.HTTPPropagator.inject(ctx, {})
+                http.HTTPPropagator.inject(new_context() if self.new_context else ctx, {})
 
         yield _
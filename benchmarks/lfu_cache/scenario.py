@@ -0,0 +1,34 @@
+import random
+
+import bm
+
+from ddtrace.internal.utils.cache import LFUCache
+
+
+class LFUCacheGet(bm.Scenario):
+    maxsize = bm.var(type=int)
+    nkeys = bm.var(type=int)
+    skew = bm.var(type=float)
+    ngets = bm.var(type=int)
+
+    def run(self):
+        # Draw the keys from a Pareto distribution so that a few keys are much
+        # hotter than the others, like resource names in a real application.
+        # A skew of 0 draws them uniformly.
+        rng = random.Random(0)
+        if self.skew > 0:
+            keys = [int(rng.paretovariate(self.skew)) % self.nkeys for _ in range(self.ngets)]
+        else:
+            keys = [rng.randrange(self.nkeys) for _ in range(self.ngets)]
+
+        def f(key):
+            return key
+
+        def _(loops):
+            for _ in range(loops):
+                cache = LFUCache(self.maxsize)
+                get = cache.get
+                for key in keys:
+                    get(key, f)
+
+        yield _
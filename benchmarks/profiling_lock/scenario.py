@@ -0,0 +1,33 @@
+import threading
+
+import bm
+
+from ddtrace.profiling import recorder
+from ddtrace.profiling.collector import threading as collector_threading
+
+
+class ProfilingLock(bm.Scenario):
+    profiled = bm.var_bool()
+    capture_pct = bm.var(type=float)
+    nops = bm.var(type=int)
+
+    def run(self):
+        if self.profiled:
+            collector = collector_threading.ThreadingLockCollector(recorder.Recorder(), capture_pct=self.capture_pct)
+            collector.start()
+        else:
+            collector = None
+
+        lock = threading.Lock()
+        nops = self.nops
+
+        def _(loops):
+            for _ in range(loops):
+                for _ in range(nops):
+                    lock.acquire()
+                    lock.release()
+
+        yield _
+
+        if collector is not None:
+            collector.stop()
@@ -0,0 +1,43 @@
+import threading
+
+import bm
+
+from ddtrace.profiling import recorder
+from ddtrace.profiling.collector import stack
+
+
+def _deep_stack(depth, ready, done):
+    if depth > 1:
+        return _deep_stack(depth - 1, ready, done)
+    ready.release()
+    done.wait()
+
+
+class ProfilingStack(bm.Scenario):
+    nthreads = bm.var(type=int)
+    depth = bm.var(type=int)
+    nframes = bm.var(type=int)
+
+    def run(self):
+        # Park the threads at the bottom of a deep stack, like the request
+        # handlers of a web framework would be.
+        ready = threading.Semaphore(0)
+        done = threading.Event()
+        threads = [threading.Thread(target=_deep_stack, args=(self.depth, ready, done)) for _ in range(self.nthreads)]
+        for t in threads:
+            t.start()
+        for _ in threads:
+            ready.acquire()
+
+        collector = stack.StackCollector(recorder.Recorder(), nframes=self.nframes)
+        collector._init()
+
+        def _(loops):
+            for _ in range(loops):
+                collector.collect()
+
+        yield _
+
+        done.set()
+        for t in threads:
+            t.join()
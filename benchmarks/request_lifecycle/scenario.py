@@ -0,0 +1,200 @@
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+import threading
+import time
+import tracemalloc
+
+import bm
+import bm.utils as utils
+
+from ddtrace.internal.processor.trace import SpanAggregator
+from ddtrace.internal.processor.trace import TraceSamplingProcessor
+from ddtrace.internal.writer import AgentWriter
+from ddtrace.propagation.http import HTTPPropagator
+from ddtrace.tracer import Tracer
+
+
+class _FakeAgentHandler(BaseHTTPRequestHandler):
+    """Accept every payload, like a trace agent that keeps up with the load."""
+
+    def _accept(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_PUT = do_POST = _accept
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_fake_agent():
+    server = HTTPServer(("127.0.0.1", 0), _FakeAgentHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+class _StageTimer(object):
+    """Measure the CPU time and the memory allocated by each stage of a request.
+
+    Stages can be nested: the time and memory of an inner stage are not
+    accounted to the outer one.
+    """
+
+    def __init__(self):
+        self.cpu_ns = defaultdict(int)
+        self.net_bytes = defaultdict(int)
+        self._stack = []
+
+    def _switch(self):
+        now = time.thread_time_ns()
+        memory = tracemalloc.get_traced_memory()[0]
+        if self._stack:
+            current, started, memory_started = self._stack[-1]
+            self.cpu_ns[current] += now - started
+            self.net_bytes[current] += memory - memory_started
+        return now, memory
+
+    def enter(self, stage):
+        now, memory = self._switch()
+        self._stack.append((stage, now, memory))
+
+    def exit(self):
+        now, memory = self._switch()
+        self._stack.pop()
+        if self._stack:
+            stage, _, _ = self._stack.pop()
+            self._stack.append((stage, now, memory))
+
+    def wrap(self, func, stage):
+        def wrapper(*args, **kwargs):
+            self.enter(stage)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.exit()
+
+        return wrapper
+
+    def patch(self, obj, name, stage):
+        setattr(obj, name, self.wrap(getattr(obj, name), stage))
+
+
+class RequestLifecycle(bm.Scenario):
+    nspans = bm.var(type=int)
+    ntags = bm.var(type=int)
+    ltags = bm.var(type=int)
+    nrequests = bm.var(type=int)
+    distributed = bm.var_bool()
+
+    def _create_tracer(self, agent_url):
+        tracer = Tracer()
+        # Only flush when asked to, at the end of each batch of requests
+        tracer.configure(writer=AgentWriter(agent_url, processing_interval=3600))
+        return tracer
+
+    def _headers(self):
+        if not self.distributed:
+            return {"host": "localhost:8000", "user-agent": "benchmark"}
+        return {
+            "host": "localhost:8000",
+            "user-agent": "benchmark",
+            "x-datadog-trace-id": "1234",
+            "x-datadog-parent-id": "5678",
+            "x-datadog-sampling-priority": "1",
+            "x-datadog-tags": "_dd.p.dm=-1",
+        }
+
+    def _requests(self, tracer, timer=None):
+        headers = self._headers()
+        tags = utils.gen_tags(self)
+        nspans = self.nspans
+        extract = HTTPPropagator.extract
+        if timer is not None:
+            extract = timer.wrap(extract, "extract")
+
+        def request():
+            context = extract(headers)
+            if context.trace_id is not None:
+                tracer.context_provider.activate(context)
+            with tracer.trace("web.request", service="benchmark", resource="GET /", span_type="web") as root:
+                root.set_tags(tags)
+                for i in range(nspans):
+                    with tracer.trace("child.%d" % (i % 5), resource="child") as span:
+                        span.set_tags(tags)
+
+        def requests():
+            for _ in range(self.nrequests):
+                if timer is None:
+                    request()
+                else:
+                    # Whatever is not accounted to another stage: creating and
+                    # finishing spans, setting tags, ...
+                    timer.enter("request")
+                    try:
+                        request()
+                    finally:
+                        timer.exit()
+            tracer._writer.flush_queue()
+
+        return requests
+
+    def metadata(self):
+        """Report the CPU time and the memory allocated per request by each stage of the request."""
+        server = _start_fake_agent()
+        tracer = self._create_tracer("http://127.0.0.1:%d" % server.server_address[1])
+        try:
+            timer = _StageTimer()
+            timer.patch(tracer, "start_span", "start_span")
+            for processor in tracer._span_processors:
+                if isinstance(processor, SpanAggregator):
+                    timer.patch(processor, "on_span_finish", "aggregate")
+                    for trace_processor in processor._trace_processors:
+                        if isinstance(trace_processor, TraceSamplingProcessor):
+                            timer.patch(trace_processor, "process_trace", "sample")
+            timer.patch(tracer._writer, "write", "encode")
+            timer.patch(tracer._writer, "flush_queue", "flush")
+
+            requests = self._requests(tracer, timer)
+            # Warm up
+            requests()
+
+            tracemalloc.start()
+            try:
+                timer.cpu_ns.clear()
+                timer.net_bytes.clear()
+                requests()
+            finally:
+                tracemalloc.stop()
+        finally:
+            tracer.shutdown()
+            server.shutdown()
+
+        # DEV: The flush happens once per batch, it is reported per request like the other stages
+        metadata = {}
+        for stage, cpu_ns in timer.cpu_ns.items():
+            metadata["%s_cpu_us" % stage] = round(cpu_ns / 1000.0 / self.nrequests, 3)
+            metadata["%s_net_bytes" % stage] = timer.net_bytes[stage] // self.nrequests
+        return metadata
+
+    def run(self):
+        utils.drop_telemetry_events()
+        server = _start_fake_agent()
+        tracer = self._create_tracer("http://127.0.0.1:%d" % server.server_address[1])
+        requests = self._requests(tracer)
+
+        def _(loops):
+            for _ in range(loops):
+                requests()
+
+        yield _
+
+        tracer.shutdown()
+        server.shutdown()
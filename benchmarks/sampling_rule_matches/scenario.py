@@ -5,6 +5,7 @@ import string
 import bm
 
 from ddtrace import Span
+from ddtrace.sampler import DatadogSampler
 from ddtrace.sampling_rule import SamplingRule
 
 
@@ -29,6 +30,8 @@ class SamplingRules(bm.Scenario):
     num_operations = bm.var(type=int)
     num_resources = bm.var(type=int)
     num_tags = bm.var(type=int)
+    num_rules = bm.var(type=int)
+    use_sampler = bm.var_bool()
 
     def run(self):
         # Generate random service and operation names for the counts we requested
@@ -38,24 +41,45 @@ class SamplingRules(bm.Scenario):
         tag_names = [rands() for _ in range(self.num_tags)]
 
         # Generate all possible permutations of service and operation names
-        spans = [
-            Span(service=service, name=name, resource=resource, tags={tag: tag})
-            for service, name, resource, tag in itertools.product(services, operation_names, resource_names, tag_names)
-        ]
+        spans = []
+        for service, name, resource, tag in itertools.product(services, operation_names, resource_names, tag_names):
+            span = Span(service=service, name=name, resource=resource)
+            span.set_tag(tag, tag)
+            spans.append(span)
 
-        # Create a single rule to use for all matches
+        # Create a rule that matches some of the spans
         # Pick a random service/operation name
+        tag = random.choice(tag_names)
         rule = SamplingRule(
             service=random.choice(services),
             name=random.choice(operation_names),
             resource=random.choice(resource_names),
-            tags=random.choice(tag_names),
+            tags={tag: tag[:3] + "*"},
             sample_rate=1.0,
         )
 
+        if not self.use_sampler:
+
+            def _(loops):
+                for _ in range(loops):
+                    for span in iter_n(spans, n=self.num_iterations):
+                        rule.matches(span)
+
+            yield _
+            return
+
+        # Let the sampler pick the rule for each span. The matching rule comes
+        # last, after rules for other services that never match.
+        rules = [
+            SamplingRule(service=rands(), name=rands() + "*", tags={rands(): "?" + rands(3) + "*"}, sample_rate=0.5)
+            for _ in range(self.num_rules - 1)
+        ]
+        rules.append(rule)
+        sampler = DatadogSampler(rules=rules)
+
         def _(loops):
             for _ in range(loops):
                 for span in iter_n(spans, n=self.num_iterations):
-                    rule.matches(span)
+                    sampler.sample(span)
 
         yield _
@@ -13,6 +13,8 @@ class Span(bm.Scenario):
     finishspan = bm.var_bool()
     traceid128 = bm.var_bool()
     telemetry = bm.var_bool()
+    sharedtags = bm.var_bool()
+    tagsapi = bm.var(type=str)
 
     def run(self):
         # run scenario to also set tags on spans
@@ -29,6 +31,7 @@ class Span(bm.Scenario):
         finishspan = self.finishspan
         config._128_bit_trace_id_enabled = self.traceid128
         config._telemetry_enabled = config._telemetry_metrics_enabled = self.telemetry
+        config._trace_shared_tags_enabled = self.sharedtags
         # Recreate span processors and configure global tracer to avoid sending traces to the agent
         utils.drop_traces(tracer)
         utils.drop_telemetry_events()
@@ -38,7 +41,13 @@ class Span(bm.Scenario):
                 for i in range(self.nspans):
                     s = tracer.start_span("test." + str(i))
                     if settags:
-                        s.set_tags(tags)
+                        if self.tagsapi == "set_tag":
+                            for k, v in tags.items():
+                                s.set_tag(k, v)
+                        elif self.tagsapi == "set_tags_str":
+                            s._set_tags_str(tags)
+                        else:
+                            s.set_tags(tags)
                     if setmetrics:
                         s.set_metrics(metrics)
                     if finishspan:
@@ -0,0 +1,39 @@
+import bm
+
+from ddtrace.constants import SPAN_MEASURED_KEY
+from ddtrace.internal.processor.stats import SpanStatsProcessorV06
+from ddtrace.span import Span
+
+
+class SpanStats(bm.Scenario):
+    nspans = bm.var(type=int)
+    nresources = bm.var(type=int)
+    error_rate = bm.var(type=float)
+    flush = bm.var_bool()
+
+    def run(self):
+        # Do not let the processor flush on its own, nor send anything
+        processor = SpanStatsProcessorV06("http://localhost:8126", interval=3600)
+        processor.stop()
+        processor.join()
+
+        errors = int(self.nspans * self.error_rate)
+        spans = []
+        for i in range(self.nspans):
+            span = Span("web.request", service="svc", resource="GET /resource/%d" % (i % self.nresources), start=1)
+            span.set_metric(SPAN_MEASURED_KEY, 1)
+            span.set_tag("http.status_code", "500" if i < errors else "200")
+            span.error = int(i < errors)
+            span.finish(finish_time=1 + (i % 100) * 0.001)
+            spans.append(span)
+
+        def _(loops):
+            for _ in range(loops):
+                for span in spans:
+                    processor.on_span_finish(span)
+                if self.flush:
+                    # Aggregate the stats into the payload sent to the agent
+                    with processor._lock:
+                        processor._serialize_buckets()
+
+        yield _
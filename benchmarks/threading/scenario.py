@@ -34,6 +34,8 @@ class Threading(bm.Scenario):
     nthreads = bm.var(type=int)
     ntraces = bm.var(type=int)
     nspans = bm.var(type=int)
+    nshards = bm.var(type=int)
+    traceid128 = bm.var_bool()
 
     def create_trace(self, tracer):
         # type: (Tracer) -> None
@@ -45,8 +47,14 @@ class Threading(bm.Scenario):
 
     def run(self):
         # type: () -> Generator[Callable[[int], None], None, None]
+        from ddtrace import config
         from ddtrace import tracer
 
+        # the span aggregator is recreated with the new number of shards when
+        # the tracer is configured
+        config._span_aggregator_shards = self.nshards
+        config._128_bit_trace_id_enabled = self.traceid128
+
         # configure global tracer to drop traces rather
         tracer.configure(writer=NoopWriter())
 
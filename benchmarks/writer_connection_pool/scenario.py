@@ -0,0 +1,104 @@
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+from socketserver import ThreadingMixIn
+import threading
+import time
+
+import bm
+
+from ddtrace.internal.writer import AgentWriter
+from ddtrace.span import Span
+
+
+class _SlowAgentHandler(BaseHTTPRequestHandler):
+    """Accept every payload after some latency, like a trace agent under load."""
+
+    latency = 0.0
+
+    def do_PUT(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latency)
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def _start_slow_agent(latency):
+    handler = type("_Handler", (_SlowAgentHandler,), {"latency": latency})
+    server = _ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+class WriterConnectionPool(bm.Scenario):
+    pool_size = bm.var(type=int)
+    latency = bm.var(type=float)
+    nspans = bm.var(type=int)
+    ntraces = bm.var(type=int)
+
+    def _create_writer(self, server, **kwargs):
+        return AgentWriter(
+            "http://127.0.0.1:%d" % server.server_address[1],
+            connection_pool_size=self.pool_size,
+            reuse_connections=True,
+            **kwargs
+        )
+
+    def metadata(self):
+        """Report the share of traces dropped while writing to the slow agent for a second."""
+        server = _start_slow_agent(self.latency)
+        writer = self._create_writer(server, processing_interval=0.05, buffer_size=16 << 10, max_payload_size=16 << 10)
+        trace = [Span(name="foo", service="bar", resource="baz") for _ in range(self.nspans)]
+        accepted = [0]
+        dropped = [0]
+        metrics_dist = writer._metrics_dist
+
+        # Keep the accounting here: the writer resets its metrics on every flush
+        def count(name, count=1, tags=tuple()):
+            if name == "writer.accepted.traces":
+                accepted[0] += count
+            elif name in ("buffer.dropped.traces", "http.dropped.traces"):
+                dropped[0] += count
+            metrics_dist(name, count, tags)
+
+        writer._metrics_dist = count
+        try:
+            end = time.time() + 1.0
+            while time.time() < end:
+                writer.write(trace)
+                time.sleep(0.0005)
+        finally:
+            writer.stop()
+            writer.join()
+            server.shutdown()
+        return {"accepted_traces": accepted[0], "drop_rate": round(float(dropped[0]) / max(accepted[0], 1), 4)}
+
+    def run(self):
+        server = _start_slow_agent(self.latency)
+        writer = self._create_writer(server, processing_interval=3600)
+        trace = [Span(name="foo", service="bar", resource="baz") for _ in range(self.nspans)]
+        ntraces = self.ntraces
+
+        def _(loops):
+            for _ in range(loops):
+                for _ in range(ntraces):
+                    writer.write(trace)
+                writer.flush_queue()
+
+        yield _
+
+        writer.stop()
+        writer.join()
+        server.shutdown()
@@ -3,6 +3,7 @@ import re
 import threading
 from typing import TYPE_CHECKING
 from typing import Any
+from typing import Dict
 from typing import Optional
 from typing import Text
 
@@ -18,6 +19,7 @@ from .internal.utils.http import w3c_get_dd_list_member as _w3c_get_dd_list_memb
 
 
 if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable
     from typing import Tuple
 
     from .span import Span
@@ -31,6 +33,17 @@ if TYPE_CHECKING:  # pragma: no cover
         _MetricDictType,  # _metrics
     ]
 
+    _InjectedHeaders = Tuple[
+        Tuple[Callable[["Context", Dict[str, str]], None], ...],  # injectors
+        bool,  # x-datadog-tags enabled
+        int,  # x-datadog-tags max length
+        Optional[int],  # trace_id
+        Optional[int],  # span_id
+        _MetaDictType,  # _meta
+        _MetricDictType,  # _metrics
+        Dict[str, str],  # headers
+    ]
+
 
 _DD_ORIGIN_INVALID_CHARS_REGEX = re.compile(r"[^\x20-\x7E]+")
 
@@ -48,6 +61,7 @@ class Context(object):
         "_lock",
         "_meta",
         "_metrics",
+        "_injected_headers",
     ]
 
     def __init__(
@@ -62,6 +76,8 @@ class Context(object):
     ):
         self._meta = meta if meta is not None else {}  # type: _MetaDictType
         self._metrics = metrics if metrics is not None else {}  # type: _MetricDictType
+        # The headers last injected for the context, see HTTPPropagator.inject
+        self._injected_headers = None  # type: Optional[_InjectedHeaders]
 
         self.trace_id = trace_id  # type: Optional[int]
         self.span_id = span_id  # type: Optional[int]
@@ -92,6 +108,7 @@ class Context(object):
     def __setstate__(self, state):
         # type: (_ContextState) -> None
         self.trace_id, self.span_id, self._meta, self._metrics = state
+        self._injected_headers = None
         # We cannot serialize and lock, so we must recreate it unless we already have one
         self._lock = threading.RLock()
 
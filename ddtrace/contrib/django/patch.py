@@ -294,7 +294,7 @@ def traced_func(django, name, resource=None, ignored_excs=None):
             if ignored_excs:
                 for exc in ignored_excs:
                     s._ignore_exception(exc)
-            core.dispatch(
+            core.notify(
                 "django.func.wrapped",
                 args,
                 kwargs,
@@ -454,10 +454,11 @@ def traced_get_response(django, pin, func, instance, args, kwargs):
             service=trace_utils.int_service(pin, config.django),
             span_type=SpanTypes.WEB,
         ) as span:
-            core.dispatch(
-                "django.traced_get_response.pre",
-                functools.partial(_block_request_callable, request, request_headers, span),
-            )
+            if core.has_listeners("django.traced_get_response.pre"):
+                core.notify(
+                    "django.traced_get_response.pre",
+                    functools.partial(_block_request_callable, request, request_headers, span),
+                )
             span.set_tag_str(COMPONENT, config.django.integration_name)
 
             # set span.kind to the type of request being performed
@@ -521,7 +522,7 @@ def traced_get_response(django, pin, func, instance, args, kwargs):
                     request_body=body,
                     request_cookies=request.COOKIES,
                 )
-                core.dispatch("django.start_response", "Django")
+                core.notify("django.start_response", "Django")
 
                 if core.get_item(HTTP_REQUEST_BLOCKED):
                     response = blocked_response()
@@ -540,7 +541,7 @@ def traced_get_response(django, pin, func, instance, args, kwargs):
                 trace_utils.set_http_meta(span, config.django, route=span.get_tag("http.route"))
                 # if not blocked yet, try blocking rules on response
                 if not core.get_item(HTTP_REQUEST_BLOCKED):
-                    core.dispatch("django.finalize_response", "Django")
+                    core.notify("django.finalize_response", "Django")
                     if core.get_item(HTTP_REQUEST_BLOCKED):
                         response = blocked_response()
                         return response  # noqa: B012
@@ -711,7 +712,7 @@ def traced_login(django, pin, func, instance, args, kwargs):
         if mode == "disabled":
             return
 
-        core.dispatch(
+        core.notify(
             "django.login",
             pin,
             request,
@@ -782,7 +783,7 @@ def _patch(django):
         )
 
     when_imported("django.core.handlers.wsgi")(lambda m: trace_utils.wrap(m, "WSGIRequest.__init__", wrap_wsgi_environ))
-    core.dispatch("django.patch", [])
+    core.notify("django.patch")
 
     @when_imported("django.core.handlers.base")
     def _(m):
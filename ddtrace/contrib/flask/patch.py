@@ -103,7 +103,7 @@ class _FlaskWSGIMiddleware(_DDWSGIMiddlewareBase):
     _response_call_name = "flask.response"
 
     def _wrapped_start_response(self, start_response, ctx, status_code, headers, exc_info=None):
-        core.dispatch("flask.start_response.pre", flask.request, ctx, config.flask, status_code, headers)
+        core.notify("flask.start_response.pre", flask.request, ctx, config.flask, status_code, headers)
         if not core.get_item(HTTP_REQUEST_BLOCKED):
             headers_from_context = ""
             results, exceptions = core.dispatch("flask.start_response", "Flask")
@@ -123,7 +123,7 @@ class _FlaskWSGIMiddleware(_DDWSGIMiddlewareBase):
                         ctype = "text/" + block_config["type"]
                     response_headers = [("content-type", ctype)]
                 result = start_response(str(status), response_headers)
-                core.dispatch("flask.start_response.blocked", config.flask, response_headers, status)
+                core.notify("flask.start_response.blocked", config.flask, response_headers, status)
             else:
                 result = start_response(status_code, headers)
         else:
@@ -153,7 +153,7 @@ class _FlaskWSGIMiddleware(_DDWSGIMiddlewareBase):
                 if result is not None:
                     req_body = result
                     break
-        core.dispatch("flask.request_call_modifier.post", ctx, config.flask, request, req_body)
+        core.notify("flask.request_call_modifier.post", ctx, config.flask, request, req_body)
 
 
 def patch():
@@ -166,7 +166,7 @@ def patch():
     flask._datadog_patch = True
 
     Pin().onto(flask.Flask)
-    core.dispatch("flask.patch", [flask_version])
+    core.notify("flask.patch", flask_version)
     # flask.app.Flask methods that have custom tracing (add metadata, wrap functions, etc)
     _w("flask", "Flask.wsgi_app", patched_wsgi_app)
     _w("flask", "Flask.dispatch_request", request_patcher("dispatch_request"))
@@ -382,7 +382,7 @@ def patched_finalize_request(wrapped, instance, args, kwargs):
     if getattr(rv, "is_sequence", False):
         response = rv.response
         headers = rv.headers
-    core.dispatch("flask.finalize_request.post", [response, headers])
+    core.notify("flask.finalize_request.post", response, headers)
     return rv
 
 
@@ -475,7 +475,7 @@ def patched_render(wrapped, instance, args, kwargs):
         return wrapped(*args, **kwargs)
 
     def _wrap(template, context, app):
-        core.dispatch("flask.render", template, config.flask)
+        core.notify("flask.render", template, config.flask)
         return wrapped(*args, **kwargs)
 
     return _wrap(*args, **kwargs)
@@ -497,7 +497,7 @@ def patched_register_error_handler(wrapped, instance, args, kwargs):
 
 def _block_request_callable(call):
     core.set_item(HTTP_REQUEST_BLOCKED, STATUS_403_TYPE_AUTO)
-    core.dispatch("flask.blocked_request_callable", call)
+    core.notify("flask.blocked_request_callable", call)
     ctype = "text/html" if "text/html" in flask.request.headers.get("Accept", "").lower() else "text/json"
     abort(flask.Response(http_utils._get_blocked_template(ctype), content_type=ctype, status=403))
 
@@ -158,7 +158,7 @@ def traced_poll(func, instance, args, kwargs):
         span.set_tag_str(kafkax.GROUP_ID, instance._group_id)
         if message is not None:
             core.set_item("kafka_topic", message.topic())
-            core.dispatch("kafka.consume.start", [instance, message])
+            core.notify("kafka.consume.start", instance, message)
 
             message_key = message.key() or ""
             message_offset = message.offset() or -1
@@ -179,6 +179,6 @@ def traced_commit(func, instance, args, kwargs):
     if not pin or not pin.enabled():
         return func(*args, **kwargs)
 
-    core.dispatch("kafka.commit.start", [instance, args, kwargs])
+    core.notify("kafka.commit.start", instance, args, kwargs)
 
     return func(*args, **kwargs)
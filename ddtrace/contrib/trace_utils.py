@@ -458,15 +458,17 @@ def set_http_meta(
     :param request_path_params: the parameters of the HTTP URL as set by the framework: /posts/<id:int> would give us
          { "id": <int_value> }
     """
+    # DEV: Collect the text tags to set them on the span at once
+    tags = {}  # type: Dict[str, str]
     if method is not None:
-        span.set_tag_str(http.METHOD, method)
+        tags[http.METHOD] = method
 
     if url is not None:
         url = _sanitized_url(url)
         _set_url_tag(integration_config, span, url, query)
 
     if target_host is not None:
-        span.set_tag_str(net.TARGET_HOST, target_host)
+        tags[net.TARGET_HOST] = target_host
 
     if status_code is not None:
         try:
@@ -474,21 +476,21 @@ def set_http_meta(
         except (TypeError, ValueError):
             log.debug("failed to convert http status code %r to int", status_code)
         else:
-            span.set_tag_str(http.STATUS_CODE, str(status_code))
+            tags[http.STATUS_CODE] = str(status_code)
             if config.http_server.is_error_code(int_status_code):
                 span.error = 1
 
     if status_msg is not None:
-        span.set_tag_str(http.STATUS_MSG, status_msg)
+        tags[http.STATUS_MSG] = status_msg
 
     if query is not None and integration_config.trace_query_string:
-        span.set_tag_str(http.QUERY_STRING, query)
+        tags[http.QUERY_STRING] = query
 
     request_ip = peer_ip
     if request_headers:
         user_agent = _get_request_header_user_agent(request_headers, headers_are_case_sensitive)
         if user_agent:
-            span.set_tag_str(http.USER_AGENT, user_agent)
+            tags[http.USER_AGENT] = user_agent
 
         # We always collect the IP if appsec is enabled to report it on potential vulnerabilities.
         # https://datadoghq.atlassian.net/wiki/spaces/APS/pages/2118779066/Client+IP+addresses+resolution
@@ -500,14 +502,16 @@ def set_http_meta(
                 # Not calculated: framework does not support IP blocking or testing env
                 request_ip = _get_request_header_client_ip(request_headers, peer_ip, headers_are_case_sensitive)
 
-            span.set_tag_str(http.CLIENT_IP, request_ip)
-            span.set_tag_str("network.client.ip", request_ip)
+            tags[http.CLIENT_IP] = request_ip
+            tags["network.client.ip"] = request_ip
 
-        if integration_config.is_header_tracing_configured:
-            """We should store both http.<request_or_response>.headers.<header_name> and
-            http.<key>. The last one
-            is the DD standardized tag for user-agent"""
-            _store_request_headers(dict(request_headers), span, integration_config)
+    span._set_tags_str(tags)
+
+    if request_headers and integration_config.is_header_tracing_configured:
+        """We should store both http.<request_or_response>.headers.<header_name> and
+        http.<key>. The last one
+        is the DD standardized tag for user-agent"""
+        _store_request_headers(dict(request_headers), span, integration_config)
 
     if response_headers is not None and integration_config.is_header_tracing_configured:
         _store_response_headers(dict(response_headers), span, integration_config)
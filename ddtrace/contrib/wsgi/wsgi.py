@@ -110,17 +110,17 @@ class _DDWSGIMiddlewareBase(object):
                 status, headers, content = core.dispatch("wsgi.block.started", ctx, construct_url)[0][0]
                 return content, status, headers
 
-            core.dispatch("wsgi.block_decided", blocked_view)
+            core.notify("wsgi.block_decided", blocked_view)
 
             if not_blocked:
-                core.dispatch("wsgi.request.prepare", ctx, start_response)
+                core.notify("wsgi.request.prepare", ctx, start_response)
                 try:
                     closing_iterable = self.app(environ, ctx.get_item("intercept_start_response"))
                 except BaseException:
-                    core.dispatch("wsgi.app.exception", ctx)
+                    core.notify("wsgi.app.exception", ctx)
                     raise
                 else:
-                    core.dispatch("wsgi.app.success", ctx, closing_iterable)
+                    core.notify("wsgi.app.success", ctx, closing_iterable)
                 if core.get_item(HTTP_REQUEST_BLOCKED):
                     _, _, content = core.dispatch("wsgi.block.started", ctx, construct_url)[0][0]
                     closing_iterable = [content]
@@ -234,7 +234,7 @@ class DDWSGIMiddleware(_DDWSGIMiddlewareBase):
     def _request_span_modifier(self, req_span, environ, parsed_headers=None):
         url = construct_url(environ)
         request_headers = parsed_headers if parsed_headers is not None else get_request_headers(environ)
-        core.dispatch("wsgi.request.prepared", self, req_span, url, request_headers, environ)
+        core.notify("wsgi.request.prepared", self, req_span, url, request_headers, environ)
 
     def _response_span_modifier(self, resp_span, response):
-        core.dispatch("wsgi.response.prepared", resp_span, response)
+        core.notify("wsgi.response.prepared", resp_span, response)
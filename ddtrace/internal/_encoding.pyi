@@ -1,6 +1,7 @@
 from typing import Any
 from typing import List
 from typing import Optional
+from typing import Type
 from typing import Union
 
 from ddtrace.span import Span
@@ -17,6 +18,7 @@ class BufferItemTooLarge(Exception):
     pass
 
 class BufferedEncoder(object):
+    content_type: str
     max_size: int
     max_item_size: int
     def __init__(self, max_size: int, max_item_size: int) -> None: ...
@@ -31,11 +33,26 @@ class ListBufferedEncoder(BufferedEncoder):
     def encode_item(self, item: Any) -> bytes: ...
 
 class MsgpackEncoderBase(BufferedEncoder):
-    content_type: str
     def get_bytes(self) -> bytes: ...
     def _decode(self, data: Union[str, bytes]) -> Any: ...
 
 class MsgpackEncoderV03(MsgpackEncoderBase): ...
 class MsgpackEncoderV05(MsgpackEncoderBase): ...
 
+class MultiBufferedEncoder(object):
+    content_type: str
+    max_size: int
+    max_item_size: int
+    def __init__(
+        self, encoder_cls: Type[MsgpackEncoderBase], max_size: int, max_item_size: int, buffers: int = ...
+    ) -> None: ...
+    def __len__(self) -> int: ...
+    def put(self, item: Trace) -> None: ...
+    def encode(self) -> Optional[bytes]: ...
+    def _decode(self, data: Union[str, bytes]) -> Any: ...
+    @property
+    def size(self) -> int: ...
+    @property
+    def buffers(self) -> int: ...
+
 def packb(o: Any, **kwargs) -> bytes: ...
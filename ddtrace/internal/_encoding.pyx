@@ -156,6 +156,16 @@ cdef inline int pack_text(msgpack_packer *pk, object text) except? -1:
     raise TypeError("Unhandled text type: %r" % type(text))
 
 
+cdef inline Py_ssize_t shared_meta_size(dict shared_meta, dict meta, dict metrics) except -1:
+    # The shared tags of a span that are not overridden by its own tags or metrics
+    cdef Py_ssize_t L = 0
+
+    for k in shared_meta:
+        if k not in meta and k not in metrics:
+            L += 1
+    return L
+
+
 cdef class StringTable(object):
     cdef dict _table
     cdef stdint.uint32_t _next_id
@@ -219,8 +229,75 @@ cdef class ListStringTable(StringTable):
         return iter(self._list)
 
 
+cdef class EncodedStringCache(object):
+    """Cache of strings encoded with msgpack, bounded in number of strings and bytes.
+
+    The cache approximates an LRU cache with two generations of strings.
+    Strings are looked up in the current generation, then in the previous
+    one, from which they are promoted on a hit. When the current generation is
+    full it replaces the previous one, which evicts the strings that were not
+    used during a whole generation.
+
+    Strings longer than ``max_string_length`` are not cached, so high
+    cardinality values like SQL queries do not evict common strings.
+    """
+
+    cdef dict _current
+    cdef dict _previous
+    cdef Py_ssize_t _current_bytes
+    cdef readonly Py_ssize_t max_items
+    cdef readonly Py_ssize_t max_bytes
+    cdef readonly Py_ssize_t max_string_length
+
+    def __init__(self, Py_ssize_t max_items, Py_ssize_t max_bytes, Py_ssize_t max_string_length):
+        self._current = {}
+        self._previous = {}
+        self._current_bytes = 0
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.max_string_length = max_string_length
+
+    def __len__(self):
+        return len(self._current) + len(self._previous)
+
+    def __contains__(self, object string):
+        return string in self._current or string in self._previous
+
+    cdef object get(self, object string):
+        cdef PyObject *ptr = PyDict_GetItem(self._current, string)
+        cdef object encoded
+
+        if ptr != NULL:
+            return <object>ptr
+
+        ptr = PyDict_GetItem(self._previous, string)
+        if ptr != NULL:
+            # DEV: Own a reference before promoting the string, as _add might
+            # drop the previous generation and the borrowed reference with it
+            encoded = <object>ptr
+            self._add(string, encoded)
+            return encoded
+
+        return None
+
+    cdef _add(self, object string, bytes encoded):
+        if len(self._current) >= self.max_items or self._current_bytes + len(encoded) > self.max_bytes:
+            self._previous = self._current
+            self._current = {}
+            self._current_bytes = 0
+        self._current[string] = encoded
+        self._current_bytes += len(encoded)
+
+    cdef put(self, object string, bytes encoded):
+        if len(string) <= self.max_string_length:
+            self._add(string, encoded)
+
+
 cdef class MsgpackStringTable(StringTable):
     cdef msgpack_packer pk
+    # The strings of the table are encoded in every payload. Keep the encoded
+    # strings across flushes to copy them in the next payloads.
+    cdef readonly EncodedStringCache _encoded_strings
     cdef int max_size
     cdef int _max_string_length
     cdef int _sp_len
@@ -238,6 +315,7 @@ cdef class MsgpackStringTable(StringTable):
         self.pk.length = MSGPACK_STRING_TABLE_LENGTH_PREFIX_SIZE
         self._sp_len = 0
         self._lock = threading.RLock()
+        self._encoded_strings = EncodedStringCache(4096, 1 << 18, 256)
         super(MsgpackStringTable, self).__init__()
 
         self.index(ORIGIN_KEY)
@@ -249,11 +327,17 @@ cdef class MsgpackStringTable(StringTable):
 
     cdef insert(self, object string):
         cdef int ret
+        cdef size_t start
+        cdef object encoded = None
+        # DEV: Only cache exact str objects, whose hash and equality cannot run Python code
+        cdef bint cache = PyUnicode_CheckExact(string)
 
         if len(string) > self._max_string_length:
             string = "<dropped string of length %d because it's too long (max allowed length %d)>" % (
                 len(string), self._max_string_length
             )
+            # DEV: Each dropped string gets its own placeholder, which is not worth caching
+            cache = False
 
         if self.pk.length + len(string) > self.max_size:
             raise ValueError(
@@ -262,10 +346,24 @@ cdef class MsgpackStringTable(StringTable):
                 )
             )
 
+        if cache:
+            encoded = self._encoded_strings.get(string)
+            if encoded is not None:
+                ret = msgpack_pack_raw_body(&self.pk, PyBytes_AS_STRING(encoded), PyBytes_GET_SIZE(encoded))
+                if ret != 0:
+                    raise RuntimeError("Failed to add string to msgpack string table")
+                return
+
+        start = self.pk.length
         ret = pack_text(&self.pk, string)
         if ret != 0:
             raise RuntimeError("Failed to add string to msgpack string table")
 
+        if cache:
+            self._encoded_strings.put(
+                string, PyBytes_FromStringAndSize(self.pk.buf + start, self.pk.length - start)
+            )
+
     cdef savepoint(self):
         self._sp_len = self.pk.length
         self._sp_id = self._next_id
@@ -298,8 +396,7 @@ cdef class MsgpackStringTable(StringTable):
 
     @property
     def size(self):
-        with self._lock:
-            return self.pk.length - MSGPACK_ARRAY_LENGTH_PREFIX_SIZE + array_prefix_size(self._next_id)
+        return self.pk.length - MSGPACK_ARRAY_LENGTH_PREFIX_SIZE + array_prefix_size(self._next_id)
 
     cdef append_raw(self, long src, Py_ssize_t size):
         cdef int res
@@ -365,8 +462,7 @@ cdef class ListBufferedEncoder(BufferedEncoder):
 
     @property
     def size(self):
-        with self._lock:
-            return self._size
+        return self._size
 
     cpdef put(self, item):
         """Put an item to be serialized in the buffer."""
@@ -523,9 +619,12 @@ cdef class MsgpackEncoderBase(BufferedEncoder):
 
     @property
     def size(self):
-        """Return the size in bytes of the encoder buffer."""
-        with self._lock:
-            return self.pk.length + array_prefix_size(self._count) - MSGPACK_ARRAY_LENGTH_PREFIX_SIZE
+        """Return the size in bytes of the encoder buffer.
+
+        The size is read without taking the lock, so that it can be checked after every put: it includes the part of a
+        trace being put concurrently, if any.
+        """
+        return self.pk.length + array_prefix_size(self._count) - MSGPACK_ARRAY_LENGTH_PREFIX_SIZE
 
     # ---- Abstract methods ----
 
@@ -547,14 +646,16 @@ cdef class MsgpackEncoderV03(MsgpackEncoderBase):
     cdef void * get_dd_origin_ref(self, str dd_origin):
         return string_to_buff(dd_origin)
 
-    cdef inline int _pack_meta(self, object meta, char *dd_origin) except? -1:
+    cdef inline int _pack_meta(
+        self, object meta, object shared_meta, Py_ssize_t shared_size, object metrics, char *dd_origin
+    ) except? -1:
         cdef Py_ssize_t L
         cdef int ret
         cdef dict d
 
         if PyDict_CheckExact(meta):
             d = <dict> meta
-            L = len(d)
+            L = len(d) + shared_size
             if dd_origin is not NULL:
                 L += 1
             if L > ITEM_LIMIT:
@@ -569,6 +670,16 @@ cdef class MsgpackEncoderV03(MsgpackEncoderBase):
                     ret = pack_text(&self.pk, v)
                     if ret != 0:
                         break
+                if ret == 0 and shared_size > 0:
+                    for k, v in (<dict> shared_meta).items():
+                        if k in d or k in metrics:
+                            continue
+                        ret = pack_text(&self.pk, k)
+                        if ret != 0:
+                            break
+                        ret = pack_text(&self.pk, v)
+                        if ret != 0:
+                            break
                 if dd_origin is not NULL:
                     ret = pack_bytes(&self.pk, _ORIGIN_KEY, _ORIGIN_KEY_LEN)
                     if ret == 0:
@@ -607,10 +718,14 @@ cdef class MsgpackEncoderV03(MsgpackEncoderBase):
         cdef int has_span_type
         cdef int has_meta
         cdef int has_metrics
+        cdef Py_ssize_t shared_size
+
+        shared_meta = span._shared_meta
+        shared_size = shared_meta_size(shared_meta, span._meta, span._metrics) if shared_meta else 0
 
         has_error = <bint> (span.error != 0)
         has_span_type = <bint> (span.span_type is not None)
-        has_meta = <bint> (len(span._meta) > 0 or dd_origin is not NULL)
+        has_meta = <bint> (len(span._meta) > 0 or shared_size > 0 or dd_origin is not NULL)
         has_metrics = <bint> (len(span._metrics) > 0)
         has_parent_id = <bint> (span.parent_id is not None)
 
@@ -697,7 +812,7 @@ cdef class MsgpackEncoderV03(MsgpackEncoderBase):
                 if ret != 0:
                     return ret
 
-                ret = self._pack_meta(span._meta, <char *> dd_origin)
+                ret = self._pack_meta(span._meta, shared_meta, shared_size, span._metrics, <char *> dd_origin)
                 if ret != 0:
                     return ret
 
@@ -732,8 +847,7 @@ cdef class MsgpackEncoderV05(MsgpackEncoderBase):
     @property
     def size(self):
         """Return the size in bytes of the encoder buffer."""
-        with self._lock:
-            return self._st.size + super(MsgpackEncoderV05, self).size
+        return self._st.size + super(MsgpackEncoderV05, self).size
 
     cpdef put(self, list trace):
         with self._lock:
@@ -752,6 +866,7 @@ cdef class MsgpackEncoderV05(MsgpackEncoderBase):
 
     cdef int pack_span(self, object span, void *dd_origin) except? -1:
         cdef int ret
+        cdef Py_ssize_t shared_size
 
         ret = msgpack_pack_array(&self.pk, 12)
         if ret != 0:
@@ -801,7 +916,12 @@ cdef class MsgpackEncoderV05(MsgpackEncoderBase):
         if span._links:
             span_links = json_dumps([link.to_dict() for link in span._links])
 
-        ret = msgpack_pack_map(&self.pk, len(span._meta) + (dd_origin is not NULL) + (len(span_links) > 0))
+        shared_meta = span._shared_meta
+        shared_size = shared_meta_size(shared_meta, span._meta, span._metrics) if shared_meta else 0
+
+        ret = msgpack_pack_map(
+            &self.pk, len(span._meta) + shared_size + (dd_origin is not NULL) + (len(span_links) > 0)
+        )
         if ret != 0:
             return ret
         if span._meta:
@@ -812,6 +932,16 @@ cdef class MsgpackEncoderV05(MsgpackEncoderBase):
                 ret = self._pack_string(v)
                 if ret != 0:
                     return ret
+        if shared_size > 0:
+            for k, v in shared_meta.items():
+                if k in span._meta or k in span._metrics:
+                    continue
+                ret = self._pack_string(k)
+                if ret != 0:
+                    return ret
+                ret = self._pack_string(v)
+                if ret != 0:
+                    return ret
         if dd_origin is not NULL:
             ret = msgpack_pack_uint32(&self.pk, <stdint.uint32_t> 1)
             if ret != 0:
@@ -846,6 +976,71 @@ cdef class MsgpackEncoderV05(MsgpackEncoderBase):
         return 0
 
 
+cdef class MultiBufferedEncoder(object):
+    """Encoder that spreads traces over a ring of encoder buffers.
+
+    Traces are always put in the active buffer. On ``encode`` the active
+    buffer is retired by moving the active index to the next buffer in the
+    ring, and the retired buffer is then encoded. The rotation is a single
+    index update, so ``put`` never waits on a flush encoding a payload.
+
+    All the buffers share the same ``max_size`` and ``max_item_size``.
+    """
+
+    cdef list _buffers
+    cdef Py_ssize_t _active
+    cdef object _flush_lock
+    cdef public size_t max_size
+    cdef public size_t max_item_size
+
+    def __init__(self, encoder_cls, size_t max_size, size_t max_item_size, int buffers=2):
+        if buffers < 2:
+            raise ValueError("at least 2 buffers are required, got %d" % buffers)
+        self._buffers = [encoder_cls(max_size, max_item_size) for _ in range(buffers)]
+        self._active = 0
+        self._flush_lock = threading.Lock()
+        self.max_size = self._buffers[0].max_size
+        self.max_item_size = self._buffers[0].max_item_size
+
+    @property
+    def content_type(self):
+        return self._buffers[0].content_type
+
+    @property
+    def buffers(self):
+        return len(self._buffers)
+
+    def __len__(self):
+        return len(self._buffers[self._active])
+
+    @property
+    def size(self):
+        """Return the size in bytes of the active encoder buffer."""
+        return self._buffers[self._active].size
+
+    cpdef _decode(self, data):
+        return self._buffers[0]._decode(data)
+
+    cpdef put(self, list trace):
+        """Put a trace (i.e. a list of spans) in the active buffer."""
+        # DEV: Reading the active buffer does not release the GIL, so it is
+        # atomic with respect to the rotation performed by encode.
+        self._buffers[self._active].put(trace)
+
+    cpdef encode(self):
+        """Retire the active buffer and encode it.
+
+        A put that picked the buffer right before it was retired is either
+        encoded with it, or stays in the buffer until its next turn.
+        """
+        cdef object retired
+
+        with self._flush_lock:
+            retired = self._buffers[self._active]
+            self._active = (self._active + 1) % len(self._buffers)
+            return retired.encode()
+
+
 cdef class Packer(object):
     """Slightly modified version of the v0.6.2 msgpack Packer
     which only supports basic Python types (int, bool, float, dict, list).
@@ -1,3 +1,6 @@
+from typing import Tuple
+
 def seed() -> None: ...
 def rand64bits(check_pid: bool = True) -> int: ...
 def rand128bits(check_pid: bool = True) -> int: ...
+def rand_trace_span_ids(trace_id_128bits: bool) -> Tuple[int, int]: ...
@@ -24,8 +24,13 @@ thread-safety:
 https://github.com/python/cpython/blob/8d21aa21f2cbc6d50aab3f420bb23be1d081dac4/Lib/random.py#L37-L38
 
 
+Random numbers are generated in batches into a buffer that the functions below
+consume. The buffer is only accessed with the GIL held, so each number is handed
+out once, whichever thread asks for it.
+
 Warning: this RNG needs to be reseeded on fork() if collisions are to be
-avoided across processes. Reseeding is accomplished simply by calling seed().
+avoided across processes. Reseeding is accomplished simply by calling seed(),
+which also discards the numbers left in the buffer.
 
 
 Benchmarks (run on 2019 13-inch macbook pro 2.8 GHz quad-core i7)::
@@ -54,6 +59,7 @@ test_rand64bits_pid_check     121.8156 (2.03)     168.9837 (1.71)     130.3854 (
 import random
 
 from libc.time cimport time
+from libc.time cimport time_t
 
 from ddtrace.internal import compat
 from ddtrace.internal import forksafe
@@ -62,7 +68,17 @@ from ddtrace.internal import forksafe
 cdef extern from "_stdint.h" nogil:
     ctypedef unsigned long long uint64_t
 
+cdef enum:
+    # Number of random numbers generated at a time
+    BUFFER_SIZE = 256
+
 cdef uint64_t state
+cdef uint64_t rand_buffer[BUFFER_SIZE]
+cdef Py_ssize_t buffer_index = BUFFER_SIZE
+
+# The 32 most significant bits of the 128-bit ids generated during the current second
+cdef time_t time_bits_second = -1
+cdef object time_bits = 0
 
 
 cpdef _getstate():
@@ -70,9 +86,39 @@ cpdef _getstate():
 
 
 cpdef seed():
-    global state
+    global state, buffer_index
     random.seed()
     state = <uint64_t>compat.getrandbits(64) ^ <uint64_t>4101842887655102017
+    # Discard the numbers generated with the previous state
+    buffer_index = BUFFER_SIZE
+
+
+cdef void _refill() nogil:
+    global state, buffer_index
+    cdef Py_ssize_t i
+    for i in range(BUFFER_SIZE):
+        state ^= state >> 21
+        state ^= state << 35
+        state ^= state >> 4
+        rand_buffer[i] = state * <uint64_t>2685821657736338717
+    buffer_index = 0
+
+
+cdef inline uint64_t _next() nogil:
+    global buffer_index
+    if buffer_index >= BUFFER_SIZE:
+        _refill()
+    buffer_index += 1
+    return rand_buffer[buffer_index - 1]
+
+
+cdef object _time_bits():
+    global time_bits_second, time_bits
+    cdef time_t now = time(NULL)
+    if now != time_bits_second:
+        time_bits = int(now) << 96
+        time_bits_second = now
+    return time_bits
 
 
 # We have to reseed the RNG or we will get collisions between the processes as
@@ -81,16 +127,19 @@ forksafe.register(seed)
 
 
 cpdef rand64bits():
-    global state
-    state ^= state >> 21
-    state ^= state << 35
-    state ^= state >> 4
-    return <uint64_t>(state * <uint64_t>2685821657736338717)
+    return _next()
 
 
 cpdef rand128bits():
     # Returns a 128bit integer with the following format -> <32-bit unix seconds><32 bits of zero><64 random bits>
-    return int(time(NULL)) << 96 | rand64bits()
+    return _time_bits() | _next()
+
+
+cpdef tuple rand_trace_span_ids(bint trace_id_128bits):
+    """Return the ids of the root span of a new trace, as a ``(trace_id, span_id)`` tuple."""
+    if trace_id_128bits:
+        return _time_bits() | _next(), _next()
+    return _next(), _next()
 
 
 seed()
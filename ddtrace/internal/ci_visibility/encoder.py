@@ -105,7 +105,7 @@ class CIVisibilityEncoderV01(BufferedEncoder):
         sp = JSONEncoderV2._normalize_span(sp)
         sp["type"] = span.get_tag(EVENT_TYPE) or span.span_type
         sp["duration"] = span.duration_ns
-        sp["meta"] = dict(sorted(span._meta.items()))
+        sp["meta"] = dict(sorted(span.get_tags().items()))
         sp["metrics"] = dict(sorted(span._metrics.items()))
         if dd_origin is not None:
             sp["meta"].update({"_dd.origin": dd_origin})
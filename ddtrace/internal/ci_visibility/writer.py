@@ -136,6 +136,8 @@ class CIVisibilityWriter(HTTPWriter):
             sync_mode=sync_mode,
             reuse_connections=reuse_connections,
             headers=headers,
+            # The CI Visibility encoders do not keep track of the size of their buffer
+            flush_high_water_mark=0,
         )
 
     def stop(self, timeout=None):
@@ -35,7 +35,10 @@ SPAN_API_OPENTRACING = "opentracing"
 DEFAULT_BUFFER_SIZE = 20 << 20  # 20 MB
 DEFAULT_MAX_PAYLOAD_SIZE = 20 << 20  # 20 MB
 DEFAULT_PROCESSING_INTERVAL = 1.0
+DEFAULT_FLUSH_HIGH_WATER_MARK = 0.7
 DEFAULT_REUSE_CONNECTIONS = False
+DEFAULT_SPOOL_MAX_SIZE = 64 << 20  # 64 MB
+DEFAULT_SPOOL_MAX_AGE = 300.0
 BLOCKED_RESPONSE_HTML = """
 <!DOCTYPE html><html lang="en"><head> <meta charset="UTF-8"> <meta name="viewport"
 content="width=device-width,initial-scale=1"> <title>You've been blocked</title>
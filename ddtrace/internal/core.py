@@ -99,10 +99,23 @@ like this::
 
 
 The names of these events follow the pattern ``context.[started|ended].<context_name>``.
+
+When the results of the listeners are not needed, ``notify`` dispatches an event without collecting them::
+
+
+    core.notify("flask.blocked_request_callable", call)
+
+
+Integration code that has to do some work only to build the arguments of an event can check for listeners
+first with ``has_listeners``, which is a single dictionary lookup::
+
+
+    if core.has_listeners("django.traced_get_response.pre"):
+        core.notify("django.traced_get_response.pre", functools.partial(_block_request_callable, request))
 """
-from collections import defaultdict
 from contextlib import contextmanager
 import logging
+import threading
 from typing import TYPE_CHECKING
 
 
@@ -127,13 +140,16 @@ log = logging.getLogger(__name__)
 
 
 _CURRENT_CONTEXT = None
-_EVENT_HUB = None
 ROOT_CONTEXT_ID = "__root"
 
 
 class EventHub:
     def __init__(self):
-        self.reset()
+        self._lock = threading.Lock()
+        # The listeners of each event. The tuples are replaced rather than
+        # changed when listeners are added, so events are dispatched without
+        # locking.
+        self._listeners = {}  # type: Dict[str, Tuple[Callable, ...]]
 
     def has_listeners(self, event_id):
         # type: (str) -> bool
@@ -141,13 +157,14 @@ class EventHub:
 
     def on(self, event_id, callback):
         # type: (str, Callable) -> None
-        if callback not in self._listeners[event_id]:
-            self._listeners[event_id].append(callback)
+        with self._lock:
+            listeners = self._listeners.get(event_id, ())
+            if callback not in listeners:
+                self._listeners[event_id] = listeners + (callback,)
 
     def reset(self):
-        if hasattr(self, "_listeners"):
-            del self._listeners
-        self._listeners = defaultdict(list)
+        with self._lock:
+            self._listeners = {}
 
     def dispatch(self, event_id, args, *other_args):
         # type: (...) -> Tuple[List[Optional[Any]], List[Optional[Exception]]]
@@ -160,57 +177,127 @@ class EventHub:
                     "must be passed in a list. For example, use dispatch('foo', [[l1, l2], arg2]) "
                     "instead of dispatch('foo', [l1, l2], arg2)."
                 )
-        results = []
-        exceptions = []
-        for listener in self._listeners.get(event_id, []):
+        results = []  # type: List[Optional[Any]]
+        exceptions = []  # type: List[Optional[Exception]]
+        for listener in self._listeners.get(event_id, ()):
             result = None
             exception = None
             try:
                 result = listener(*args)
             except Exception as exc:
+                log.debug("listener of event %s failed", event_id, exc_info=True)
                 exception = exc
             results.append(result)
             exceptions.append(exception)
         return results, exceptions
 
+    def notify(self, event_id, *args):
+        # type: (str, Any) -> None
+        listeners = self._listeners.get(event_id)
+        if listeners:
+            for listener in listeners:
+                try:
+                    listener(*args)
+                except Exception:
+                    log.debug("listener of event %s failed", event_id, exc_info=True)
+
 
-_EVENT_HUB = contextvars.ContextVar("EventHub_var", default=EventHub())
+_EVENT_HUB = EventHub()
 
 
 def has_listeners(event_id):
     # type: (str) -> bool
-    return _EVENT_HUB.get().has_listeners(event_id)  # type: ignore
+    return _EVENT_HUB.has_listeners(event_id)
 
 
 def on(event_id, callback):
     # type: (str, Callable) -> None
-    return _EVENT_HUB.get().on(event_id, callback)  # type: ignore
+    _EVENT_HUB.on(event_id, callback)
 
 
 def reset_listeners():
     # type: () -> None
-    _EVENT_HUB.get().reset()  # type: ignore
+    _EVENT_HUB.reset()
 
 
 def dispatch(event_id, args, *other_args):
     # type: (...) -> Tuple[List[Optional[Any]], List[Optional[Exception]]]
-    return _EVENT_HUB.get().dispatch(event_id, args, *other_args)  # type: ignore
+    """Dispatch an event to its listeners and return their results and exceptions."""
+    return _EVENT_HUB.dispatch(event_id, args, *other_args)
+
+
+def notify(event_id, *args):
+    # type: (str, Any) -> None
+    """Dispatch an event to its listeners, ignoring their results and exceptions."""
+    _EVENT_HUB.notify(event_id, *args)
+
+
+class _ContextStats(object):
+    """Data lookup statistics of the contexts of a request, collected when debug logging is enabled."""
+
+    __slots__ = ["depth", "lookups"]
+
+    def __init__(self):
+        self.depth = 1
+        self.lookups = 0
+
+
+class _ContextChain(object):
+    """The contexts that inherit their data from the same parentless context, the base of the chain.
+
+    Its version is incremented when the data of any context of the chain changes.
+    """
+
+    __slots__ = ["base", "version"]
+
+    def __init__(self, base):
+        self.base = base
+        self.version = 0
 
 
 class ExecutionContext:
-    __slots__ = ["identifier", "_data", "_parents", "_span", "_token"]
+    __slots__ = [
+        "identifier",
+        "_data",
+        "_parents",
+        "_span",
+        "_token",
+        "_flat",
+        "_flat_owned",
+        "_flat_version",
+        "_flat_base_generation",
+        "_chain",
+        "_generation",
+        "_depth",
+        "_stats",
+    ]
 
     def __init__(self, identifier, parent=None, span=None, **kwargs):
         self.identifier = identifier
         self._data = {}
         self._parents = []
         self._span = span
+        # The data of the context merged with the data it inherits from its
+        # parents, built on lookup. It is shared with the parent until the
+        # context has data of its own.
+        self._flat = None
+        self._flat_owned = False
+        # The flattened data is valid as long as the version of the chain of
+        # the context and the generation of the base of the chain are those it
+        # was built with, so checking it does not walk up the parents.
+        self._flat_version = 0
+        self._flat_base_generation = 0
+        self._chain = None  # type: Optional[_ContextChain]
+        # Incremented when the data of the context changes
+        self._generation = 0
+        self._depth = 0
+        self._stats = None
         if parent is not None:
             self.addParent(parent)
         self._data.update(kwargs)
         if self._span is None and _CURRENT_CONTEXT is not None:
             self._token = _CURRENT_CONTEXT.set(self)
-        dispatch("context.started.%s" % self.identifier, [self])
+        notify("context.started.%s" % self.identifier, self)
 
     def __repr__(self):
         return self.__class__.__name__ + " '" + self.identifier + "' @ " + str(id(self))
@@ -225,6 +312,11 @@ class ExecutionContext:
 
     def end(self):
         dispatch_result = dispatch("context.ended.%s" % self.identifier, [self])
+        stats = self._stats
+        if stats is not None and self._depth == 1:
+            log.debug(
+                "execution context %r ended: depth %d, %d data lookups", self.identifier, stats.depth, stats.lookups
+            )
         if self._span is None:
             try:
                 _CURRENT_CONTEXT.reset(self._token)
@@ -243,8 +335,47 @@ class ExecutionContext:
     def addParent(self, context):
         if self.identifier == ROOT_CONTEXT_ID:
             raise ValueError("Cannot add parent to root context")
+        if not self._parents:
+            # The data is inherited from the first parent. DEV: it must be
+            # added before the context has children, which keep their chain.
+            self._flat = None
+            self._chain = context._chain if context._parents else _ContextChain(context)
+            self._depth = depth = context._depth + 1
+            stats = context._stats
+            if stats is None and depth == 1 and log.isEnabledFor(logging.DEBUG):
+                stats = _ContextStats()
+            elif stats is not None and depth > stats.depth:
+                stats.depth = depth
+            self._stats = stats
         self._parents.append(context)
 
+    def _get_flat(self):
+        # type: () -> Dict[str, Any]
+        chain = self._chain
+        if chain is None:
+            return self._data
+        if (
+            self._flat is None
+            or self._flat_version != chain.version
+            or self._flat_base_generation != chain.base._generation
+        ):
+            return self._flatten()
+        return self._flat
+
+    def _flatten(self):
+        # type: () -> Dict[str, Any]
+        parent = self._parents[0]
+        flat = parent._get_flat()
+        owned = bool(self._data)
+        if owned:
+            flat = dict(flat)
+            flat.update(self._data)
+        self._flat = flat
+        self._flat_owned = owned
+        self._flat_version = self._chain.version  # type: ignore[union-attr]
+        self._flat_base_generation = self._chain.base._generation  # type: ignore[union-attr]
+        return flat
+
     @classmethod
     @contextmanager
     def context_with_data(cls, identifier, parent=None, span=None, **kwargs):
@@ -256,13 +387,11 @@ class ExecutionContext:
 
     def get_item(self, data_key):
         # type: (str) -> Optional[Any]
-        # NB mimic the behavior of `ddtrace.internal._context` by doing lazy inheritance
-        current = self
-        while current is not None:
-            if data_key in current._data:
-                return current._data.get(data_key)
-            current = current.parent
-        return None
+        # NB mimic the behavior of `ddtrace.internal._context` by doing lazy inheritance: the flattened data
+        # is rebuilt when the data of the context or of one of its parents changes
+        if self._stats is not None:
+            self._stats.lookups += 1
+        return self._get_flat().get(data_key)
 
     def get_items(self, data_keys):
         # type: (List[str]) -> Optional[Any]
@@ -271,6 +400,19 @@ class ExecutionContext:
     def set_item(self, data_key, data_value):
         # type: (str, Optional[Any]) -> None
         self._data[data_key] = data_value
+        self._generation += 1
+        chain = self._chain
+        if chain is None:
+            return
+        if self._flat_owned and self._flat is not None and self._flat_version == chain.version:
+            # The data of the other contexts of the chain did not change: keep
+            # the flattened data of the context up to date
+            self._flat[data_key] = data_value
+            chain.version += 1
+            self._flat_version = chain.version
+        else:
+            self._flat = None
+            chain.version += 1
 
     def set_safe(self, data_key, data_value):
         # type: (str, Optional[Any]) -> None
@@ -8,13 +8,20 @@ from typing import Optional
 from ._encoding import ListStringTable
 from ._encoding import MsgpackEncoderV03
 from ._encoding import MsgpackEncoderV05
+from ._encoding import MultiBufferedEncoder
 from .compat import PY3
 from .compat import binary_type
 from .compat import ensure_text
 from .logger import get_logger
 
 
-__all__ = ["MsgpackEncoderV03", "MsgpackEncoderV05", "ListStringTable", "MSGPACK_ENCODERS"]
+__all__ = [
+    "MsgpackEncoderV03",
+    "MsgpackEncoderV05",
+    "MultiBufferedEncoder",
+    "ListStringTable",
+    "MSGPACK_ENCODERS",
+]
 
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -76,8 +83,9 @@ class _EncoderBase(object):
         if span.duration_ns:
             d["duration"] = span.duration_ns
 
-        if span._meta:
-            d["meta"] = span._meta
+        meta = span._meta if span._shared_meta is None else span.get_tags()
+        if meta:
+            d["meta"] = meta
 
         if span._metrics:
             d["metrics"] = span._metrics
@@ -1,51 +1,69 @@
-from .utils.cache import cachedmethod
+import re
+from typing import List
+from typing import Pattern
+from typing import Tuple
+from typing import Union
+
+from .compat import pattern_type
 
 
 class GlobMatcher(object):
-    """This is a backtracking implementation of the glob matching algorithm.
+    """Glob pattern matcher.
     The glob pattern language supports `*` as a multiple character wildcard which includes matches on `""`
     and `?` as a single character wildcard, but no escape sequences.
-    The match method will be cached for quicker matching and is in a class to keep it from being global.
+    The pattern is compiled into the fixed-length segments between the `*` wildcards. The first and last segments
+    are anchored to the start and end of the subject and the segments in between are searched for from left to
+    right, so matching never backtracks.
     """
 
     def __init__(self, pattern):
         # type: (str) -> None
         self.pattern = pattern
+        self._segments = [
+            (self._compile(segment), len(segment)) for segment in pattern.split("*")
+        ]  # type: List[Tuple[Union[str, Pattern], int]]
+        self._min_length = sum(length for _, length in self._segments)
+
+    @staticmethod
+    def _compile(segment):
+        # type: (str) -> Union[str, Pattern]
+        if "?" not in segment:
+            return segment
+        return re.compile("".join("." if c == "?" else re.escape(c) for c in segment), re.DOTALL)
+
+    @staticmethod
+    def _match_at(segment, subject, pos):
+        # type: (Union[str, Pattern], str, int) -> bool
+        if isinstance(segment, pattern_type):
+            return segment.match(subject, pos) is not None
+        return subject.startswith(segment, pos)
 
-    @cachedmethod()
     def match(self, subject):
         # type: (str) -> bool
-        pattern = self.pattern
-        px = 0  # [p]attern inde[x]
-        sx = 0  # [s]ubject inde[x]
-        nextPx = 0
-        nextSx = 0
-
-        while px < len(pattern) or sx < len(subject):
-            if px < len(pattern):
-                char = pattern[px]
-
-                if char == "?":  # single character wildcard
-                    if sx < len(subject):
-                        px += 1
-                        sx += 1
-                        continue
-
-                elif char == "*":  # zero-or-more-character wildcard
-                    nextPx = px
-                    nextSx = sx + 1
-                    px += 1
-                    continue
-
-                elif sx < len(subject) and subject[sx] == char:  # default normal character match
-                    px += 1
-                    sx += 1
-                    continue
-
-            if 0 < nextSx <= len(subject):
-                px = nextPx
-                sx = nextSx
-                continue
+        if len(subject) < self._min_length:
+            return False
 
+        segments = self._segments
+        head, start = segments[0]
+        if len(segments) == 1:
+            # No multiple character wildcard: the pattern has to cover the whole subject
+            return len(subject) == start and self._match_at(head, subject, 0)
+
+        tail, tail_length = segments[-1]
+        end = len(subject) - tail_length
+        if not self._match_at(head, subject, 0) or not self._match_at(tail, subject, end):
             return False
+
+        for segment, length in segments[1:-1]:
+            if isinstance(segment, pattern_type):
+                found = segment.search(subject, start, end)
+                if found is None:
+                    return False
+                start = found.end()
+            else:
+                index = subject.find(segment, start, end)
+                if index < 0:
+                    return False
+                start = index + length
+
         return True
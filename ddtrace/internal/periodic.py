@@ -79,13 +79,28 @@ class AwakeablePeriodicThread(PeriodicThread):
         self.served = forksafe.Event()
         self.awake_lock = forksafe.Lock()
 
-    def awake(self):
-        """Awake the thread."""
+    def awake(self, wait=True):
+        # type: (bool) -> None
+        """Awake the thread.
+
+        :param wait: Whether to wait for the thread to serve the request.
+        """
+        if not wait:
+            self.request.set()
+            return
+
         with self.awake_lock:
             self.served.clear()
             self.request.set()
             self.served.wait()
 
+    def stop(self):
+        """Stop the thread."""
+        if self.is_alive():
+            self.quit.set()
+            # Interrupt the wait for the next request.
+            self.request.set()
+
     def run(self):
         """Run the target function periodically or on demand."""
         while not self.quit.is_set():
@@ -161,6 +176,6 @@ class AwakeablePeriodicService(PeriodicService):
 
     __thread_class__ = AwakeablePeriodicThread
 
-    def awake(self):
-        # type: (...) -> None
-        self._worker.awake()
+    def awake(self, wait=True):
+        # type: (bool) -> None
+        self._worker.awake(wait)
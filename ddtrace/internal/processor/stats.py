@@ -1,4 +1,5 @@
 # coding: utf-8
+from array import array
 from collections import defaultdict
 import os
 import typing
@@ -76,6 +77,14 @@ class SpanAggrStats(object):
         self.err_distribution = LogCollapsingLowestDenseDDSketch(0.00775, bin_limit=2048)
 
 
+# Flags of the spans waiting to be aggregated
+_TOP_LEVEL = 1 << 0
+_ERROR = 1 << 1
+
+# Max number of finished spans buffered before they are aggregated
+DEFAULT_STATS_BUFFER_SIZE = 16384
+
+
 def _span_aggr_key(span):
     # type: (Span) -> SpanAggrKey
     """Return a hashable key that can be used to aggregate similar spans."""
@@ -88,10 +97,16 @@ def _span_aggr_key(span):
 
 
 class SpanStatsProcessorV06(PeriodicService, SpanProcessor):
-    """SpanProcessor for computing, collecting and submitting span metrics to the Datadog Agent."""
+    """SpanProcessor for computing, collecting and submitting span metrics to the Datadog Agent.
+
+    Finished spans are not aggregated right away. Their end time, duration,
+    flags and aggregation key, interned as an integer id, are appended to
+    compact arrays that are aggregated in bulk into the stats buckets when
+    they are flushed, or when ``buffer_size`` spans are waiting.
+    """
 
-    def __init__(self, agent_url, interval=None, timeout=1.0, retry_attempts=3):
-        # type: (str, Optional[float], float, int) -> None
+    def __init__(self, agent_url, interval=None, timeout=1.0, retry_attempts=3, buffer_size=DEFAULT_STATS_BUFFER_SIZE):
+        # type: (str, Optional[float], float, int, int) -> None
         if interval is None:
             interval = float(os.getenv("_DD_TRACE_STATS_WRITER_INTERVAL") or 10.0)
         super(SpanStatsProcessorV06, self).__init__(interval=interval)
@@ -112,6 +127,8 @@ class SpanStatsProcessorV06(PeriodicService, SpanProcessor):
         self._hostname = six.ensure_text(get_hostname())
         self._lock = Lock()
         self._enabled = True
+        self._buffer_size = buffer_size
+        self._reset_pending()
 
         self._flush_stats_with_backoff = fibonacci_backoff_with_jitter(
             attempts=retry_attempts,
@@ -133,23 +150,57 @@ class SpanStatsProcessorV06(PeriodicService, SpanProcessor):
         if not is_top_level and not _is_measured(span):
             return
 
+        assert span.duration_ns is not None
+        aggr_key = _span_aggr_key(span)
+        flags = (_TOP_LEVEL if is_top_level else 0) | (_ERROR if span.error else 0)
+
         with self._lock:
+            key_id = self._pending_key_index.get(aggr_key)
+            if key_id is None:
+                key_id = self._pending_key_index[aggr_key] = len(self._pending_keys)
+                self._pending_keys.append(aggr_key)
+            self._pending_end_ns.append(span.start_ns + span.duration_ns)
+            self._pending_duration_ns.append(span.duration_ns)
+            self._pending_flags.append(flags)
+            self._pending_key_ids.append(key_id)
+
+            if len(self._pending_key_ids) >= self._buffer_size:
+                self._aggregate_pending()
+
+    def _reset_pending(self):
+        # type: () -> None
+        # The aggregation keys are interned for the lifetime of the buffer only
+        self._pending_key_index = {}  # type: Dict[SpanAggrKey, int]
+        self._pending_keys = []  # type: List[SpanAggrKey]
+        # One column per span attribute, one row per finished span
+        self._pending_end_ns = array("q")
+        self._pending_duration_ns = array("q")
+        self._pending_flags = array("B")
+        self._pending_key_ids = array("L")
+
+    def _aggregate_pending(self):
+        # type: () -> None
+        """Aggregate the buffered spans into the stats buckets, in the order they finished."""
+        buckets = self._buckets
+        bucket_size_ns = self._bucket_size_ns
+        keys = self._pending_keys
+        for end_ns, duration_ns, flags, key_id in zip(
+            self._pending_end_ns, self._pending_duration_ns, self._pending_flags, self._pending_key_ids
+        ):
             # Align the span into the corresponding stats bucket
-            assert span.duration_ns is not None
-            span_end_ns = span.start_ns + span.duration_ns
-            bucket_time_ns = span_end_ns - (span_end_ns % self._bucket_size_ns)
-            aggr_key = _span_aggr_key(span)
-            stats = self._buckets[bucket_time_ns][aggr_key]
+            stats = buckets[end_ns - (end_ns % bucket_size_ns)][keys[key_id]]
 
             stats.hits += 1
-            stats.duration += span.duration_ns
-            if is_top_level:
+            stats.duration += duration_ns
+            if flags & _TOP_LEVEL:
                 stats.top_level_hits += 1
-            if span.error:
+            if flags & _ERROR:
                 stats.errors += 1
-                stats.err_distribution.add(span.duration_ns)
+                stats.err_distribution.add(duration_ns)
             else:
-                stats.ok_distribution.add(span.duration_ns)
+                stats.ok_distribution.add(duration_ns)
+
+        self._reset_pending()
 
     def _serialize_buckets(self):
         # type: () -> List[Dict]
@@ -157,6 +208,8 @@ class SpanStatsProcessorV06(PeriodicService, SpanProcessor):
 
         The current bucket is left in case any other spans are added.
         """
+        self._aggregate_pending()
+
         serialized_buckets = []
         serialized_bucket_keys = []
         for bucket_time_ns, bucket in self._buckets.items():
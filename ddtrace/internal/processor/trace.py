@@ -2,6 +2,8 @@ import abc
 from collections import defaultdict
 from threading import Lock
 from threading import RLock
+from threading import Thread
+from typing import Callable
 from typing import Dict
 from typing import Iterable
 from typing import List
@@ -10,12 +12,14 @@ from typing import Union
 
 import attr
 import six
+from six.moves import queue
 
 from ddtrace import config
 from ddtrace.constants import BASE_SERVICE_KEY
 from ddtrace.constants import SAMPLING_PRIORITY_KEY
 from ddtrace.constants import SPAN_KIND
 from ddtrace.constants import USER_KEEP
+from ddtrace.internal import forksafe
 from ddtrace.internal import gitmetadata
 from ddtrace.internal.constants import HIGHER_ORDER_TRACE_ID_BITS
 from ddtrace.internal.constants import MAX_UINT_64BITS
@@ -158,6 +162,95 @@ class TraceTagsProcessor(TraceProcessor):
         return trace
 
 
+class _TraceProcessingThread(Thread):
+    _ddtrace_profiling_ignore = True
+
+
+class TraceProcessingWorker(object):
+    """Process finished trace chunks from a background thread.
+
+    Chunks are kept in a queue bounded by ``size``. Adding a chunk never blocks:
+    when the queue is full the chunk is rejected and it is up to the caller to
+    account for it. The thread is started when the first chunk is added, and
+    again in a forked child, where the chunks queued by the parent are discarded.
+    """
+
+    def __init__(
+        self,
+        size,  # type: int
+        process,  # type: Callable[[List[Span]], None]
+    ):
+        # type: (...) -> None
+        self.size = size
+        self._process = process
+        self._queue = queue.Queue(maxsize=size)  # type: queue.Queue
+        self._thread = None  # type: Optional[_TraceProcessingThread]
+        self._lock = Lock()
+
+    def _run(self):
+        # type: () -> None
+        while True:
+            spans = self._queue.get()
+            try:
+                if spans is None:
+                    return
+                self._process(spans)
+            except Exception:
+                log.error("failed to process trace chunk of %d spans", len(spans), exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    def put(self, spans):
+        # type: (List[Span]) -> bool
+        """Queue a trace chunk for processing. Return whether it was accepted."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    thread = _TraceProcessingThread(target=self._run, name=self.__class__.__name__)
+                    thread.daemon = True
+                    thread.start()
+                    self._thread = thread
+                    forksafe.register(self._after_fork)
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            return False
+        return True
+
+    def _after_fork(self):
+        # type: () -> None
+        # DEV: The thread does not exist in the child and the queue might have
+        # been locked by it. The chunks are processed by the parent.
+        forksafe.unregister(self._after_fork)
+        self._queue = queue.Queue(maxsize=self.size)
+        self._lock = Lock()
+        self._thread = None
+
+    def join(self):
+        # type: () -> None
+        """Wait until all the queued trace chunks have been processed."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def stop(self, timeout=None):
+        # type: (Optional[float]) -> None
+        """Process the queued trace chunks and stop the thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            forksafe.unregister(self._after_fork)
+        except ValueError:
+            pass
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            log.warning("timed out waiting for %d trace chunks to be processed", self._queue.qsize())
+            return
+        thread.join(timeout)
+
+
 @attr.s
 class SpanAggregator(SpanProcessor):
     """Processor that aggregates spans together by trace_id and writes the
@@ -167,6 +260,14 @@ class SpanAggregator(SpanProcessor):
           the trace_id have finished; or
         - A minimum threshold of spans (``partial_flush_min_spans``) have been
           finished in the collection and ``partial_flush_enabled`` is True.
+
+    In-flight traces are split across ``num_shards`` shards by trace_id, each
+    with its own lock, so that spans of different traces can be started and
+    finished concurrently.
+
+    If ``processing_queue_size`` is greater than 0, the trace processors and
+    the writer are run on a background thread instead of the thread that
+    finished the chunk. Chunks that do not fit in the queue are dropped.
     """
 
     @attr.s
@@ -174,85 +275,134 @@ class SpanAggregator(SpanProcessor):
         spans = attr.ib(default=attr.Factory(list))  # type: List[Span]
         num_finished = attr.ib(type=int, default=0)  # type: int
 
+    @attr.s
+    class _Shard(object):
+        traces = attr.ib(
+            factory=lambda: defaultdict(lambda: SpanAggregator._Trace()),
+            type=DefaultDict[int, "SpanAggregator._Trace"],
+            repr=False,
+        )
+        if config._span_aggregator_rlock:
+            lock = attr.ib(factory=RLock, repr=False, type=Union[RLock, Lock])
+        else:
+            lock = attr.ib(factory=Lock, repr=False, type=Union[RLock, Lock])
+        # Tracks the number of spans created and tags each count with the api that was used
+        # ex: otel api, opentracing api, datadog api
+        span_metrics = attr.ib(
+            factory=lambda: {
+                "spans_created": defaultdict(int),
+                "spans_finished": defaultdict(int),
+            },
+            type=Dict[str, DefaultDict],
+            repr=False,
+        )
+
     _partial_flush_enabled = attr.ib(type=bool)
     _partial_flush_min_spans = attr.ib(type=int)
     _trace_processors = attr.ib(type=Iterable[TraceProcessor])
     _writer = attr.ib(type=TraceWriter)
-    _traces = attr.ib(
-        factory=lambda: defaultdict(lambda: SpanAggregator._Trace()),
+    _num_shards = attr.ib(type=int, default=attr.Factory(lambda: max(1, config._span_aggregator_shards)))
+    _processing_queue_size = attr.ib(
+        type=int,
+        default=attr.Factory(
+            lambda: config._trace_async_processing_queue_size if config._trace_async_processing_enabled else 0
+        ),
+    )
+    _shards = attr.ib(
+        default=attr.Factory(lambda self: [SpanAggregator._Shard() for _ in range(self._num_shards)], takes_self=True),
         init=False,
-        type=DefaultDict[int, "_Trace"],
+        type=List["SpanAggregator._Shard"],
         repr=False,
     )
-    if config._span_aggregator_rlock:
-        _lock = attr.ib(init=False, factory=RLock, repr=False, type=Union[RLock, Lock])
-    else:
-        _lock = attr.ib(init=False, factory=Lock, repr=False, type=Union[RLock, Lock])
-    # Tracks the number of spans created and tags each count with the api that was used
-    # ex: otel api, opentracing api, datadog api
-    _span_metrics = attr.ib(
+    _processing_worker = attr.ib(
+        default=attr.Factory(
+            lambda self: TraceProcessingWorker(self._processing_queue_size, self._process_trace)
+            if self._processing_queue_size > 0
+            else None,
+            takes_self=True,
+        ),
         init=False,
-        factory=lambda: {
-            "spans_created": defaultdict(int),
-            "spans_finished": defaultdict(int),
-        },
-        type=Dict[str, DefaultDict],
+        type=Optional[TraceProcessingWorker],
+        repr=False,
     )
 
+    def _shard(self, trace_id):
+        # type: (int) -> SpanAggregator._Shard
+        return self._shards[trace_id % self._num_shards]
+
     def on_span_start(self, span):
         # type: (Span) -> None
-        with self._lock:
-            trace = self._traces[span.trace_id]
-            trace.spans.append(span)
-            self._span_metrics["spans_created"][span._span_api] += 1
-            self._queue_span_count_metrics("spans_created", "integration_name")
+        shard = self._shard(span.trace_id)
+        with shard.lock:
+            shard.traces[span.trace_id].spans.append(span)
+            shard.span_metrics["spans_created"][span._span_api] += 1
+            self._queue_span_count_metrics(shard.span_metrics, "spans_created", "integration_name")
 
     def on_span_finish(self, span):
         # type: (Span) -> None
-        with self._lock:
-            self._span_metrics["spans_finished"][span._span_api] += 1
-            trace = self._traces[span.trace_id]
+        shard = self._shard(span.trace_id)
+        with shard.lock:
+            shard.span_metrics["spans_finished"][span._span_api] += 1
+            self._queue_span_count_metrics(shard.span_metrics, "spans_finished", "integration_name")
+
+            trace = shard.traces[span.trace_id]
             trace.num_finished += 1
             should_partial_flush = self._partial_flush_enabled and trace.num_finished >= self._partial_flush_min_spans
-            if trace.num_finished == len(trace.spans) or should_partial_flush:
-                trace_spans = trace.spans
-                trace.spans = []
-                if trace.num_finished < len(trace_spans):
-                    finished = []
-                    for s in trace_spans:
-                        if s.finished:
-                            finished.append(s)
-                        else:
-                            trace.spans.append(s)
-                else:
-                    finished = trace_spans
-
-                num_finished = len(finished)
-
-                if should_partial_flush:
-                    log.debug("Partially flushing %d spans for trace %d", num_finished, span.trace_id)
-                    finished[0].set_metric("_dd.py.partial_flush", num_finished)
-
-                trace.num_finished -= num_finished
-
-                if len(trace.spans) == 0:
-                    del self._traces[span.trace_id]
-
-                spans = finished  # type: Optional[List[Span]]
-                for tp in self._trace_processors:
-                    try:
-                        if spans is None:
-                            return
-                        spans = tp.process_trace(spans)
-                    except Exception:
-                        log.error("error applying processor %r", tp, exc_info=True)
-
-                self._queue_span_count_metrics("spans_finished", "integration_name")
-                self._writer.write(spans)
-                return
-
-            log.debug("trace %d has %d spans, %d finished", span.trace_id, len(trace.spans), trace.num_finished)
-            return None
+            if trace.num_finished != len(trace.spans) and not should_partial_flush:
+                log.debug("trace %d has %d spans, %d finished", span.trace_id, len(trace.spans), trace.num_finished)
+                return None
+
+            trace_spans = trace.spans
+            trace.spans = []
+            if trace.num_finished < len(trace_spans):
+                finished = []
+                for s in trace_spans:
+                    if s.finished:
+                        finished.append(s)
+                    else:
+                        trace.spans.append(s)
+            else:
+                finished = trace_spans
+
+            num_finished = len(finished)
+
+            if should_partial_flush:
+                log.debug("Partially flushing %d spans for trace %d", num_finished, span.trace_id)
+                finished[0].set_metric("_dd.py.partial_flush", num_finished)
+
+            trace.num_finished -= num_finished
+
+            if len(trace.spans) == 0:
+                del shard.traces[span.trace_id]
+
+            # DEV: The chunk is handed over while holding the shard lock so that
+            # the chunks of a partially flushed trace reach the writer in order.
+            if self._processing_worker is None:
+                self._process_trace(finished)
+                return None
+            accepted = self._processing_worker.put(finished)
+
+        if not accepted:
+            log.debug("trace processing queue is full, dropping %d spans of trace %d", num_finished, span.trace_id)
+            self._writer.record_dropped(finished, "full")
+
+    def _process_trace(self, spans):
+        # type: (Optional[List[Span]]) -> None
+        for tp in self._trace_processors:
+            try:
+                if spans is None:
+                    return
+                spans = tp.process_trace(spans)
+            except Exception:
+                log.error("error applying processor %r", tp, exc_info=True)
+
+        self._writer.write(spans)
+
+    def join(self):
+        # type: () -> None
+        """Wait until the finished trace chunks have been handed to the writer."""
+        if self._processing_worker is not None:
+            self._processing_worker.join()
 
     def shutdown(self, timeout):
         # type: (Optional[float]) -> None
@@ -264,7 +414,21 @@ class SpanAggregator(SpanProcessor):
             before exiting or :obj:`None` to block until flushing has successfully completed (default: :obj:`None`)
         :type timeout: :obj:`int` | :obj:`float` | :obj:`None`
         """
-        if self._span_metrics["spans_created"] or self._span_metrics["spans_finished"]:
+        if self._processing_worker is not None:
+            self._processing_worker.stop(timeout)
+
+        span_metrics = {
+            "spans_created": defaultdict(int),
+            "spans_finished": defaultdict(int),
+        }  # type: Dict[str, DefaultDict]
+        for shard in self._shards:
+            with shard.lock:
+                for metric_name, counts in shard.span_metrics.items():
+                    for tag_value, count in counts.items():
+                        span_metrics[metric_name][tag_value] += count
+                    counts.clear()
+
+        if span_metrics["spans_created"] or span_metrics["spans_finished"]:
             if config._telemetry_enabled:
                 # Telemetry writer is disabled when a process shutsdown. This is to support py3.12.
                 # Here we submit the remanining span creation metrics without restarting the periodic thread.
@@ -273,10 +437,10 @@ class SpanAggregator(SpanProcessor):
                 telemetry_writer._enabled = True
                 # on_span_start queue span created counts in batches of 100. This ensures all remaining counts are sent
                 # before the tracer is shutdown.
-                self._queue_span_count_metrics("spans_created", "integration_name", None)
+                self._queue_span_count_metrics(span_metrics, "spans_created", "integration_name", None)
                 # on_span_finish(...) queues span finish metrics in batches of 100.
                 # This ensures all remaining counts are sent before the tracer is shutdown.
-                self._queue_span_count_metrics("spans_finished", "integration_name", None)
+                self._queue_span_count_metrics(span_metrics, "spans_finished", "integration_name", None)
                 telemetry_writer.periodic(True)
                 # Disable the telemetry writer so no events/metrics/logs are queued during process shutdown
                 telemetry_writer.disable()
@@ -287,17 +451,17 @@ class SpanAggregator(SpanProcessor):
             # It's possible the writer never got started in the first place :(
             pass
 
-    def _queue_span_count_metrics(self, metric_name, tag_name, min_count=100):
-        # type: (str, str, Optional[int]) -> None
+    def _queue_span_count_metrics(self, span_metrics, metric_name, tag_name, min_count=100):
+        # type: (Dict[str, DefaultDict], str, str, Optional[int]) -> None
         """Queues a telemetry count metric for span created and span finished"""
         # perf: telemetry_metrics_writer.add_count_metric(...) is an expensive operation.
         # We should avoid calling this method on every invocation of span finish and span start.
-        if min_count is None or sum(self._span_metrics[metric_name].values()) >= min_count:
-            for tag_value, count in self._span_metrics[metric_name].items():
+        if min_count is None or sum(span_metrics[metric_name].values()) >= min_count:
+            for tag_value, count in span_metrics[metric_name].items():
                 telemetry_writer.add_count_metric(
                     TELEMETRY_NAMESPACE_TAG_TRACER, metric_name, count, tags=((tag_name, tag_value),)
                 )
-            self._span_metrics[metric_name] = defaultdict(int)
+            span_metrics[metric_name] = defaultdict(int)
 
 
 @attr.s
@@ -54,6 +54,12 @@ class TruncateSpanProcessor(SpanProcessor):
 
     def on_span_finish(self, span):
         span.resource = truncate_to_length(span.resource, MAX_RESOURCE_NAME_LENGTH)
+        shared_meta = span._shared_meta
+        if shared_meta is not None and any(
+            len(k) > MAX_META_KEY_LENGTH or len(v) > MAX_META_VALUE_LENGTH for k, v in shared_meta.items()
+        ):
+            # The tags shared with other spans cannot be truncated in place
+            span._unshare_meta()
         span._meta = {
             truncate_to_length(k, MAX_META_KEY_LENGTH): truncate_to_length(v, MAX_META_VALUE_LENGTH)
             for k, v in span._meta.items()
@@ -1,3 +1,4 @@
+from inspect import getattr_static
 import json
 import re
 from typing import TYPE_CHECKING
@@ -24,6 +25,7 @@ from ddtrace.internal.constants import _REJECT_PRIORITY_INDEX
 from ddtrace.internal.constants import SAMPLING_DECISION_TRACE_TAG_KEY
 from ddtrace.internal.glob_matching import GlobMatcher
 from ddtrace.internal.logger import get_logger
+from ddtrace.internal.utils.cache import LFUCache
 from ddtrace.sampling_rule import SamplingRule
 from ddtrace.settings import _config as config
 
@@ -41,8 +43,11 @@ except ImportError:
 if TYPE_CHECKING:  # pragma: no cover
     from typing import Any
     from typing import Dict
+    from typing import Iterable
     from typing import List
+    from typing import Sequence
     from typing import Text
+    from typing import Tuple
 
     from ddtrace.context import Context
     from ddtrace.span import Span
@@ -50,6 +55,8 @@ if TYPE_CHECKING:  # pragma: no cover
 # Big prime number to make hashing better distributed
 KNUTH_FACTOR = 1111111111111111111
 MAX_SPAN_ID = 2 ** 64
+# Max number of (service, name, resource, tags) keys to cache trace sampling rule decisions for
+DEFAULT_RULE_DECISION_CACHE_SIZE = 1024
 
 
 class SamplingMechanism(object):
@@ -309,7 +316,7 @@ def _set_priority(span, priority):
 
 
 def _get_highest_precedence_rule_matching(span, rules):
-    # type: (Span, List[SamplingRule]) -> Optional[SamplingRule]
+    # type: (Span, Sequence[SamplingRule]) -> Optional[SamplingRule]
     if not rules:
         return None
 
@@ -317,3 +324,110 @@ def _get_highest_precedence_rule_matching(span, rules):
         if rule.matches(span):
             return rule
     return None
+
+
+class SamplingRuleMatcher(object):
+    """Find the first of a list of trace sampling rules that matches a span.
+
+    The decision only depends on the service, name and resource of the span
+    and on the values of the tags used by the rules, so it is cached with that
+    key. The rules are snapshotted when the matcher is created: a new matcher
+    has to be created when the rules change, which also drops the cached
+    decisions. :class:`SamplingRuleList` takes care of this.
+
+    Rules that override how :class:`SamplingRule` matches spans can depend on
+    anything, so when there are any the rules are evaluated for every span.
+    """
+
+    # The SamplingRule methods the cached decisions rely on
+    _MATCHING_METHODS = ("matches", "glob_matches", "tag_match", "_matches", "_props_match", "_pattern_matches")
+
+    def __init__(self, rules, maxsize=DEFAULT_RULE_DECISION_CACHE_SIZE):
+        # type: (List[SamplingRule], int) -> None
+        self.rules = tuple(rules)
+        tag_keys = []  # type: List[str]
+        for rule in self.rules:
+            for key in rule._tag_value_matchers:
+                if key not in tag_keys:
+                    tag_keys.append(key)
+        self._tag_keys = tuple(tag_keys)
+        self._decisions = LFUCache(maxsize)
+        # DEV: Look the methods up without binding them, some are cached
+        # method descriptors.
+        self._cacheable = all(
+            getattr_static(type(rule), method) is getattr_static(SamplingRule, method)
+            for rule in self.rules
+            for method in self._MATCHING_METHODS
+        )
+
+    def _decide(self, key):
+        # type: (Tuple[Any, ...]) -> Optional[int]
+        props = (key[0], key[1], key[2])  # type: Tuple[Optional[str], str, Optional[str]]
+        tags = dict(zip(self._tag_keys, key[3:]))
+        for index, rule in enumerate(self.rules):
+            if (not rule._tag_value_matchers or rule.tag_match(tags)) and rule._props_match(props):
+                return index
+        return None
+
+    def match(self, span):
+        # type: (Span) -> Optional[SamplingRule]
+        if not self._cacheable:
+            return _get_highest_precedence_rule_matching(span, self.rules)
+
+        if not self.rules:
+            return None
+
+        key = (span.service, span.name, span.resource) + tuple(span.get_tag(k) for k in self._tag_keys)
+        try:
+            index = self._decisions.get(key, self._decide)
+        except TypeError:
+            # Unhashable property, e.g. a custom resource type
+            index = self._decide(key)
+        return self.rules[index] if index is not None else None
+
+
+def _invalidates_matcher(method):
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            # Drop the matcher once the rules have changed, so that a matcher
+            # created concurrently does not outlive them
+            self._matcher = None
+
+    return wrapper
+
+
+class SamplingRuleList(list):
+    """List of trace sampling rules that keeps a :class:`SamplingRuleMatcher` up to date.
+
+    The matcher is created when it is first needed and dropped whenever the
+    list is modified in place, so that appending or removing rules is taken
+    into account on the next match.
+    """
+
+    def __init__(self, rules=()):
+        # type: (Iterable[SamplingRule]) -> None
+        super(SamplingRuleList, self).__init__(rules)
+        self._matcher = None  # type: Optional[SamplingRuleMatcher]
+
+    @property
+    def matcher(self):
+        # type: () -> SamplingRuleMatcher
+        matcher = self._matcher
+        if matcher is None:
+            matcher = self._matcher = SamplingRuleMatcher(self)
+        return matcher
+
+    __setitem__ = _invalidates_matcher(list.__setitem__)
+    __delitem__ = _invalidates_matcher(list.__delitem__)
+    __iadd__ = _invalidates_matcher(list.__iadd__)
+    __imul__ = _invalidates_matcher(list.__imul__)
+    append = _invalidates_matcher(list.append)
+    extend = _invalidates_matcher(list.extend)
+    insert = _invalidates_matcher(list.insert)
+    pop = _invalidates_matcher(list.pop)
+    remove = _invalidates_matcher(list.remove)
+    clear = _invalidates_matcher(list.clear)
+    sort = _invalidates_matcher(list.sort)
+    reverse = _invalidates_matcher(list.reverse)
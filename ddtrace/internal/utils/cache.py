@@ -1,6 +1,9 @@
+from collections import OrderedDict
 from threading import RLock
 from typing import Any
 from typing import Callable
+from typing import Dict
+from typing import List
 from typing import Optional
 from typing import Type
 from typing import TypeVar
@@ -9,28 +12,97 @@ from ddtrace.internal.compat import getfullargspec
 from ddtrace.internal.compat import is_not_void_function
 
 
-miss = object()
-
 T = TypeVar("T")
 F = Callable[[T], Any]
 M = Callable[[Any, T], Any]
 
 
-class LFUCache(dict):
+class _Bucket(object):
+    """The keys of the cache entries filed under the same use count, in insertion order."""
+
+    __slots__ = ("count", "keys", "next")
+
+    def __init__(self, count, next_bucket=None):
+        # type: (int, Optional[_Bucket]) -> None
+        self.count = count
+        self.keys = OrderedDict()  # type: OrderedDict[Any, None]
+        self.next = next_bucket
+
+
+class LFUCache(object):
     """Simple LFU cache implementation.
 
     This cache is designed for memoizing functions with a single hashable
     argument. The eviction policy is LFU, i.e. the least frequently used values
-    are evicted when the cache is full. The amortized cost of shrinking the
-    cache when it grows beyond the requested size is O(log(size)).
+    are evicted when the cache is full. When that happens, the cache is shrunk
+    to half its size.
+
+    Cache hits only bump the use count of the entry and do not take any lock.
+    Entries are filed in a list of buckets ordered by use count, and are moved
+    to the next bucket lazily, when the eviction goes over them. Each entry is
+    moved at most once per hit, so the cost of evicting is amortized constant
+    time. Misses are serialized by a lock.
     """
 
     def __init__(self, maxsize=256):
         # type: (int) -> None
         self.maxsize = maxsize
         self.lock = RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._reset()
+
+    def _reset(self):
+        # type: () -> None
+        # Maps keys to their [value, count] entry
+        self._entries = {}  # type: Dict[Any, List[Any]]
+        self._head = None  # type: Optional[_Bucket]
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._entries)
+
+    def __contains__(self, key):
+        # type: (Any) -> bool
+        return key in self._entries
+
+    def clear(self):
+        # type: () -> None
+        """Remove all the values from the cache."""
+        with self.lock:
+            self._reset()
+
+    def _evict(self):
+        # type: () -> None
+        """Shrink the cache to half its max size.
 
-    def get(self, key, f):  # type: ignore[override]
+        The least frequently used entries are evicted first, and the oldest of those first.
+        """
+        entries = self._entries
+        target = self.maxsize >> 1
+        while len(entries) > target:
+            bucket = self._head
+            if bucket is None:
+                break
+            if not bucket.keys:
+                self._head = bucket.next
+                continue
+
+            key, _ = bucket.keys.popitem(last=False)
+            entry = entries[key]
+            if entry[1] > bucket.count:
+                # The entry was hit since it was filed: move it to the next bucket
+                following = bucket.next
+                if following is None or following.count != bucket.count + 1:
+                    following = bucket.next = _Bucket(bucket.count + 1, following)
+                following.keys[key] = None
+                continue
+
+            del entries[key]
+            self.evictions += 1
+
+    def get(self, key, f):
         # type: (T, F) -> Any
         """Get a value from the cache.
 
@@ -38,26 +110,32 @@ class LFUCache(dict):
         function ``f`` is called on the key to generate it. The return value is
         then stored in the cache and returned to the caller.
         """
-        if len(self) >= self.maxsize:
-            for _, h in zip(range(self.maxsize >> 1), sorted(self, key=lambda h: self[h][1])):
-                del self[h]
-
-        _ = super(LFUCache, self).get(key, miss)
-        if _ is not miss:
-            value, count = _
-            self[key] = (value, count + 1)
-            return value
+        entry = self._entries.get(key)
+        if entry is not None:
+            # DEV: Unlocked increments might be lost under contention, which is
+            # fine for approximating use counts.
+            entry[1] += 1
+            self.hits += 1
+            return entry[0]
 
         with self.lock:
-            _ = super(LFUCache, self).get(key, miss)
-            if _ is not miss:
-                value, count = _
-                self[key] = (value, count + 1)
-                return value
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1] += 1
+                self.hits += 1
+                return entry[0]
 
+            self.misses += 1
             value = f(key)
 
-            self[key] = (value, 1)
+            if len(self._entries) >= self.maxsize:
+                self._evict()
+
+            head = self._head
+            if head is None or head.count != 1:
+                head = self._head = _Bucket(1, head)
+            head.keys[key] = None
+            self._entries[key] = [value, 1]
 
             return value
 
@@ -40,6 +40,9 @@ from .writer_client import WRITER_CLIENTS
 from .writer_client import AgentWriterClientV3
 from .writer_client import AgentWriterClientV4
 from .writer_client import WriterClientBase
+from .writer_pool import ConnectionPool
+from .writer_pool import PayloadSender
+from .writer_spool import PayloadSpool
 
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -98,6 +101,11 @@ class TraceWriter(six.with_metaclass(abc.ABCMeta)):
         # type: () -> None
         pass
 
+    def record_dropped(self, spans, reason):
+        # type: (List[Span], str) -> None
+        """Account for a trace chunk that was dropped before reaching the writer."""
+        pass
+
 
 class LogWriter(TraceWriter):
     def __init__(
@@ -138,13 +146,35 @@ class LogWriter(TraceWriter):
         pass
 
 
-class HTTPWriter(periodic.PeriodicService, TraceWriter):
+class _FlushThread(periodic.AwakeablePeriodicThread):
+    """Writer thread that flushes every interval, or earlier when awakened.
+
+    Like :class:`ddtrace.internal.periodic.PeriodicThread`, the first flush
+    happens after the first interval rather than on start.
+    """
+
+    def run(self):
+        while True:
+            if self.request.wait(self.interval):
+                self.request.clear()
+                self.served.set()
+            if self.quit.is_set():
+                break
+            self._target()
+
+        if self._on_shutdown is not None:
+            self._on_shutdown()
+
+
+class HTTPWriter(periodic.AwakeablePeriodicService, TraceWriter):
     """Writer to an arbitrary HTTP intake endpoint."""
 
     RETRY_ATTEMPTS = 3
     HTTP_METHOD = "PUT"
     STATSD_NAMESPACE = "tracer"
 
+    __thread_class__ = _FlushThread
+
     def __init__(
         self,
         intake_url,  # type: str
@@ -160,6 +190,8 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
         sync_mode=False,  # type: bool
         reuse_connections=None,  # type: Optional[bool]
         headers=None,  # type: Optional[Dict[str, str]]
+        connection_pool_size=None,  # type: Optional[int]
+        flush_high_water_mark=None,  # type: Optional[float]
     ):
         # type: (...) -> None
 
@@ -196,6 +228,35 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
             config._trace_writer_connection_reuse if reuse_connections is None else reuse_connections
         )
 
+        # With a pool of connections, payloads are sent concurrently from
+        # worker threads so that a slow intake does not hold back the flushes.
+        self._connection_pool_size = (
+            config._trace_writer_connection_pool_size if connection_pool_size is None else connection_pool_size
+        )
+        self._conn_pool = None  # type: Optional[ConnectionPool]
+        self._sender = None  # type: Optional[PayloadSender]
+        if self._connection_pool_size > 1 and not self._sync_mode:
+            self._conn_pool = ConnectionPool(self._connection_pool_size)
+            self._sender = PayloadSender(self._connection_pool_size, self._send_encoded)
+
+        # Fraction of the encoder buffer that triggers a flush before the end
+        # of the current interval. Disabled when set to 0, the default, since
+        # reading the size of the buffer takes the encoder lock on every write.
+        self._flush_high_water_mark = (
+            config._trace_writer_flush_high_water_mark if flush_high_water_mark is None else flush_high_water_mark
+        )
+        self._early_flush_requested = False
+
+        # Payloads that cannot be sent are spooled to disk, if configured, and
+        # replayed in order once the intake is reachable again.
+        self._spool = None  # type: Optional[PayloadSpool]
+        if config._trace_writer_spool_dir:
+            self._spool = PayloadSpool(
+                config._trace_writer_spool_dir,
+                config._trace_writer_spool_max_size,
+                config._trace_writer_spool_max_age_seconds,
+            )
+
     def _intake_endpoint(self, client=None):
         return "{}/{}".format(self._intake_url(client), client.ENDPOINT if client else self._endpoint)
 
@@ -214,22 +275,31 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
 
     def _metrics_dist(self, name, count=1, tags=tuple()):
         # type: (str, int, Tuple) -> None
-        if tags in self._metrics[name]:
-            self._metrics[name][tags] += count
-        else:
-            self._metrics[name][tags] = count
+        # DEV: The metrics are updated without locking by the threads
+        # finishing traces and by the connection pool workers. An update made
+        # concurrently to the same metric might be lost, which is acceptable
+        # for health metrics.
+        metric = self._metrics[name]
+        metric[tags] = metric.get(tags, 0) + count
 
     def _metrics_reset(self):
         # type: () -> None
         self._metrics = defaultdict(dict)  # type: Dict[str, Dict[Tuple[str,...], int]]
 
-    def _set_drop_rate(self):
+    def _set_drop_rate(self, metrics):
+        # type: (Dict[str, Dict[Tuple[str,...], int]]) -> None
+        # DEV: sum() over the values does not let other threads update them
         dropped = sum(
-            counts
-            for metric in ("encoder.dropped.traces", "buffer.dropped.traces", "http.dropped.traces")
-            for _tags, counts in self._metrics[metric].items()
+            sum(metrics[metric].values())
+            for metric in (
+                "encoder.dropped.traces",
+                "buffer.dropped.traces",
+                "http.dropped.traces",
+                "spool.dropped.traces",
+                "processing.dropped.traces",
+            )
         )
-        accepted = sum(counts for _tags, counts in self._metrics["writer.accepted.traces"].items())
+        accepted = sum(metrics["writer.accepted.traces"].values())
 
         if dropped > accepted:
             # Sanity check, we cannot drop more traces than we accepted.
@@ -243,6 +313,13 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
 
         self._drop_sma.set(dropped, accepted)
 
+    def record_dropped(self, spans, reason):
+        # type: (List[Span], str) -> None
+        # DEV: The chunk counts as accepted so that it is part of the drop rate
+        self._metrics_dist("writer.accepted.traces")
+        self._metrics_dist("processing.dropped.traces", 1, tags=("reason:%s" % reason,))
+        self._metrics_dist("processing.dropped.spans", len(spans), tags=("reason:%s" % reason,))
+
     def _set_keep_rate(self, trace):
         if trace:
             trace[0].set_metric(KEEP_SPANS_RATE_KEY, 1.0 - self._drop_sma.get())
@@ -254,46 +331,77 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
                 self._conn.close()
                 self._conn = None
 
-    def _put(self, data, headers, client, no_trace):
-        # type: (bytes, Dict[str, str], WriterClientBase, bool) -> Response
+    def _new_connection(self, client, no_trace):
+        # type: (WriterClientBase, bool) -> ConnectionType
+        log.debug("creating new intake connection to %s with timeout %d", self._intake_url(client), self._timeout)
+        conn = get_connection(self._intake_url(client), self._timeout)
+        setattr(conn, _HTTPLIB_NO_TRACE_REQUEST, no_trace)
+        return conn
+
+    def _request(self, conn, data, headers, client):
+        # type: (ConnectionType, bytes, Dict[str, str], WriterClientBase) -> Response
         sw = StopWatch()
         sw.start()
+        log.debug("Sending request: %s %s %s", self.HTTP_METHOD, client.ENDPOINT, headers)
+        conn.request(
+            self.HTTP_METHOD,
+            client.ENDPOINT,
+            data,
+            headers,
+        )
+        resp = compat.get_connection_response(conn)
+        log.debug("Got response: %s %s", resp.status, resp.reason)
+        t = sw.elapsed()
+        if t >= self.interval:
+            log_level = logging.WARNING
+        else:
+            log_level = logging.DEBUG
+        log.log(log_level, "sent %s in %.5fs to %s", _human_size(len(data)), t, self._intake_endpoint(client))
+        return Response.from_http_response(resp)
+
+    def _put(self, data, headers, client, no_trace):
+        # type: (bytes, Dict[str, str], WriterClientBase, bool) -> Response
+        if self._conn_pool is not None:
+            return self._put_pooled(data, headers, client, no_trace)
+
         with self._conn_lck:
             if self._conn is None:
-                log.debug("creating new intake connection to %s with timeout %d", self.intake_url, self._timeout)
-                self._conn = get_connection(self._intake_url(client), self._timeout)
-                setattr(self._conn, _HTTPLIB_NO_TRACE_REQUEST, no_trace)
+                self._conn = self._new_connection(client, no_trace)
             try:
-                log.debug("Sending request: %s %s %s", self.HTTP_METHOD, client.ENDPOINT, headers)
-                self._conn.request(
-                    self.HTTP_METHOD,
-                    client.ENDPOINT,
-                    data,
-                    headers,
-                )
-                resp = compat.get_connection_response(self._conn)
-                log.debug("Got response: %s %s", resp.status, resp.reason)
-                t = sw.elapsed()
-                if t >= self.interval:
-                    log_level = logging.WARNING
-                else:
-                    log_level = logging.DEBUG
-                log.log(log_level, "sent %s in %.5fs to %s", _human_size(len(data)), t, self._intake_endpoint(client))
+                return self._request(self._conn, data, headers, client)
             except Exception:
                 # Always reset the connection when an exception occurs
                 self._reset_connection()
                 raise
-            else:
-                return Response.from_http_response(resp)
             finally:
                 # Reset the connection if reusing connections is disabled.
                 if not self._reuse_connections:
                     self._reset_connection()
 
+    def _put_pooled(self, data, headers, client, no_trace):
+        # type: (bytes, Dict[str, str], WriterClientBase, bool) -> Response
+        url = self._intake_url(client)
+        conn = self._conn_pool.acquire(url)  # type: ignore[union-attr]
+        if conn is None:
+            conn = self._new_connection(client, no_trace)
+        try:
+            response = self._request(conn, data, headers, client)
+        except Exception:
+            # Never give a connection back to the pool after an error
+            conn.close()
+            raise
+        if self._reuse_connections:
+            self._conn_pool.release(url, conn)  # type: ignore[union-attr]
+        else:
+            conn.close()
+        return response
+
     def _get_finalized_headers(self, count, client):
         # type: (int, WriterClientBase) -> dict
         headers = self._headers.copy()
-        headers.update({"Content-Type": client.encoder.content_type})  # type: ignore[attr-defined]
+        headers.update({"Content-Type": client.encoder.content_type})
+        if client.compression is not None:
+            headers["Content-Encoding"] = client.compression
         if hasattr(client, "_headers"):
             headers.update(client._headers)
         return headers
@@ -331,6 +439,10 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
             self._metrics_dist("http.dropped.traces", count)
         return response
 
+    def _on_unsupported_endpoint(self, payload, count, client, response):
+        # type: (bytes, int, WriterClientBase, Response) -> None
+        """Handle a 404 or 415 response from the intake to a payload sent with ``client``."""
+
     def write(self, spans=None):
         for client in self._clients:
             self._write_with_client(client, spans=spans)
@@ -382,14 +494,39 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
         else:
             self._metrics_dist("buffer.accepted.traces", 1)
             self._metrics_dist("buffer.accepted.spans", len(spans))
+            if self._flush_high_water_mark and not self._sync_mode:
+                self._maybe_flush_early(client)
+
+    def _maybe_flush_early(self, client):
+        # type: (WriterClientBase) -> None
+        """Awake the writer thread if the encoder buffer is above the high-water mark."""
+        if self._early_flush_requested or self._worker is None:
+            return
+        if client.encoder.size < self._flush_high_water_mark * client.encoder.max_size:
+            return
+        self._early_flush_requested = True
+        # DEV: Do not wait for the request to be served, this is called by
+        # the threads finishing traces.
+        self.awake(wait=False)
 
     def flush_queue(self, raise_exc=False):
+        # DEV: Spooled payloads are replayed before the buffered traces are
+        # sent, but a replay that fails does not hold back the new payloads,
+        # so payloads are not guaranteed to reach the intake in order. The
+        # spool is not replayed when ``raise_exc`` is set: the caller wants
+        # the errors of the buffered traces, not those of older payloads.
         try:
+            if self._spool is not None and len(self._spool) and not raise_exc:
+                self._replay_spool()
             for client in self._clients:
                 self._flush_queue_with_client(client, raise_exc=raise_exc)
         finally:
-            self._set_drop_rate()
+            # DEV: The metrics updated after the swap, e.g. by the connection
+            # pool workers, are accounted for in the next flush.
+            metrics = self._metrics
             self._metrics_reset()
+            self._set_drop_rate(metrics)
+            self._report_metrics(metrics)
 
     def _flush_queue_with_client(self, client, raise_exc=False):
         # type: (WriterClientBase, bool) -> None
@@ -398,15 +535,31 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
             encoded = client.encoder.encode()
             if encoded is None:
                 return
+            # Compress on the flush thread, never on the threads finishing traces
+            encoded = client.compress(encoded)
         except Exception:
             log.error("failed to encode trace with encoder %r", client.encoder, exc_info=True)
             self._metrics_dist("encoder.dropped.traces", n_traces)
             return
 
+        if self._sender is not None and not raise_exc:
+            if not self._sender.submit(encoded, n_traces, client):
+                # Every connection is busy: send the payload from the flush
+                # thread rather than dropping it
+                log.debug("connection pool is busy, sending %d traces from the flush thread", n_traces)
+                self._metrics_dist("writer.pool.busy")
+                self._send_encoded(encoded, n_traces, client)
+        else:
+            self._send_encoded(encoded, n_traces, client, raise_exc=raise_exc)
+
+    def _send_encoded(self, encoded, n_traces, client, raise_exc=False):
+        # type: (bytes, int, WriterClientBase, bool) -> None
         try:
             self._send_payload_with_backoff(encoded, n_traces, client)
         except Exception:
             self._metrics_dist("http.errors", tags=("type:err",))
+            if not raise_exc and self._spool_payload(encoded, n_traces, client):
+                return
             self._metrics_dist("http.dropped.bytes", len(encoded))
             self._metrics_dist("http.dropped.traces", n_traces)
             if raise_exc:
@@ -427,11 +580,92 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
                 # This really isn't ideal as now we're going to do a ton of socket calls.
                 self.dogstatsd.distribution("datadog.%s.http.sent.bytes" % namespace, len(encoded))
                 self.dogstatsd.distribution("datadog.%s.http.sent.traces" % namespace, n_traces)
-                for name, metric_tags in self._metrics.items():
-                    for tags, count in metric_tags.items():
-                        self.dogstatsd.distribution("datadog.%s.%s" % (namespace, name), count, tags=list(tags))
+
+    def _report_metrics(self, metrics):
+        # type: (Dict[str, Dict[Tuple[str,...], int]]) -> None
+        if config.health_metrics_enabled and self.dogstatsd:
+            namespace = self.STATSD_NAMESPACE
+            # DEV: Copy the items, a late update might still add some
+            for name, metric_tags in list(metrics.items()):
+                for tags, count in list(metric_tags.items()):
+                    self.dogstatsd.distribution("datadog.%s.%s" % (namespace, name), count, tags=list(tags))
+
+    def _spool_payload(self, payload, n_traces, client):
+        # type: (bytes, int, WriterClientBase) -> bool
+        """Spool a payload that could not be sent. Return whether it was spooled."""
+        if self._spool is None:
+            return False
+        try:
+            evicted = self._spool.append(client.ENDPOINT, payload, n_traces)
+        except Exception:
+            log.error(
+                "failed to spool %d traces for intake at %s", n_traces, self._intake_endpoint(client), exc_info=True
+            )
+            return False
+        if evicted:
+            self._metrics_dist("spool.dropped.traces", evicted, tags=("reason:full",))
+        self._metrics_dist("spool.accepted.traces", n_traces)
+        log.debug("spooled %d traces for intake at %s", n_traces, self._intake_endpoint(client))
+        return True
+
+    def _replay_spool(self):
+        # type: () -> None
+        spool = self._spool
+        if spool is None:
+            return
+
+        def send(endpoint, payload, count):
+            # type: (str, bytes, int) -> bool
+            # DEV: Look the client up on every payload, the API might have
+            # been downgraded by a previous one.
+            client = next((client for client in self._clients if client.ENDPOINT == endpoint), None)
+            if client is None:
+                # The payload was encoded for an API that is no longer used
+                return False
+            headers = self._get_finalized_headers(count, client)
+            self._metrics_dist("http.requests")
+            response = self._put(payload, headers, client, no_trace=True)
+            if 200 <= response.status < 300:
+                self._metrics_dist("http.sent.bytes", len(payload))
+                return True
+
+            self._metrics_dist("http.errors", tags=("type:%s" % response.status,))
+            if response.status in (404, 415):
+                self._on_unsupported_endpoint(payload, count, client, response)
+                return False
+            if 400 <= response.status < 500 and response.status not in (408, 429):
+                # The intake will never accept this payload
+                log.error(
+                    "failed to replay spooled traces to intake at %s: HTTP error status %s, reason %s, "
+                    "dropping %d traces",
+                    self._intake_endpoint(client),
+                    response.status,
+                    response.reason,
+                    count,
+                )
+                return False
+            # Keep the payload spooled until the intake accepts it
+            raise RuntimeError("HTTP error status %s, reason %s" % (response.status, response.reason))
+
+        try:
+            delivered, discarded, expired = spool.replay(send)
+        except Exception:
+            log.debug("failed to replay spooled traces, %d traces still spooled", spool.traces, exc_info=True)
+            return
+
+        if delivered:
+            self._metrics_dist("spool.replayed.traces", delivered)
+        if discarded:
+            self._metrics_dist("spool.dropped.traces", discarded, tags=("reason:rejected",))
+        if expired:
+            self._metrics_dist("spool.dropped.traces", expired, tags=("reason:expired",))
 
     def periodic(self):
+        if self._early_flush_requested:
+            self._early_flush_requested = False
+            self._metrics_dist("writer.flushes", tags=("trigger:early",))
+        else:
+            self._metrics_dist("writer.flushes", tags=("trigger:periodic",))
         self.flush_queue(raise_exc=False)
 
     def _stop_service(
@@ -446,7 +680,18 @@ class HTTPWriter(periodic.PeriodicService, TraceWriter):
     def on_shutdown(self):
         try:
             self.periodic()
+            # A trace put in an encoder buffer while it was being retired is
+            # only encoded on the next turn of the buffer: go around the ring
+            # so that it is not lost.
+            for _ in range(1, max(getattr(client.encoder, "buffers", 1) for client in self._clients)):
+                self.flush_queue(raise_exc=False)
         finally:
+            if self._sender is not None:
+                self._sender.stop(timeout=self._timeout * (self.RETRY_ATTEMPTS + 1))
+            if self._conn_pool is not None:
+                self._conn_pool.close()
+            if self._spool is not None:
+                self._spool.close()
             self._reset_connection()
 
 
@@ -479,6 +724,8 @@ class AgentWriter(HTTPWriter):
         api_version=None,  # type: Optional[str]
         reuse_connections=None,  # type: Optional[bool]
         headers=None,  # type: Optional[Dict[str, str]]
+        connection_pool_size=None,  # type: Optional[int]
+        flush_high_water_mark=None,  # type: Optional[float]
     ):
         # type: (...) -> None
         if processing_interval is None:
@@ -530,7 +777,7 @@ class AgentWriter(HTTPWriter):
                 }
             )
 
-        _headers.update({"Content-Type": client.encoder.content_type})  # type: ignore[attr-defined]
+        _headers.update({"Content-Type": client.encoder.content_type})
         additional_header_str = os.environ.get("_DD_TRACE_WRITER_ADDITIONAL_HEADERS")
         if additional_header_str is not None:
             _headers.update(parse_tags_str(additional_header_str))
@@ -546,6 +793,8 @@ class AgentWriter(HTTPWriter):
             sync_mode=sync_mode,
             reuse_connections=reuse_connections,
             headers=_headers,
+            connection_pool_size=connection_pool_size,
+            flush_high_water_mark=flush_high_water_mark,
         )
 
     def recreate(self):
@@ -560,6 +809,8 @@ class AgentWriter(HTTPWriter):
             dogstatsd=self.dogstatsd,
             sync_mode=self._sync_mode,
             api_version=self._api_version,
+            connection_pool_size=self._connection_pool_size,
+            flush_high_water_mark=self._flush_high_water_mark,
         )
 
     @property
@@ -589,22 +840,26 @@ class AgentWriter(HTTPWriter):
             return payload
         raise ValueError()
 
+    def _on_unsupported_endpoint(self, payload, count, client, response):
+        # type: (bytes, int, WriterClientBase, Response) -> None
+        log.debug("calling endpoint '%s' but received %s; downgrading API", client.ENDPOINT, response.status)
+        try:
+            payload = self._downgrade(payload, response, client)
+        except ValueError:
+            log.error(
+                "unsupported endpoint '%s': received response %s from intake (%s)",
+                client.ENDPOINT,
+                response.status,
+                self.intake_url,
+            )
+        else:
+            if payload is not None:
+                self._send_payload(payload, count, client)
+
     def _send_payload(self, payload, count, client):
         response = super(AgentWriter, self)._send_payload(payload, count, client)
         if response.status in [404, 415]:
-            log.debug("calling endpoint '%s' but received %s; downgrading API", client.ENDPOINT, response.status)
-            try:
-                payload = self._downgrade(payload, response, client)
-            except ValueError:
-                log.error(
-                    "unsupported endpoint '%s': received response %s from intake (%s)",
-                    client.ENDPOINT,
-                    response.status,
-                    self.intake_url,
-                )
-            else:
-                if payload is not None:
-                    self._send_payload(payload, count, client)
+            self._on_unsupported_endpoint(payload, count, client, response)
         elif response.status < 400 and isinstance(self._sampler, BasePrioritySampler):
             result_traces_json = response.get_json()
             if result_traces_json and "rate_by_service" in result_traces_json:
@@ -1,5 +1,43 @@
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Union
+import zlib
+
+from ddtrace import config
+
 from .._encoding import BufferedEncoder
 from ..encoding import MSGPACK_ENCODERS
+from ..encoding import MultiBufferedEncoder
+
+
+def _gzip(payload, level=1):
+    # type: (bytes, int) -> bytes
+    """Compress a payload to the gzip format, favouring speed by default."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(payload) + compressor.flush()
+
+
+COMPRESSORS = {
+    "gzip": _gzip,
+}  # type: Dict[str, Callable[[bytes], bytes]]
+
+
+def _create_encoder(encoding, buffer_size, max_payload_size):
+    # type: (str, int, int) -> Union[BufferedEncoder, MultiBufferedEncoder]
+    """Create the encoder for the given encoding, multi-buffered if configured."""
+    encoder_cls = MSGPACK_ENCODERS[encoding]
+    if config._trace_writer_encoder_buffers > 1:
+        return MultiBufferedEncoder(
+            encoder_cls,
+            buffer_size,
+            max_payload_size,
+            config._trace_writer_encoder_buffers,
+        )
+    return encoder_cls(
+        max_size=buffer_size,
+        max_item_size=max_payload_size,
+    )
 
 
 class WriterClientBase(object):
@@ -9,9 +47,24 @@ class WriterClientBase(object):
 
     def __init__(
         self,
-        encoder,  # type: BufferedEncoder
+        encoder,  # type: Union[BufferedEncoder, MultiBufferedEncoder]
+        compression=None,  # type: Optional[str]
     ):
+        if compression is not None and compression not in COMPRESSORS:
+            raise ValueError(
+                "Unsupported compression: '%s'. The supported compressions are: %s"
+                % (compression, ", ".join(sorted(COMPRESSORS.keys())))
+            )
         self.encoder = encoder
+        # The compression is also the value of the Content-Encoding header
+        self.compression = compression
+
+    def compress(self, payload):
+        # type: (bytes) -> bytes
+        """Compress an encoded payload, if the client is configured to do so."""
+        if self.compression is None:
+            return payload
+        return COMPRESSORS[self.compression](payload)
 
 
 class AgentWriterClientV5(WriterClientBase):
@@ -19,10 +72,8 @@ class AgentWriterClientV5(WriterClientBase):
 
     def __init__(self, buffer_size, max_payload_size):
         super(AgentWriterClientV5, self).__init__(
-            MSGPACK_ENCODERS["v0.5"](
-                max_size=buffer_size,
-                max_item_size=max_payload_size,
-            )
+            _create_encoder("v0.5", buffer_size, max_payload_size),
+            compression=config._trace_writer_compression,
         )
 
 
@@ -31,10 +82,8 @@ class AgentWriterClientV4(WriterClientBase):
 
     def __init__(self, buffer_size, max_payload_size):
         super(AgentWriterClientV4, self).__init__(
-            MSGPACK_ENCODERS["v0.4"](
-                max_size=buffer_size,
-                max_item_size=max_payload_size,
-            )
+            _create_encoder("v0.4", buffer_size, max_payload_size),
+            compression=config._trace_writer_compression,
         )
 
 
@@ -0,0 +1,127 @@
+import threading
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from six.moves import queue
+
+from ..logger import get_logger
+
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ..agent import ConnectionType
+
+
+log = get_logger(__name__)
+
+
+class ConnectionPool(object):
+    """A bounded pool of idle intake connections, grouped by intake URL."""
+
+    def __init__(self, size):
+        # type: (int) -> None
+        self.size = size
+        self._idle = {}  # type: Dict[str, List[ConnectionType]]
+        self._lock = threading.Lock()
+
+    def acquire(self, url):
+        # type: (str) -> Optional[ConnectionType]
+        """Return an idle connection to ``url``, or ``None`` if there is none."""
+        with self._lock:
+            idle = self._idle.get(url)
+            if idle:
+                return idle.pop()
+        return None
+
+    def release(self, url, conn):
+        # type: (str, ConnectionType) -> None
+        """Give a connection back to the pool, closing it if the pool is full."""
+        with self._lock:
+            idle = self._idle.setdefault(url, [])
+            if len(idle) < self.size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        # type: () -> None
+        """Close all the idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+class _SenderThread(threading.Thread):
+    _ddtrace_profiling_ignore = True
+
+
+class PayloadSender(object):
+    """Send payloads concurrently from a fixed number of worker threads.
+
+    Pending payloads are kept in a queue bounded by the number of workers.
+    Submitting never blocks: a payload is rejected when every worker is busy
+    and the queue is full. Workers are started on the first submission.
+    """
+
+    def __init__(
+        self,
+        size,  # type: int
+        send,  # type: Callable[..., Any]
+    ):
+        # type: (...) -> None
+        self.size = size
+        self._send = send
+        self._queue = queue.Queue(maxsize=size)  # type: queue.Queue
+        self._workers = []  # type: List[_SenderThread]
+        self._lock = threading.Lock()
+
+    def _run(self):
+        # type: () -> None
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._send(*job)
+            except Exception:
+                log.error("failed to send payload", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    def submit(self, *args):
+        # type: (Any) -> bool
+        """Queue a payload to be sent by calling ``send(*args)`` on a worker.
+
+        Return whether the payload was queued, or ``False`` if the queue is full.
+        """
+        with self._lock:
+            if not self._workers:
+                for i in range(self.size):
+                    worker = _SenderThread(target=self._run, name="%s:%d" % (self.__class__.__name__, i))
+                    worker.daemon = True
+                    worker.start()
+                    self._workers.append(worker)
+        try:
+            self._queue.put_nowait(args)
+        except queue.Full:
+            return False
+        return True
+
+    def stop(self, timeout=None):
+        # type: (Optional[float]) -> None
+        """Send the pending payloads and stop the workers."""
+        with self._lock:
+            workers, self._workers = self._workers, []
+        try:
+            for _ in workers:
+                self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            log.warning("timed out waiting for %d payload sender(s) to stop", len(workers))
+            return
+        for worker in workers:
+            worker.join(timeout)
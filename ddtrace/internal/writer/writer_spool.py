@@ -0,0 +1,258 @@
+from collections import deque
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from typing import Callable
+from typing import Deque
+from typing import Optional
+from typing import Tuple
+
+from .. import forksafe
+from ..logger import get_logger
+
+
+log = get_logger(__name__)
+
+
+# Record header: payload size, number of traces, spooling time, endpoint size
+_HEADER = struct.Struct("<IIdH")
+
+DEFAULT_SEGMENT_SIZE = 8 << 20  # 8 MB
+
+
+class _Segment(object):
+    """Append-only, memory-mapped segment file of spooled payloads.
+
+    Records are appended at the write offset and consumed in order from the
+    read offset. The file is allocated with its full size on creation.
+    """
+
+    def __init__(self, path, size):
+        # type: (str, int) -> None
+        self.path = path
+        self.size = size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            os.ftruncate(fd, size)
+            self._mmap = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self.write_offset = 0
+        self.read_offset = 0
+        self.records = 0
+        self.traces = 0
+
+    def append(self, endpoint, payload, count, timestamp):
+        # type: (bytes, bytes, int, float) -> bool
+        """Append a record, unless there is not enough room left in the segment."""
+        offset = self.write_offset
+        if offset + _HEADER.size + len(endpoint) + len(payload) > self.size:
+            return False
+
+        _HEADER.pack_into(self._mmap, offset, len(payload), count, timestamp, len(endpoint))
+        offset += _HEADER.size
+        self._mmap[offset : offset + len(endpoint)] = endpoint
+        offset += len(endpoint)
+        self._mmap[offset : offset + len(payload)] = payload
+        self.write_offset = offset + len(payload)
+        self.records += 1
+        self.traces += count
+        return True
+
+    def peek(self):
+        # type: () -> Optional[Tuple[str, bytes, int, float, int]]
+        """Return the next record to consume and the offset of the following one."""
+        if self.read_offset >= self.write_offset:
+            return None
+
+        offset = self.read_offset
+        size, count, timestamp, endpoint_size = _HEADER.unpack_from(self._mmap, offset)
+        offset += _HEADER.size
+        endpoint = self._mmap[offset : offset + endpoint_size].decode("utf-8")
+        offset += endpoint_size
+        return endpoint, self._mmap[offset : offset + size], count, timestamp, offset + size
+
+    def consume(self, next_offset, count):
+        # type: (int, int) -> None
+        self.read_offset = next_offset
+        self.records -= 1
+        self.traces -= count
+        if self.read_offset >= self.write_offset:
+            # Everything was consumed, start writing from the beginning again
+            self.read_offset = self.write_offset = 0
+
+    def close(self, remove=True):
+        # type: (bool) -> None
+        self._mmap.close()
+        if remove:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                log.debug("failed to remove spool segment %s", self.path, exc_info=True)
+
+
+class PayloadSpool(object):
+    """A bounded on-disk queue of encoded payloads waiting to be sent.
+
+    Payloads are appended to memory-mapped segment files in a directory
+    private to the process, and replayed in order. When the spool is full, the
+    oldest segment is evicted to make room for new payloads. Payloads older
+    than ``max_age`` seconds are discarded on replay instead of being sent.
+    """
+
+    def __init__(
+        self,
+        directory,  # type: str
+        max_size,  # type: int
+        max_age,  # type: float
+        segment_size=DEFAULT_SEGMENT_SIZE,  # type: int
+    ):
+        # type: (...) -> None
+        self.directory = directory
+        self.max_size = max_size
+        self.max_age = max_age
+        self.segment_size = min(segment_size, max_size)
+        self._lock = threading.Lock()
+        self._reset()
+        forksafe.register(self._after_fork)
+
+    def _reset(self):
+        # type: () -> None
+        self._path = None  # type: Optional[str]
+        self._next_segment = 0
+        self._segments = deque()  # type: Deque[_Segment]
+        self._size = 0
+        self._records = 0
+        self._traces = 0
+
+    def _after_fork(self):
+        # type: () -> None
+        # The segments belong to the parent process: unmap them without
+        # removing the files, and start from an empty spool.
+        for segment in self._segments:
+            segment.close(remove=False)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def __len__(self):
+        # type: () -> int
+        return self._records
+
+    @property
+    def size(self):
+        # type: () -> int
+        """The size in bytes of the segment files."""
+        return self._size
+
+    @property
+    def traces(self):
+        # type: () -> int
+        """The number of spooled traces."""
+        return self._traces
+
+    def _new_segment(self, size):
+        # type: (int) -> _Segment
+        if self._path is None:
+            self._path = tempfile.mkdtemp(prefix="ddtrace-spool-%d-" % os.getpid(), dir=self.directory)
+        segment = _Segment(os.path.join(self._path, "%08d.seg" % self._next_segment), size)
+        self._next_segment += 1
+        self._segments.append(segment)
+        self._size += size
+        return segment
+
+    def _remove_segment(self):
+        # type: () -> _Segment
+        segment = self._segments.popleft()
+        self._size -= segment.size
+        self._records -= segment.records
+        self._traces -= segment.traces
+        segment.close()
+        return segment
+
+    def append(self, endpoint, payload, count):
+        # type: (str, bytes, int) -> int
+        """Append a payload of ``count`` traces for ``endpoint`` to the spool.
+
+        Return the number of spooled traces evicted to make room for the
+        payload. Raise ``ValueError`` if the payload is larger than the spool.
+        """
+        encoded_endpoint = endpoint.encode("utf-8")
+        record_size = _HEADER.size + len(encoded_endpoint) + len(payload)
+        if record_size > self.max_size:
+            raise ValueError("payload of %d bytes does not fit in a spool of %d bytes" % (record_size, self.max_size))
+
+        evicted = 0
+        timestamp = time.time()
+        with self._lock:
+            if self._segments and self._segments[-1].append(encoded_endpoint, payload, count, timestamp):
+                self._records += 1
+                self._traces += count
+                return evicted
+
+            segment_size = max(self.segment_size, record_size)
+            while self._segments and self._size + segment_size > self.max_size:
+                evicted += self._remove_segment().traces
+
+            segment = self._new_segment(segment_size)
+            segment.append(encoded_endpoint, payload, count, timestamp)
+            self._records += 1
+            self._traces += count
+        return evicted
+
+    def replay(self, send):
+        # type: (Callable[[str, bytes, int], bool]) -> Tuple[int, int, int]
+        """Replay the spooled payloads in order by calling ``send(endpoint, payload, count)``.
+
+        ``send`` returns whether the payload was delivered, or ``False`` if it
+        must be discarded. If ``send`` raises, the payload is kept in the spool
+        and the exception is propagated.
+
+        Return the number of traces that were delivered, discarded and expired.
+        """
+        delivered = discarded = expired = 0
+        while True:
+            with self._lock:
+                if not self._segments:
+                    break
+                segment = self._segments[0]
+                record = segment.peek()
+                if record is None:
+                    if len(self._segments) == 1:
+                        break
+                    self._remove_segment()
+                    continue
+
+            endpoint, payload, count, timestamp, next_offset = record
+            if time.time() - timestamp > self.max_age:
+                expired += count
+            elif send(endpoint, payload, count):
+                delivered += count
+            else:
+                discarded += count
+
+            with self._lock:
+                # DEV: The segment might have been evicted while sending
+                if self._segments and self._segments[0] is segment:
+                    segment.consume(next_offset, count)
+                    self._records -= 1
+                    self._traces -= count
+
+        return delivered, discarded, expired
+
+    def close(self):
+        # type: () -> None
+        """Remove the spooled payloads."""
+        try:
+            forksafe.unregister(self._after_fork)
+        except ValueError:
+            pass
+        with self._lock:
+            while self._segments:
+                self._remove_segment()
+            if self._path is not None:
+                shutil.rmtree(self._path, ignore_errors=True)
+            self._reset()
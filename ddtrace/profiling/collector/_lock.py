@@ -6,15 +6,11 @@ import sys
 import typing
 
 import attr
-from six.moves import _thread
 import wrapt
 
-from ddtrace.internal import compat
-from ddtrace.profiling import _threading
 from ddtrace.profiling import collector
 from ddtrace.profiling import event
-from ddtrace.profiling.collector import _task
-from ddtrace.profiling.collector import _traceback
+from ddtrace.profiling.collector import _lock_proxy
 from ddtrace.settings.profiling import config
 
 
@@ -40,12 +36,6 @@ class LockReleaseEvent(LockEventBase):
     locked_for_ns = attr.ib(default=0, type=int)
 
 
-def _current_thread():
-    # type: (...) -> typing.Tuple[int, str]
-    thread_id = _thread.get_ident()
-    return thread_id, _threading.get_thread_name(thread_id)
-
-
 # We need to know if wrapt is compiled in C or not. If it's not using the C module, then the wrappers function will
 # appear in the stack trace and we need to hide it.
 if os.environ.get("WRAPT_DISABLE_EXTENSIONS"):
@@ -60,111 +50,11 @@ else:
         del _w
 
 
-class _ProfiledLock(wrapt.ObjectProxy):
+class _ProfiledLock(_lock_proxy.ProfiledLock):
 
     ACQUIRE_EVENT_CLASS = LockAcquireEvent
     RELEASE_EVENT_CLASS = LockReleaseEvent
 
-    def __init__(self, wrapped, recorder, tracer, max_nframes, capture_sampler, endpoint_collection_enabled):
-        wrapt.ObjectProxy.__init__(self, wrapped)
-        self._self_recorder = recorder
-        self._self_tracer = tracer
-        self._self_max_nframes = max_nframes
-        self._self_capture_sampler = capture_sampler
-        self._self_endpoint_collection_enabled = endpoint_collection_enabled
-        frame = sys._getframe(2 if WRAPT_C_EXT else 3)
-        code = frame.f_code
-        self._self_name = "%s:%d" % (os.path.basename(code.co_filename), frame.f_lineno)
-
-    def __aenter__(self):
-        return self.__wrapped__.__aenter__()
-
-    def __aexit__(self, *args, **kwargs):
-        return self.__wrapped__.__aexit__(*args, **kwargs)
-
-    def acquire(self, *args, **kwargs):
-        if not self._self_capture_sampler.capture():
-            return self.__wrapped__.acquire(*args, **kwargs)
-
-        start = compat.monotonic_ns()
-        try:
-            return self.__wrapped__.acquire(*args, **kwargs)
-        finally:
-            try:
-                end = self._self_acquired_at = compat.monotonic_ns()
-                thread_id, thread_name = _current_thread()
-                task_id, task_name, task_frame = _task.get_task(thread_id)
-
-                if task_frame is None:
-                    frame = sys._getframe(1)
-                else:
-                    frame = task_frame
-
-                frames, nframes = _traceback.pyframe_to_frames(frame, self._self_max_nframes)
-
-                event = self.ACQUIRE_EVENT_CLASS(
-                    lock_name=self._self_name,
-                    frames=frames,
-                    nframes=nframes,
-                    thread_id=thread_id,
-                    thread_name=thread_name,
-                    task_id=task_id,
-                    task_name=task_name,
-                    wait_time_ns=end - start,
-                    sampling_pct=self._self_capture_sampler.capture_pct,
-                )
-
-                if self._self_tracer is not None:
-                    event.set_trace_info(self._self_tracer.current_span(), self._self_endpoint_collection_enabled)
-
-                self._self_recorder.push_event(event)
-            except Exception:
-                pass  # nosec
-
-    def release(self, *args, **kwargs):
-        # type (typing.Any, typing.Any) -> None
-        try:
-            return self.__wrapped__.release(*args, **kwargs)
-        finally:
-            try:
-                if hasattr(self, "_self_acquired_at"):
-                    try:
-                        end = compat.monotonic_ns()
-                        thread_id, thread_name = _current_thread()
-                        task_id, task_name, task_frame = _task.get_task(thread_id)
-
-                        if task_frame is None:
-                            frame = sys._getframe(1)
-                        else:
-                            frame = task_frame
-
-                        frames, nframes = _traceback.pyframe_to_frames(frame, self._self_max_nframes)
-
-                        event = self.RELEASE_EVENT_CLASS(
-                            lock_name=self._self_name,
-                            frames=frames,
-                            nframes=nframes,
-                            thread_id=thread_id,
-                            thread_name=thread_name,
-                            task_id=task_id,
-                            task_name=task_name,
-                            locked_for_ns=end - self._self_acquired_at,
-                            sampling_pct=self._self_capture_sampler.capture_pct,
-                        )
-
-                        if self._self_tracer is not None:
-                            event.set_trace_info(
-                                self._self_tracer.current_span(), self._self_endpoint_collection_enabled
-                            )
-
-                        self._self_recorder.push_event(event)
-                    finally:
-                        del self._self_acquired_at
-            except Exception:
-                pass  # nosec
-
-    acquire_lock = acquire
-
 
 class FunctionWrapper(wrapt.FunctionWrapper):
     # Override the __get__ method: whatever happens, _allocate_lock is always considered by Python like a "static"
@@ -174,6 +64,11 @@ class FunctionWrapper(wrapt.FunctionWrapper):
         return self
 
 
+def _create_capture_sampler(collector):
+    # type: (LockCollector) -> _lock_proxy.CaptureSampler
+    return _lock_proxy.CaptureSampler(collector.capture_pct)
+
+
 @attr.s
 class LockCollector(collector.CaptureSamplerCollector):
     """Record lock usage."""
@@ -183,6 +78,9 @@ class LockCollector(collector.CaptureSamplerCollector):
 
     tracer = attr.ib(default=None)
 
+    # Locks check the compiled sampler without calling into Python
+    _capture_sampler = attr.ib(default=attr.Factory(_create_capture_sampler, takes_self=True), init=False, repr=False)
+
     _original = attr.ib(init=False, repr=False, type=typing.Any, cmp=False)
 
     @abc.abstractmethod
@@ -218,8 +116,16 @@ class LockCollector(collector.CaptureSamplerCollector):
 
         def _allocate_lock(wrapped, instance, args, kwargs):
             lock = wrapped(*args, **kwargs)
+            frame = sys._getframe(1 if WRAPT_C_EXT else 2)
+            code = frame.f_code
             return self.PROFILED_LOCK_CLASS(
-                lock, self.recorder, self.tracer, self.nframes, self._capture_sampler, self.endpoint_collection_enabled
+                lock,
+                self.recorder,
+                self.tracer,
+                self.nframes,
+                self._capture_sampler,
+                self.endpoint_collection_enabled,
+                "%s:%d" % (os.path.basename(code.co_filename), frame.f_lineno),
             )
 
         self._set_original(FunctionWrapper(self.original, _allocate_lock))
@@ -0,0 +1,31 @@
+import typing
+
+from ddtrace.profiling import recorder as _recorder
+
+class CaptureSampler(object):
+    capture_pct: float
+    def __init__(self, capture_pct: float = ...) -> None: ...
+    def capture(self) -> bool: ...
+    def __eq__(self, other: object) -> bool: ...
+
+class ProfiledLock(object):
+    name: str
+    __wrapped__: typing.Any
+    def __init__(
+        self,
+        wrapped: typing.Any,
+        recorder: _recorder.Recorder,
+        tracer: typing.Any,
+        max_nframes: int,
+        capture_sampler: CaptureSampler,
+        endpoint_collection_enabled: bool,
+        name: str,
+    ) -> None: ...
+    def __getattr__(self, name: str) -> typing.Any: ...
+    def __enter__(self) -> typing.Any: ...
+    def __exit__(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any: ...
+    def __aenter__(self) -> typing.Any: ...
+    def __aexit__(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any: ...
+    def acquire(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any: ...
+    def acquire_lock(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any: ...
+    def release(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any: ...
@@ -0,0 +1,180 @@
+import sys
+
+from six.moves import _thread
+
+from ddtrace.internal import compat
+from ddtrace.profiling import _threading
+from ddtrace.profiling.collector import _task
+from ddtrace.profiling.collector import _traceback
+
+
+cdef class CaptureSampler:
+    """Determine the events that should be captured based on a sampling percentage.
+
+    This is the compiled version of `ddtrace.profiling.collector.CaptureSampler`: profiled locks check it without
+    calling any Python code.
+    """
+
+    cdef readonly double capture_pct
+    cdef double _counter
+
+    def __init__(self, capture_pct=100):
+        if capture_pct < 0 or capture_pct > 100:
+            raise ValueError("Capture percentage should be between 0 and 100 included")
+        self.capture_pct = capture_pct
+        self._counter = 0
+
+    cdef bint _capture(self):
+        self._counter += self.capture_pct
+        if self._counter >= 100:
+            self._counter -= 100
+            return True
+        return False
+
+    def capture(self):
+        return self._capture()
+
+    def __eq__(self, other):
+        if not isinstance(other, CaptureSampler):
+            return NotImplemented
+        return (self.capture_pct, self._counter) == (other.capture_pct, (<CaptureSampler>other)._counter)
+
+    # Like the attrs version, the sampler is mutable and thus not hashable
+    __hash__ = None
+
+
+cdef class ProfiledLock:
+    """Proxy to a lock that records its acquisitions and releases.
+
+    Subclasses must define the ``ACQUIRE_EVENT_CLASS`` and ``RELEASE_EVENT_CLASS`` attributes.
+
+    When a lock operation is not sampled, the only work done on top of the wrapped lock is checking the capture
+    sampler counter.
+    """
+
+    cdef object _wrapped
+    cdef object _wrapped_acquire
+    cdef object _wrapped_release
+    cdef object _recorder
+    cdef object _tracer
+    cdef int _max_nframes
+    cdef CaptureSampler _capture_sampler
+    cdef bint _endpoint_collection_enabled
+    cdef readonly str name
+    cdef bint _acquired
+    cdef long long _acquired_at
+
+    def __init__(self, wrapped, recorder, tracer, max_nframes, CaptureSampler capture_sampler,
+                 endpoint_collection_enabled, name):
+        self._wrapped = wrapped
+        self._wrapped_acquire = wrapped.acquire
+        self._wrapped_release = wrapped.release
+        self._recorder = recorder
+        self._tracer = tracer
+        self._max_nframes = max_nframes
+        self._capture_sampler = capture_sampler
+        self._endpoint_collection_enabled = endpoint_collection_enabled
+        self.name = name
+        self._acquired = False
+
+    @property
+    def __wrapped__(self):
+        return self._wrapped
+
+    def __getattr__(self, name):
+        return getattr(self._wrapped, name)
+
+    def __repr__(self):
+        return "<%s at 0x%x for %r>" % (type(self).__name__, id(self), self._wrapped)
+
+    def __enter__(self):
+        return self._wrapped.__enter__()
+
+    def __exit__(self, *args, **kwargs):
+        return self._wrapped.__exit__(*args, **kwargs)
+
+    def __aenter__(self):
+        return self._wrapped.__aenter__()
+
+    def __aexit__(self, *args, **kwargs):
+        return self._wrapped.__aexit__(*args, **kwargs)
+
+    cdef _push_event(self, bint acquire, long long duration_ns):
+        thread_id = _thread.get_ident()
+        thread_name = _threading.get_thread_name(thread_id)
+        task_id, task_name, task_frame = _task.get_task(thread_id)
+
+        if task_frame is None:
+            # DEV: compiled functions do not have a frame, the current frame is the one calling the lock
+            frame = sys._getframe(0)
+        else:
+            frame = task_frame
+
+        frames, nframes = _traceback.pyframe_to_frames(frame, self._max_nframes)
+
+        if acquire:
+            event = self.ACQUIRE_EVENT_CLASS(
+                lock_name=self.name,
+                frames=frames,
+                nframes=nframes,
+                thread_id=thread_id,
+                thread_name=thread_name,
+                task_id=task_id,
+                task_name=task_name,
+                wait_time_ns=duration_ns,
+                sampling_pct=self._capture_sampler.capture_pct,
+            )
+        else:
+            event = self.RELEASE_EVENT_CLASS(
+                lock_name=self.name,
+                frames=frames,
+                nframes=nframes,
+                thread_id=thread_id,
+                thread_name=thread_name,
+                task_id=task_id,
+                task_name=task_name,
+                locked_for_ns=duration_ns,
+                sampling_pct=self._capture_sampler.capture_pct,
+            )
+
+        if self._tracer is not None:
+            event.set_trace_info(self._tracer.current_span(), self._endpoint_collection_enabled)
+
+        self._recorder.push_event(event)
+
+    cdef _acquire(self, args, kwargs):
+        cdef long long start
+        cdef long long end
+
+        if not self._capture_sampler._capture():
+            return self._wrapped_acquire(*args, **kwargs)
+
+        start = compat.monotonic_ns()
+        try:
+            return self._wrapped_acquire(*args, **kwargs)
+        finally:
+            try:
+                end = self._acquired_at = compat.monotonic_ns()
+                self._acquired = True
+                self._push_event(True, end - start)
+            except Exception:
+                pass  # nosec
+
+    def acquire(self, *args, **kwargs):
+        return self._acquire(args, kwargs)
+
+    def acquire_lock(self, *args, **kwargs):
+        return self._acquire(args, kwargs)
+
+    def release(self, *args, **kwargs):
+        cdef long long end
+        try:
+            return self._wrapped_release(*args, **kwargs)
+        finally:
+            if self._acquired:
+                self._acquired = False
+                try:
+                    end = compat.monotonic_ns()
+                    self._push_event(False, end - self._acquired_at)
+                except Exception:
+                    pass  # nosec
@@ -1,6 +1,8 @@
 from types import CodeType
 from types import FrameType
 
+from cpython.object cimport PyObject
+
 from ddtrace.internal.logger import get_logger
 from ddtrace.profiling.event import DDFrame
 
@@ -8,6 +10,30 @@ from ddtrace.profiling.event import DDFrame
 log = get_logger(__name__)
 
 
+IF UNAME_SYSNAME != "Windows" and PY_VERSION_HEX >= 0x030b0000:
+    # Python 3.11+ keeps the locals in the interpreter frame, which needs -DPy_BUILD_CORE
+    cdef extern from "<internal/pycore_frame.h>":
+        ctypedef struct _PyInterpreterFrame:
+            PyObject* localsplus[1]
+
+        ctypedef struct PyFrameObject:
+            _PyInterpreterFrame* f_frame
+ELIF PY_VERSION_HEX < 0x030b0000:
+    cdef extern from "<frameobject.h>":
+        ctypedef struct PyFrameObject:
+            PyObject* f_localsplus[1]
+
+
+DEF MAX_FRAMES = 8192
+DEF MAX_STACKS = 4096
+
+
+# Interned frames, keyed by (filename, code, lineno), or (filename, code, lineno, class name) for methods
+cdef dict _frames = {}
+# Interned stacks, keyed by the tuple of their interned frames
+cdef dict _stacks = {}
+
+
 cpdef _extract_class_name(frame):
     # type: (...) -> str
     """Extract class name from a frame, if possible.
@@ -16,8 +42,11 @@ cpdef _extract_class_name(frame):
     """
     if frame.f_code.co_varnames:
         argname = frame.f_code.co_varnames[0]
+        # DEV: Check the argument name first, reading f_locals is expensive
+        if argname != "self" and argname != "cls":
+            return ""
         try:
-            value = frame.f_locals[argname]
+            value = _first_local(frame, argname)
         except KeyError:
             return ""
         try:
@@ -30,6 +59,25 @@ cpdef _extract_class_name(frame):
     return ""
 
 
+cdef _first_local(frame, argname):
+    # Read the first argument from the frame slots directly: f_locals builds a
+    # dict of all the locals on every access. Arguments captured by a closure
+    # are stored in a cell, so go through f_locals for those.
+    cdef PyObject* value
+
+    IF UNAME_SYSNAME != "Windows" or PY_VERSION_HEX < 0x030b0000:
+        if type(frame) is FrameType and argname not in frame.f_code.co_cellvars:
+            IF PY_VERSION_HEX >= 0x030b0000:
+                value = (<PyFrameObject*>frame).f_frame.localsplus[0]
+            ELSE:
+                value = (<PyFrameObject*>frame).f_localsplus[0]
+            if not value:
+                raise KeyError(argname)
+            return <object>value
+
+    return frame.f_locals[argname]
+
+
 cpdef traceback_to_frames(traceback, max_nframes):
     """Serialize a Python traceback object into a list of tuple of (filename, lineno, function_name).
 
@@ -51,9 +99,45 @@ cpdef traceback_to_frames(traceback, max_nframes):
     return frames, nframes
 
 
+cdef _intern_frame(frame, code, lineno):
+    cdef object key
+    cdef object class_name = ""
+    cdef object ddframe
+
+    varnames = code.co_varnames
+    if varnames and (varnames[0] == "self" or varnames[0] == "cls"):
+        # The class name depends on the arguments of the call, not only on the code
+        class_name = _extract_class_name(frame)
+        key = (code.co_filename, code, lineno, class_name)
+    else:
+        # DEV: Code objects compare equal regardless of their filename
+        key = (code.co_filename, code, lineno)
+
+    ddframe = _frames.get(key)
+    if ddframe is None:
+        if len(_frames) >= MAX_FRAMES:
+            _frames.clear()
+        ddframe = _frames[key] = DDFrame(code.co_filename, lineno, code.co_name, class_name)
+    return ddframe
+
+
+cdef _intern_stack(list frames):
+    cdef tuple key = tuple(frames)
+    cdef object stack = _stacks.get(key)
+
+    if stack is None:
+        if len(_stacks) >= MAX_STACKS:
+            _stacks.clear()
+        stack = _stacks[key] = frames
+    return stack
+
+
 cpdef pyframe_to_frames(frame, max_nframes):
     """Convert a Python frame to a list of frames.
 
+    The frames and the lists of frames are interned, so that repeated stacks
+    share the same objects: the returned list must not be modified.
+
     :param frame: The frame object to serialize.
     :param max_nframes: The maximum number of frames to return.
     :return: The serialized frames and the number of frames present in the original traceback."""
@@ -89,7 +173,7 @@ cpdef pyframe_to_frames(frame, max_nframes):
                     return [], 0
 
             lineno = 0 if frame.f_lineno is None else frame.f_lineno
-            frames.append(DDFrame(code.co_filename, lineno, code.co_name, _extract_class_name(frame)))
+            frames.append(_intern_frame(frame, code, lineno))
         nframes += 1
         frame = frame.f_back
-    return frames, nframes
+    return _intern_stack(frames), nframes
@@ -30,6 +30,25 @@ class Exporter(object):
         """
         raise NotImplementedError
 
+    def build(
+        self,
+        events,  # type: recorder.EventsType
+        start_time_ns,  # type: int
+        end_time_ns,  # type: int
+    ):
+        # type: (...) -> typing.Optional[typing.Callable[[], typing.Any]]
+        """Build the export of events and return the function that completes it, if any.
+
+        The returned function is safe to call from another thread, so that slow I/O (e.g. an upload) does not delay
+        the caller. By default, events are exported right away and nothing is left to do.
+
+        :param events: List of events to export.
+        :param start_time_ns: The start time of recording.
+        :param end_time_ns: The end time of recording.
+        """
+        self.export(events, start_time_ns, end_time_ns)
+        return None
+
 
 @attr.s
 class NullExporter(Exporter):
@@ -1,4 +1,3 @@
-import gzip
 import os
 import typing
 
@@ -16,13 +15,15 @@ class PprofFileExporter(pprof.PprofExporter):
     prefix = attr.ib(default="profile", type=str)
     _increment = attr.ib(default=1, init=False, repr=False, type=int)
 
+    _compress_profile = True
+
     def export(
         self,
         events,  # type: recorder.EventsType
         start_time_ns,  # type: int
         end_time_ns,  # type: int
     ):
-        # type: (...) -> typing.Tuple[pprof.pprof_ProfileType, typing.List[pprof.Package]]
+        # type: (...) -> typing.Tuple[pprof.Profile, typing.List[pprof.Package]]
         """Export events to pprof file.
 
         The file name is based on the prefix passed to init. The process ID number and type of export is then added as a
@@ -33,7 +34,7 @@ class PprofFileExporter(pprof.PprofExporter):
         :param end_time_ns: The end time of recording.
         """
         profile, libs = super(PprofFileExporter, self).export(events, start_time_ns, end_time_ns)
-        with gzip.open(self.prefix + (".%d.%d" % (os.getpid(), self._increment)), "wb") as f:
-            f.write(profile.SerializeToString())
+        with open(self.prefix + (".%d.%d" % (os.getpid(), self._increment)), "wb") as f:
+            f.write(profile.SerializeToGzippedString())
         self._increment += 1
         return profile, libs
@@ -1,6 +1,7 @@
 # -*- encoding: utf-8 -*-
 import binascii
 import datetime
+import functools
 import gzip
 import itertools
 import json
@@ -44,6 +45,8 @@ class PprofHTTPExporter(pprof.PprofExporter):
     # repeat this to please mypy
     enable_code_provenance = attr.ib(default=True, type=bool)
 
+    _compress_profile = True
+
     endpoint = attr.ib(type=str, factory=agent.get_trace_url)
     api_key = attr.ib(default=None, type=typing.Optional[str])
     # Do not use the default agent timeout: it is too short, the agent is just a unbuffered proxy and the profiling
@@ -155,13 +158,39 @@ class PprofHTTPExporter(pprof.PprofExporter):
         start_time_ns,  # type: int
         end_time_ns,  # type: int
     ):
-        # type: (...) -> typing.Tuple[pprof.pprof_ProfileType, typing.List[pprof.Package]]
+        # type: (...) -> typing.Tuple[pprof.Profile, typing.List[pprof.Package]]
         """Export events to an HTTP endpoint.
 
         :param events: The event dictionary from a `ddtrace.profiling.recorder.Recorder`.
         :param start_time_ns: The start time of recording.
         :param end_time_ns: The end time of recording.
         """
+        upload, profile, libs = self._build(events, start_time_ns, end_time_ns)
+        upload()
+        return profile, libs
+
+    def build(
+        self,
+        events,  # type: recorder.EventsType
+        start_time_ns,  # type: int
+        end_time_ns,  # type: int
+    ):
+        # type: (...) -> typing.Callable[[], None]
+        """Build the profile and the upload request, and return the function that uploads it.
+
+        :param events: The event dictionary from a `ddtrace.profiling.recorder.Recorder`.
+        :param start_time_ns: The start time of recording.
+        :param end_time_ns: The end time of recording.
+        """
+        return self._build(events, start_time_ns, end_time_ns)[0]
+
+    def _build(
+        self,
+        events,  # type: recorder.EventsType
+        start_time_ns,  # type: int
+        end_time_ns,  # type: int
+    ):
+        # type: (...) -> typing.Tuple[typing.Callable[[], None], pprof.Profile, typing.List[pprof.Package]]
         if self.api_key:
             headers = {
                 "DD-API-KEY": self.api_key.encode(),
@@ -173,16 +202,13 @@ class PprofHTTPExporter(pprof.PprofExporter):
             headers["Datadog-Container-Id"] = self._container_info.container_id
 
         profile, libs = super(PprofHTTPExporter, self).export(events, start_time_ns, end_time_ns)
-        pprof = six.BytesIO()
-        with gzip.GzipFile(fileobj=pprof, mode="wb") as gz:
-            gz.write(profile.SerializeToString())
 
         data = [
             {
                 "name": b"auto",
                 "filename": b"auto.pprof",
                 "content-type": b"application/octet-stream",
-                "data": pprof.getvalue(),
+                "data": profile.SerializeToGzippedString(),
             }
         ]
 
@@ -205,7 +231,7 @@ class PprofHTTPExporter(pprof.PprofExporter):
                 }
             )
 
-        service = self.service or os.path.basename(profile.string_table[profile.mapping[0].filename])
+        service = self.service or os.path.basename(profile.program_name)
         event = {
             "version": "4",
             "family": "python",
@@ -224,10 +250,12 @@ class PprofHTTPExporter(pprof.PprofExporter):
         )
         headers["Content-Type"] = content_type
 
-        client = agent.get_connection(self.endpoint, self.timeout)
-        self._upload(client, self.endpoint_path, body, headers)
+        return functools.partial(self._send, self.endpoint_path, body, headers), profile, libs
 
-        return profile, libs
+    def _send(self, path, body, headers):
+        # type: (str, bytes, typing.Dict[str, typing.Any]) -> None
+        client = agent.get_connection(self.endpoint, self.timeout)
+        self._upload(client, path, body, headers)
 
     def _upload(self, client, path, body, headers):
         try:
@@ -20,20 +20,11 @@ class Package(typing.TypedDict):
     kind: typing.Literal["library"]
     paths: typing.List[str]
 
-class pprof_LocationType:
-    id: int
-
-class pprof_Mapping:
-    filename: int
-
-class pprof_ProfileType:
-    id: int
-    string_table: typing.Dict[int, str]
-    mapping: typing.List[pprof_Mapping]
+class Profile:
+    program_name: str
+    def __init__(self, program_name: str, data: bytes, compressed: bool) -> None: ...
     def SerializeToString(self) -> bytes: ...
-
-class pprof_FunctionType:
-    id: int
+    def SerializeToGzippedString(self) -> bytes: ...
 
 HashableStackTraceType: Any
 
@@ -53,6 +44,23 @@ class _PprofConverter:
         nframes: int,
         samples: typing.List[stack_event.StackSampleEvent],
     ) -> None: ...
+    def convert_stack_samples(
+        self,
+        thread_id: str,
+        thread_native_id: str,
+        thread_name: str,
+        task_id: str,
+        task_name: str,
+        local_root_span_id: str,
+        span_id: str,
+        trace_resource: str,
+        trace_type: str,
+        frames: HashableStackTraceType,
+        nframes: int,
+        nsamples: int,
+        cpu_time_ns: int,
+        wall_time_ns: int,
+    ) -> None: ...
     def convert_memalloc_event(
         self,
         thread_id: str,
@@ -130,7 +138,7 @@ StackExceptionEventGroupKey: Any
 class PprofExporter(exporter.Exporter):
     def export(
         self, events: recorder.EventsType, start_time_ns: int, end_time_ns: int
-    ) -> typing.Tuple[pprof_ProfileType, typing.List[Package]]: ...
+    ) -> typing.Tuple[Profile, typing.List[Package]]: ...
     def __init__(self) -> None: ...
     def __lt__(self, other: Any) -> Any: ...
     def __le__(self, other: Any) -> Any: ...
@@ -1,12 +1,22 @@
+from cpython.bytes cimport PyBytes_FromStringAndSize
+from cpython.mem cimport PyMem_Free
+from cpython.mem cimport PyMem_Malloc
+from cpython.mem cimport PyMem_Realloc
+from libc.stdint cimport int64_t
+from libc.stdint cimport uint64_t
+from libc.string cimport memcpy
+from libc.string cimport memmove
+
 import collections
+import gzip
 import itertools
 import operator
 import platform
 import sysconfig
 import typing
+import zlib
 
 import attr
-import six
 
 from ddtrace import ext
 from ddtrace.internal import packages
@@ -86,33 +96,7 @@ if platstdlib_path is not None and platstdlib_path != stdlib_path:
     )
 
 
-def _protobuf_version():
-    # type: (...) -> typing.Tuple[int, int, int]
-    """Check if protobuf version is post 3.12"""
-    import google.protobuf
-
-    from ddtrace.internal.utils.version import parse_version
-
-    return parse_version(google.protobuf.__version__)
-
-
-# Load the appropriate pprof_pb2 module
-_pb_version = _protobuf_version()
-for v in [(4, 21), (3, 19), (3, 12)]:
-    if _pb_version >= v:
-        import sys
-
-        pprof_module = "ddtrace.profiling.exporter.pprof_%s%s_pb2" % v
-        __import__(pprof_module)
-        pprof_pb2 = sys.modules[pprof_module]
-        break
-else:
-    from ddtrace.profiling.exporter import pprof_3_pb2 as pprof_pb2  # type: ignore[no-redef]
-
-
 _ITEMGETTER_ZERO = operator.itemgetter(0)
-_ITEMGETTER_ONE = operator.itemgetter(1)
-_ATTRGETTER_ID = operator.attrgetter("id")
 
 
 cdef str _none_to_str(object value):
@@ -134,28 +118,207 @@ cdef groupby(object collection, object key):
     return groups.items()
 
 
-class pprof_LocationType(object):
-    # pprof_pb2.Location
-    id: int
-
-
-class pprof_Mapping(object):
-    filename: int
-
-
-class pprof_ProfileType(object):
-    # Emulate pprof_pb2.Profile for typing
-    id: int
-    string_table: typing.Dict[int, str]
-    mapping: typing.List[pprof_Mapping]
-
-    def SerializeToString(self) -> bytes:  # type: ignore[empty-body]
-        ...
-
-
-class pprof_FunctionType(object):
-    # pprof_pb2.Function
-    id: int
+DEF MAX_MESSAGE_DEPTH = 4
+DEF COMPRESS_CHUNK_SIZE = 1 << 16
+DEF WIRE_TYPE_VARINT = 0
+DEF WIRE_TYPE_LENGTH_DELIMITED = 2
+
+# Field numbers of the pprof messages, see pprof.proto
+DEF PROFILE_SAMPLE_TYPE = 1
+DEF PROFILE_SAMPLE = 2
+DEF PROFILE_MAPPING = 3
+DEF PROFILE_LOCATION = 4
+DEF PROFILE_FUNCTION = 5
+DEF PROFILE_STRING_TABLE = 6
+DEF PROFILE_TIME_NANOS = 9
+DEF PROFILE_DURATION_NANOS = 10
+DEF PROFILE_PERIOD_TYPE = 11
+DEF PROFILE_PERIOD = 12
+DEF VALUE_TYPE_TYPE = 1
+DEF VALUE_TYPE_UNIT = 2
+DEF SAMPLE_LOCATION_ID = 1
+DEF SAMPLE_VALUE = 2
+DEF SAMPLE_LABEL = 3
+DEF LABEL_KEY = 1
+DEF LABEL_STR = 2
+DEF MAPPING_ID = 1
+DEF MAPPING_FILENAME = 5
+DEF LOCATION_ID = 1
+DEF LOCATION_LINE = 4
+DEF LINE_FUNCTION_ID = 1
+DEF LINE_LINE = 2
+DEF FUNCTION_ID = 1
+DEF FUNCTION_NAME = 2
+DEF FUNCTION_FILENAME = 4
+
+
+cdef inline size_t _varint_size(uint64_t value):
+    cdef size_t size = 1
+
+    while value >= 0x80:
+        value >>= 7
+        size += 1
+    return size
+
+
+cdef class _ProtobufWriter(object):
+    """Encode a protobuf message field by field into a growing buffer.
+
+    Fields are written as they come, in the order of the calls, and fields
+    with a default value are omitted, like protobuf does for proto3 messages.
+    Embedded messages are written between ``begin`` and ``end``: their length
+    prefix is inserted once their content is known.
+
+    When compression is enabled the buffer is compressed with gzip and emptied
+    every time a top-level field makes it grow past a chunk, so the whole
+    uncompressed message is never held in memory.
+    """
+
+    cdef char *buf
+    cdef size_t length
+    cdef size_t size
+    cdef size_t starts[MAX_MESSAGE_DEPTH]
+    cdef int depth
+    cdef object compressor
+    cdef list chunks
+
+    def __cinit__(self, bint compress=False):
+        self.size = COMPRESS_CHUNK_SIZE
+        self.buf = <char *>PyMem_Malloc(self.size)
+        if self.buf == NULL:
+            raise MemoryError()
+        self.length = 0
+        self.depth = 0
+        self.chunks = []
+        # DEV: Use the same compression level as the gzip module
+        self.compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+
+    def __dealloc__(self):
+        PyMem_Free(self.buf)
+
+    cdef int _reserve(self, size_t n) except -1:
+        cdef size_t size
+        cdef char *buf
+
+        if self.length + n > self.size:
+            size = max(self.size * 2, self.length + n)
+            buf = <char *>PyMem_Realloc(self.buf, size)
+            if buf == NULL:
+                raise MemoryError()
+            self.buf = buf
+            self.size = size
+        return 0
+
+    cdef void _write_varint(self, uint64_t value):
+        # DEV: Callers must reserve the space, up to 10 bytes
+        while value >= 0x80:
+            self.buf[self.length] = <char>((value & 0x7F) | 0x80)
+            self.length += 1
+            value >>= 7
+        self.buf[self.length] = <char>value
+        self.length += 1
+
+    cdef int _maybe_compress(self) except -1:
+        if self.depth == 0 and self.compressor is not None and self.length >= COMPRESS_CHUNK_SIZE:
+            self.chunks.append(self.compressor.compress(PyBytes_FromStringAndSize(self.buf, self.length)))
+            self.length = 0
+        return 0
+
+    cdef int write_int(self, uint64_t field, int64_t value) except -1:
+        """Write an int64 or uint64 field."""
+        if value != 0:
+            self._reserve(20)
+            self._write_varint(field << 3 | WIRE_TYPE_VARINT)
+            # DEV: Negative numbers are encoded on 10 bytes, as their two's complement
+            self._write_varint(<uint64_t>value)
+            self._maybe_compress()
+        return 0
+
+    cdef int write_packed(self, uint64_t field, object values) except -1:
+        """Write a repeated int64 or uint64 field."""
+        cdef int64_t value
+
+        if values:
+            self.begin(field)
+            for value in values:
+                self._reserve(10)
+                self._write_varint(<uint64_t>value)
+            self.end()
+        return 0
+
+    cdef int write_string(self, uint64_t field, str value) except -1:
+        """Write a string field, or an element of a repeated string field."""
+        cdef bytes data = value.encode("utf-8")
+        cdef size_t n = len(data)
+
+        self._reserve(20 + n)
+        self._write_varint(field << 3 | WIRE_TYPE_LENGTH_DELIMITED)
+        self._write_varint(n)
+        memcpy(self.buf + self.length, <char *>data, n)
+        self.length += n
+        self._maybe_compress()
+        return 0
+
+    cdef int begin(self, uint64_t field) except -1:
+        """Start an embedded message field."""
+        if self.depth == MAX_MESSAGE_DEPTH:
+            raise RuntimeError("Too many nested protobuf messages")
+        self._reserve(10)
+        self._write_varint(field << 3 | WIRE_TYPE_LENGTH_DELIMITED)
+        self.starts[self.depth] = self.length
+        self.depth += 1
+        return 0
+
+    cdef int end(self) except -1:
+        """End the last embedded message field started."""
+        cdef size_t start
+        cdef size_t n
+        cdef size_t prefix_size
+
+        self.depth -= 1
+        start = self.starts[self.depth]
+        n = self.length - start
+        prefix_size = _varint_size(n)
+        self._reserve(prefix_size)
+        # Make room for the length prefix in front of the message
+        memmove(self.buf + start + prefix_size, self.buf + start, n)
+        self.length = start
+        self._write_varint(n)
+        self.length += n
+        self._maybe_compress()
+        return 0
+
+    cdef bytes getvalue(self):
+        if self.compressor is None:
+            return PyBytes_FromStringAndSize(self.buf, self.length)
+
+        self.chunks.append(self.compressor.compress(PyBytes_FromStringAndSize(self.buf, self.length)))
+        self.length = 0
+        self.chunks.append(self.compressor.flush())
+        return b"".join(self.chunks)
+
+
+class Profile(object):
+    """A profile encoded in the pprof format."""
+
+    __slots__ = ("program_name", "_data", "_compressed")
+
+    def __init__(self, program_name: str, data: bytes, compressed: bool) -> None:
+        self.program_name = program_name
+        self._data = data
+        self._compressed = compressed
+
+    def SerializeToString(self) -> bytes:
+        """Return the profile encoded with protobuf."""
+        if self._compressed:
+            return gzip.decompress(self._data)
+        return self._data
+
+    def SerializeToGzippedString(self) -> bytes:
+        """Return the profile encoded with protobuf and compressed with gzip."""
+        if self._compressed:
+            return self._data
+        return gzip.compress(self._data)
 
 
 _Label_T = typing.Tuple[str, str]
@@ -164,17 +327,21 @@ _Location_Key_T = typing.Tuple[typing.Tuple[int, ...], _Label_List_T]
 
 
 HashableStackTraceType = typing.Tuple[event.DDFrame, ...]
+_Function_T = typing.Tuple[int, int, int]
+_Location_T = typing.Tuple[int, int, int]
 
 
 @attr.s
 class _PprofConverter(object):
     """Convert stacks generated by a Profiler to pprof format."""
 
-    # Those attributes will be serialize in a `pprof_pb2.Profile`
+    # Those attributes will be serialized in a pprof Profile message
+    # (filename, funcname) -> (function id, name, filename)
     _functions = attr.ib(
-        init=False, factory=dict, type=typing.Dict[typing.Tuple[str, typing.Optional[str]], pprof_FunctionType]
+        init=False, factory=dict, type=typing.Dict[typing.Tuple[str, typing.Optional[str]], _Function_T]
     )
-    _locations = attr.ib(init=False, factory=dict, type=typing.Dict[typing.Tuple[str, int, str], pprof_LocationType])
+    # (filename, lineno, funcname) -> (location id, function id, lineno)
+    _locations = attr.ib(init=False, factory=dict, type=typing.Dict[typing.Tuple[str, int, str], _Location_T])
     _string_table = attr.ib(init=False, factory=_StringTable)
 
     _last_location_id = attr.ib(init=False, factory=lambda: itertools.count(1))
@@ -189,52 +356,45 @@ class _PprofConverter(object):
         type=typing.DefaultDict[_Location_Key_T, typing.DefaultDict[str, int]],
     )
 
-    def _to_Function(
+    def _to_function_id(
         self,
         filename,  # type: str
         funcname,  # type: str
     ):
-        # type: (...) -> pprof_FunctionType
+        # type: (...) -> int
         # filename/funcname are "guaranteed" to be str, but on 3.11 and later
         # they may (erroneously?) be bytes.  Try to fix this.
         filename = sanitize_string(filename)
         funcname = sanitize_string(funcname)
         try:
-            return self._functions[(filename, funcname)]
+            return self._functions[(filename, funcname)][0]
         except KeyError:
-            func = pprof_pb2.Function(
-                id=next(self._last_func_id),
-                name=self._str(funcname),
-                filename=self._str(filename),
-            )
-            self._functions[(filename, funcname)] = func
-            return func
+            func_id = next(self._last_func_id)
+            name = self._str(funcname)
+            self._functions[(filename, funcname)] = (func_id, name, self._str(filename))
+            return func_id
 
-    def _to_Location(
+    def _to_location_id(
         self,
         filename,  # type: str
         lineno,  # type: int
         funcname,  # type: str
     ):
-        # type: (...) -> pprof_LocationType
+        # type: (...) -> int
         # filename/funcname are "guaranteed" to be str, but on 3.11 and later
         # they may (erroneously?) be bytes.  Try to fix this.
         filename = sanitize_string(filename)
         funcname = sanitize_string(funcname)
         try:
-            return self._locations[(filename, lineno, funcname)]
+            return self._locations[(filename, lineno, funcname)][0]
         except KeyError:
-            location = pprof_pb2.Location(
-                id=next(self._last_location_id),
-                line=[
-                    pprof_pb2.Line(
-                        function_id=self._to_Function(filename, funcname).id,
-                        line=lineno,
-                    ),
-                ],
+            location_id = next(self._last_location_id)
+            self._locations[(filename, lineno, funcname)] = (
+                location_id,
+                self._to_function_id(filename, funcname),
+                lineno,
             )
-            self._locations[(filename, lineno, funcname)] = location
-            return location
+            return location_id
 
     def _str(self, string: typing.Optional[str]) -> int:
         """Convert a string to an id from the string table."""
@@ -247,13 +407,13 @@ class _PprofConverter(object):
     ):
         # type: (...) -> typing.Tuple[int, ...]
         locations = [
-            self._to_Location(filename, lineno, funcname).id for filename, lineno, funcname, class_name in frames
+            self._to_location_id(filename, lineno, funcname) for filename, lineno, funcname, class_name in frames
         ]
 
         omitted = nframes - len(frames)
         if omitted:
             locations.append(
-                self._to_Location("", 0, "<%d frame%s omitted>" % (omitted, ("s" if omitted > 1 else ""))).id
+                self._to_location_id("", 0, "<%d frame%s omitted>" % (omitted, ("s" if omitted > 1 else "")))
             )
 
         return tuple(locations)
@@ -272,6 +432,41 @@ class _PprofConverter(object):
         frames,  # type: HashableStackTraceType
         nframes,  # type: int
         samples,  # type: typing.List[stack_event.StackSampleEvent]
+    ):
+        # type: (...) -> None
+        self.convert_stack_samples(
+            thread_id,
+            thread_native_id,
+            thread_name,
+            task_id,
+            task_name,
+            local_root_span_id,
+            span_id,
+            trace_resource,
+            trace_type,
+            frames,
+            nframes,
+            len(samples),
+            sum(s.cpu_time_ns for s in samples),
+            sum(s.wall_time_ns for s in samples),
+        )
+
+    def convert_stack_samples(
+        self,
+        thread_id,  # type: str
+        thread_native_id,  # type: str
+        thread_name,  # type: str
+        task_id,  # type: str
+        task_name,  # type: str
+        local_root_span_id,  # type: str
+        span_id,  # type: str
+        trace_resource,  # type: str
+        trace_type,  # type: str
+        frames,  # type: HashableStackTraceType
+        nframes,  # type: int
+        nsamples,  # type: int
+        cpu_time_ns,  # type: int
+        wall_time_ns,  # type: int
     ):
         # type: (...) -> None
         location_key = (
@@ -290,9 +485,12 @@ class _PprofConverter(object):
             ),
         )
 
-        self._location_values[location_key]["cpu-samples"] = len(samples)
-        self._location_values[location_key]["cpu-time"] = sum(s.cpu_time_ns for s in samples)
-        self._location_values[location_key]["wall-time"] = sum(s.wall_time_ns for s in samples)
+        # DEV: Aggregated samples with different labels can end up with the
+        # same location key once the labels are converted to strings.
+        values = self._location_values[location_key]
+        values["cpu-samples"] += nsamples
+        values["cpu-time"] += cpu_time_ns
+        values["wall-time"] += wall_time_ns
 
     def convert_memalloc_event(
         self,
@@ -468,41 +666,68 @@ class _PprofConverter(object):
         period: typing.Optional[int],
         sample_types: typing.Tuple[typing.Tuple[str, str], ...],
         program_name: str,
-    ) -> pprof_ProfileType:
-        pprof_sample_type = [
-            pprof_pb2.ValueType(type=self._str(type_), unit=self._str(unit)) for type_, unit in sample_types
-        ]
-
-        sample = [
-            pprof_pb2.Sample(
-                location_id=locations,
-                value=[values.get(sample_type_name, 0) for sample_type_name, unit in sample_types],
-                label=[pprof_pb2.Label(key=self._str(key), str=self._str(s)) for key, s in labels],
-            )
-            for (locations, labels), values in six.iteritems(self._location_values)
-        ]
-
-        period_type = pprof_pb2.ValueType(type=self._str("time"), unit=self._str("nanoseconds"))
-
-        # WARNING: no code should use _str() here as once the _string_table is serialized below,
-        # it won't be updated if you call _str later in the code here
-        return pprof_pb2.Profile(
-            sample_type=pprof_sample_type,
-            sample=sample,
-            mapping=[
-                pprof_pb2.Mapping(
-                    id=1,
-                    filename=self._str(program_name),
-                ),
-            ],
-            location=self._locations.values(),
-            function=self._functions.values(),
-            string_table=self._string_table,
-            time_nanos=start_time_ns,
-            duration_nanos=duration_ns,
-            period=period,
-            period_type=period_type,
-        )
+        compress: bool = False,
+    ) -> Profile:
+        cdef _ProtobufWriter writer = _ProtobufWriter(compress)
+
+        # The fields are written in the order of their field number, as
+        # protobuf does. The string table must be written after all the
+        # fields that reference it, as it is not updated once written.
+        for type_, unit in sample_types:
+            writer.begin(PROFILE_SAMPLE_TYPE)
+            writer.write_int(VALUE_TYPE_TYPE, self._str(type_))
+            writer.write_int(VALUE_TYPE_UNIT, self._str(unit))
+            writer.end()
+
+        for (locations, labels), values in self._location_values.items():
+            writer.begin(PROFILE_SAMPLE)
+            writer.write_packed(SAMPLE_LOCATION_ID, locations)
+            writer.write_packed(SAMPLE_VALUE, [values.get(sample_type, 0) for sample_type, unit in sample_types])
+            for key, s in labels:
+                writer.begin(SAMPLE_LABEL)
+                writer.write_int(LABEL_KEY, self._str(key))
+                writer.write_int(LABEL_STR, self._str(s))
+                writer.end()
+            writer.end()
+
+        period_type = (self._str("time"), self._str("nanoseconds"))
+
+        writer.begin(PROFILE_MAPPING)
+        writer.write_int(MAPPING_ID, 1)
+        writer.write_int(MAPPING_FILENAME, self._str(program_name))
+        writer.end()
+
+        for location_id, function_id, lineno in self._locations.values():
+            writer.begin(PROFILE_LOCATION)
+            writer.write_int(LOCATION_ID, location_id)
+            writer.begin(LOCATION_LINE)
+            writer.write_int(LINE_FUNCTION_ID, function_id)
+            writer.write_int(LINE_LINE, lineno)
+            writer.end()
+            writer.end()
+
+        for function_id, name, filename in self._functions.values():
+            writer.begin(PROFILE_FUNCTION)
+            writer.write_int(FUNCTION_ID, function_id)
+            writer.write_int(FUNCTION_NAME, name)
+            writer.write_int(FUNCTION_FILENAME, filename)
+            writer.end()
+
+        # WARNING: no code should use _str() from here as the string table is
+        # serialized and won't be updated if you call _str later in the code
+        for string in self._string_table:
+            writer.write_string(PROFILE_STRING_TABLE, string)
+
+        writer.write_int(PROFILE_TIME_NANOS, start_time_ns)
+        writer.write_int(PROFILE_DURATION_NANOS, duration_ns)
+        writer.begin(PROFILE_PERIOD_TYPE)
+        writer.write_int(VALUE_TYPE_TYPE, period_type[0])
+        writer.write_int(VALUE_TYPE_UNIT, period_type[1])
+        writer.end()
+        if period is not None:
+            writer.write_int(PROFILE_PERIOD, period)
+
+        return Profile(program_name, writer.getvalue(), compress)
 
 
 # Use this format because CPython does not support the class style declaration
@@ -565,6 +790,9 @@ class PprofExporter(exporter.Exporter):
 
     enable_code_provenance = attr.ib(default=True, type=bool)
 
+    # Whether the profiles are compressed with gzip while they are encoded
+    _compress_profile = False
+
     def _stack_event_group_key(self, event: event.StackBasedEvent) -> StackEventGroupKey:
         return StackEventGroupKey(
             _none_to_str(event.thread_id),
@@ -634,21 +862,62 @@ class PprofExporter(exporter.Exporter):
         return groupby(events, self._stack_exception_group_key)
 
     def _get_event_trace_resource(self, event: event.StackBasedEvent) -> str:
+        return self._get_trace_resource(event.trace_type, event.trace_resource_container)
+
+    def _get_trace_resource(
+        self, trace_type: typing.Optional[str], trace_resource_container: typing.Optional[typing.List[str]]
+    ) -> str:
         trace_resource = ""
         # Do not export trace_resource for non Web spans for privacy concerns.
-        if event.trace_resource_container and event.trace_type == ext.SpanTypes.WEB:
-            (trace_resource,) = event.trace_resource_container
+        if trace_resource_container and trace_type == ext.SpanTypes.WEB:
+            (trace_resource,) = trace_resource_container
         return ensure_str(trace_resource, errors="backslashreplace")
 
+    def _convert_stack_sample_aggregate(
+        self, converter: _PprofConverter, aggregate: recorder.StackSampleAggregate
+    ) -> None:
+        stacks = aggregate.stacks
+        for (
+            (
+                stack_id,
+                thread_id,
+                thread_native_id,
+                thread_name,
+                task_id,
+                task_name,
+                local_root_span_id,
+                span_id,
+                trace_type,
+            ),
+            (nsamples, cpu_time_ns, wall_time_ns, trace_resource_container),
+        ) in aggregate.samples.items():
+            frames, nframes = stacks[stack_id]
+            converter.convert_stack_samples(
+                _none_to_str(thread_id),
+                _none_to_str(thread_native_id),
+                _get_thread_name(thread_id, thread_name),
+                _none_to_str(task_id),
+                _none_to_str(task_name),
+                _none_to_str(local_root_span_id),
+                _none_to_str(span_id),
+                self._get_trace_resource(trace_type, trace_resource_container),
+                _none_to_str(trace_type),
+                frames,
+                nframes,
+                nsamples,
+                cpu_time_ns,
+                wall_time_ns,
+            )
+
     def export(
         self, events: recorder.EventsType, start_time_ns: int, end_time_ns: int
-    ) -> typing.Tuple[pprof_ProfileType, typing.List[Package]]:
+    ) -> typing.Tuple[Profile, typing.List[Package]]:
         """Convert events to pprof format.
 
         :param events: The event dictionary from a `ddtrace.profiling.recorder.Recorder`.
         :param start_time_ns: The start time of recording.
         :param end_time_ns: The end time of recording.
-        :return: A protobuf Profile object.
+        :return: The encoded profile and the libraries it references.
         """
         program_name = config.get_application_name() or "<unknown program>"
 
@@ -659,10 +928,17 @@ class PprofExporter(exporter.Exporter):
 
         # Handle StackSampleEvent
         stack_events = []
-        for event in events.get(stack_event.StackSampleEvent, []):  # type: ignore[call-overload]
-            stack_events.append(event)
-            sum_period += event.sampling_period
-            nb_event += 1
+        stack_samples = events.get(stack_event.StackSampleEvent, [])  # type: ignore[call-overload]
+        if isinstance(stack_samples, recorder.StackSampleAggregate):
+            # The samples are already grouped by the recorder
+            sum_period += stack_samples.sum_period
+            nb_event += stack_samples.nevents
+            self._convert_stack_sample_aggregate(converter, stack_samples)
+        else:
+            for event in stack_samples:
+                stack_events.append(event)
+                sum_period += event.sampling_period
+                nb_event += 1
 
         for (
             (
@@ -826,6 +1102,7 @@ class PprofExporter(exporter.Exporter):
             period=period,
             sample_types=sample_types,
             program_name=program_name,
+            compress=self._compress_profile,
         )
 
         # Build profile first to get location filled out
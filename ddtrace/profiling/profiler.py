@@ -136,8 +136,8 @@ class _ProfilerInstance(service.Service):
         # type: (...) -> List[exporter.Exporter]
         _OUTPUT_PPROF = config.output_pprof
         if _OUTPUT_PPROF:
-            # DEV: Import this only if needed to avoid importing protobuf
-            # unnecessarily
+            # DEV: Import this only if needed to avoid loading the pprof
+            # exporter unnecessarily
             from ddtrace.profiling.exporter import file
 
             return [
@@ -189,8 +189,8 @@ class _ProfilerInstance(service.Service):
             )
 
         if self._export_py_enabled:
-            # DEV: Import this only if needed to avoid importing protobuf
-            # unnecessarily
+            # DEV: Import this only if needed to avoid loading the pprof
+            # exporter unnecessarily
             from ddtrace.profiling.exporter import http
 
             return [
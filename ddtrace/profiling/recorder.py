@@ -9,6 +9,7 @@ from ddtrace.internal import forksafe
 from ddtrace.settings.profiling import config
 
 from . import event
+from .collector import stack_event
 
 
 class _defaultdictkey(dict):
@@ -24,6 +25,89 @@ class _defaultdictkey(dict):
         raise KeyError(key)
 
 
+_StackType = typing.Tuple[typing.Tuple[event.DDFrame, ...], int]
+_StackSampleKeyType = typing.Tuple[
+    int,  # stack id
+    typing.Optional[int],  # thread id
+    typing.Optional[int],  # thread native id
+    typing.Optional[str],  # thread name
+    typing.Optional[int],  # task id
+    typing.Optional[str],  # task name
+    typing.Optional[int],  # local root span id
+    typing.Optional[int],  # span id
+    typing.Optional[str],  # trace type
+]
+
+
+class StackSampleAggregate(object):
+    """Stack samples folded into counters as they are recorded.
+
+    Samples with the same stack and the same labels are aggregated together,
+    so the memory used is bounded by the number of distinct stacks and labels
+    rather than by the number of samples. The stacks are interned and
+    referenced by their id in :attr:`samples`.
+    """
+
+    __slots__ = ("maxlen", "stacks", "samples", "nevents", "sum_period", "_stack_ids")
+
+    def __init__(self, maxlen=None):
+        # type: (typing.Optional[int]) -> None
+        # The maximum number of distinct stacks and labels to aggregate
+        self.maxlen = maxlen
+        # The interned (frames, nframes) stacks, indexed by stack id
+        self.stacks = []  # type: typing.List[_StackType]
+        # The [nsamples, cpu time, wall time, trace resource container] of each stack and labels
+        self.samples = {}  # type: typing.Dict[_StackSampleKeyType, typing.List[typing.Any]]
+        self.nevents = 0
+        self.sum_period = 0
+        self._stack_ids = {}  # type: typing.Dict[_StackType, int]
+
+    def __len__(self):
+        # type: (...) -> int
+        return self.nevents
+
+    def extend(self, events):
+        # type: (typing.Iterable[stack_event.StackSampleEvent]) -> None
+        """Fold stack samples into the aggregate."""
+        stack_ids = self._stack_ids
+        samples = self.samples
+        for e in events:
+            full = self.maxlen is not None and len(samples) >= self.maxlen
+            stack = (tuple(e.frames), e.nframes)
+            stack_id = stack_ids.get(stack)
+            if stack_id is None:
+                # DEV: A new stack always makes a new sample
+                if full:
+                    continue
+                stack_id = stack_ids[stack] = len(self.stacks)
+                self.stacks.append(stack)
+
+            key = (
+                stack_id,
+                e.thread_id,
+                e.thread_native_id,
+                e.thread_name,
+                e.task_id,
+                e.task_name,
+                e.local_root_span_id,
+                e.span_id,
+                e.trace_type,
+            )
+            counters = samples.get(key)
+            if counters is None:
+                if full:
+                    continue
+                # DEV: The trace resource is only read at export time, as it
+                # can be set after the sample is taken. It is the same for all
+                # the samples of a local root span.
+                counters = samples[key] = [0, 0, 0, e.trace_resource_container]
+            counters[0] += 1
+            counters[1] += e.cpu_time_ns
+            counters[2] += e.wall_time_ns
+            self.nevents += 1
+            self.sum_period += e.sampling_period
+
+
 EventsType = typing.Dict[event.Event, typing.Sequence[event.Event]]
 
 
@@ -37,6 +121,9 @@ class Recorder(object):
     max_events = attr.ib(factory=dict, type=typing.Dict[typing.Type[event.Event], typing.Optional[int]])
     """A dict of {event_type_class: max events} to limit the number of events to record."""
 
+    aggregate_stack_samples = attr.ib(default=config.stack.aggregate, type=bool)
+    """Whether to aggregate the stack samples as they are recorded rather than storing each of them."""
+
     events = attr.ib(init=False, repr=False, eq=False, type=EventsType)
     _events_lock = attr.ib(init=False, repr=False, factory=threading.RLock, eq=False)
 
@@ -76,7 +163,10 @@ class Recorder(object):
                 q.extend(events)
 
     def _get_deque_for_event_type(self, event_type):
-        return collections.deque(maxlen=self.max_events.get(event_type, self.default_max_events))
+        maxlen = self.max_events.get(event_type, self.default_max_events)
+        if self.aggregate_stack_samples and event_type is stack_event.StackSampleEvent:
+            return StackSampleAggregate(maxlen)
+        return collections.deque(maxlen=maxlen)
 
     def _reset_events(self):
         self.events = _defaultdictkey(self._get_deque_for_event_type)
@@ -1,10 +1,13 @@
 # -*- encoding: utf-8 -*-
+import collections
 import logging
+import typing
 
 import attr
 
 from ddtrace.internal import compat
 from ddtrace.internal import periodic
+from ddtrace.internal import service
 from ddtrace.internal.datadog.profiling import ddup
 from ddtrace.profiling import _traceback
 from ddtrace.profiling import exporter
@@ -14,6 +17,60 @@ from ddtrace.settings.profiling import config
 LOG = logging.getLogger(__name__)
 
 
+def _complete_export(upload):
+    # type: (typing.Callable[[], typing.Any]) -> None
+    try:
+        upload()
+    except exporter.ExportError as e:
+        LOG.warning("Unable to export profile: %s. Ignoring.", _traceback.format_exception(e))
+    except Exception:
+        LOG.exception(
+            "Unexpected error while exporting events. "
+            "Please report this bug to https://github.com/DataDog/dd-trace-py/issues"
+        )
+
+
+@attr.s
+class _UploadWorker(periodic.AwakeablePeriodicService):
+    """Complete the exports built by the scheduler in a separate thread.
+
+    Pending exports are kept in a small bounded queue. When the exports cannot keep up, e.g. because the network is
+    slow, the oldest pending export is dropped rather than delaying the next flushes of the scheduler.
+    """
+
+    max_pending = attr.ib(type=int, default=2)
+    _interval = attr.ib(type=float, default=config.upload_interval)
+    _pending = attr.ib(init=False, repr=False, eq=False)
+
+    def __attrs_post_init__(self):
+        self._pending = collections.deque(
+            maxlen=self.max_pending
+        )  # type: typing.Deque[typing.Callable[[], typing.Any]]
+
+    def submit(
+        self, upload  # type: typing.Callable[[], typing.Any]
+    ):
+        # type: (...) -> None
+        """Queue an export to complete, dropping the oldest pending one if the queue is full."""
+        if len(self._pending) == self.max_pending:
+            LOG.warning("Dropping a profile: the previous ones are still being uploaded")
+        self._pending.append(upload)
+        self.awake(wait=False)
+
+    def periodic(self):
+        # type: (...) -> None
+        while True:
+            try:
+                upload = self._pending.popleft()
+            except IndexError:
+                return
+            _complete_export(upload)
+
+    def on_shutdown(self):
+        # Complete what was queued before being stopped
+        self.periodic()
+
+
 @attr.s
 class Scheduler(periodic.PeriodicService):
     """Schedule export of recorded data."""
@@ -26,6 +83,9 @@ class Scheduler(periodic.PeriodicService):
     _last_export = attr.ib(init=False, default=None, eq=False)
     _export_libdd_enabled = attr.ib(type=bool, default=config.export.libdd_enabled)
     _export_py_enabled = attr.ib(type=bool, default=config.export.py_enabled)
+    # The number of profiles that can wait to be uploaded in the background, 0 to upload them while flushing
+    _upload_queue_size = attr.ib(type=int, default=2)
+    _uploader = attr.ib(init=False, default=None, repr=False, eq=False)
 
     def __attrs_post_init__(self):
         # Copy the value to use it later since we're going to adjust the real interval
@@ -35,10 +95,27 @@ class Scheduler(periodic.PeriodicService):
         # type: (...) -> None
         """Start the scheduler."""
         LOG.debug("Starting scheduler")
+        if self._upload_queue_size > 0:
+            self._uploader = _UploadWorker(max_pending=self._upload_queue_size)
+            self._uploader.start()
         super(Scheduler, self)._start_service()
         self._last_export = compat.time_ns()
         LOG.debug("Scheduler started")
 
+    def on_shutdown(self):
+        # Stop the uploader from the scheduler thread: no flush can submit anything to it after this point, and it
+        # completes the pending uploads before exiting.
+        if self._uploader is not None:
+            self._uploader.stop()
+
+    def join(
+        self, timeout=None  # type: typing.Optional[float]
+    ):
+        # type: (...) -> None
+        super(Scheduler, self).join(timeout)
+        if self._uploader is not None:
+            self._uploader.join(timeout)
+
     def flush(self):
         """Flush events from recorder to exporters."""
         LOG.debug("Flushing events")
@@ -60,16 +137,28 @@ class Scheduler(periodic.PeriodicService):
         events = self.recorder.reset()
         start = self._last_export
         self._last_export = compat.time_ns()
+        uploader = self._uploader
+        if uploader is not None and uploader.status != service.ServiceStatus.RUNNING:
+            # Once stopped, e.g. for the last flush at shutdown, upload right away
+            uploader = None
         for exp in self.exporters:
             try:
-                exp.export(events, start, self._last_export)
+                upload = exp.build(events, start, self._last_export)
             except exporter.ExportError as e:
                 LOG.warning("Unable to export profile: %s. Ignoring.", _traceback.format_exception(e))
+                continue
             except Exception:
                 LOG.exception(
                     "Unexpected error while exporting events. "
                     "Please report this bug to https://github.com/DataDog/dd-trace-py/issues"
                 )
+                continue
+            if upload is None:
+                continue
+            if uploader is None:
+                _complete_export(upload)
+            else:
+                uploader.submit(upload)
 
     def periodic(self):
         start_time = compat.monotonic()
@@ -94,6 +183,8 @@ class ServerlessScheduler(Scheduler):
     FLUSH_AFTER_INTERVALS = 60.0
 
     _interval = attr.ib(default=FORCED_INTERVAL, type=float)
+    # The process can be frozen right after a flush: upload profiles before returning
+    _upload_queue_size = attr.ib(default=0, type=int)
     _profiled_intervals = attr.ib(init=False, default=0)
 
     def periodic(self):
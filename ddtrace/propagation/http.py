@@ -1,10 +1,15 @@
 import re
+from typing import Any
+from typing import Callable
 from typing import Dict
 from typing import FrozenSet
+from typing import Iterable
 from typing import List
+from typing import Mapping
 from typing import Optional
 from typing import Text
 from typing import Tuple
+from typing import Union
 from typing import cast
 
 from ddtrace import config
@@ -32,6 +37,7 @@ from ..internal.constants import W3C_TRACEPARENT_KEY
 from ..internal.constants import W3C_TRACESTATE_KEY
 from ..internal.logger import get_logger
 from ..internal.sampling import validate_sampling_decision
+from ..internal.utils.cache import cached
 from ..span import _get_64_highest_order_bits_as_hex
 from ..span import _get_64_lowest_order_bits_as_int
 from ..span import _MetaDictType
@@ -68,14 +74,28 @@ POSSIBLE_HTTP_HEADER_TRACE_IDS = _possible_header(HTTP_HEADER_TRACE_ID)
 POSSIBLE_HTTP_HEADER_PARENT_IDS = _possible_header(HTTP_HEADER_PARENT_ID)
 POSSIBLE_HTTP_HEADER_SAMPLING_PRIORITIES = _possible_header(HTTP_HEADER_SAMPLING_PRIORITY)
 POSSIBLE_HTTP_HEADER_ORIGIN = _possible_header(HTTP_HEADER_ORIGIN)
-_POSSIBLE_HTTP_HEADER_TAGS = frozenset([_HTTP_HEADER_TAGS, get_wsgi_header(_HTTP_HEADER_TAGS).lower()])
-_POSSIBLE_HTTP_HEADER_B3_SINGLE_HEADER = _possible_header(_HTTP_HEADER_B3_SINGLE)
-_POSSIBLE_HTTP_HEADER_B3_TRACE_IDS = _possible_header(_HTTP_HEADER_B3_TRACE_ID)
-_POSSIBLE_HTTP_HEADER_B3_SPAN_IDS = _possible_header(_HTTP_HEADER_B3_SPAN_ID)
-_POSSIBLE_HTTP_HEADER_B3_SAMPLEDS = _possible_header(_HTTP_HEADER_B3_SAMPLED)
-_POSSIBLE_HTTP_HEADER_B3_FLAGS = _possible_header(_HTTP_HEADER_B3_FLAGS)
-_POSSIBLE_HTTP_HEADER_TRACEPARENT = _possible_header(_HTTP_HEADER_TRACEPARENT)
-_POSSIBLE_HTTP_HEADER_TRACESTATE = _possible_header(_HTTP_HEADER_TRACESTATE)
+
+# The headers read when extracting a context, by the names they are most
+# likely to be received with: lower case, title case and WSGI environ keys.
+# Other names are matched once lower cased.
+_EXTRACT_HEADERS = {}  # type: Dict[str, str]
+for _header in (
+    HTTP_HEADER_TRACE_ID,
+    HTTP_HEADER_PARENT_ID,
+    HTTP_HEADER_SAMPLING_PRIORITY,
+    HTTP_HEADER_ORIGIN,
+    _HTTP_HEADER_TAGS,
+    _HTTP_HEADER_B3_SINGLE,
+    _HTTP_HEADER_B3_TRACE_ID,
+    _HTTP_HEADER_B3_SPAN_ID,
+    _HTTP_HEADER_B3_SAMPLED,
+    _HTTP_HEADER_B3_FLAGS,
+    _HTTP_HEADER_TRACEPARENT,
+    _HTTP_HEADER_TRACESTATE,
+):
+    for _name in (_header, _header.title(), get_wsgi_header(_header), get_wsgi_header(_header).lower()):
+        _EXTRACT_HEADERS[_name] = _header
+del _header, _name
 
 
 # https://www.w3.org/TR/trace-context/#traceparent-header-field-values
@@ -95,13 +115,27 @@ _TRACEPARENT_HEX_REGEX = re.compile(
 )
 
 
-def _extract_header_value(possible_header_names, headers, default=None):
-    # type: (FrozenSet[str], Dict[str, str], Optional[str]) -> Optional[str]
-    for header in possible_header_names:
-        if header in headers:
-            return ensure_str(headers[header], errors="backslashreplace")
+def _read_extract_headers(headers):
+    # type: (Union[Mapping[str, str], Iterable[Tuple[Union[str, bytes], Union[str, bytes]]]]) -> Dict[str, str]
+    """Return the values of the headers read when extracting a context, by header name.
 
-    return default
+    The headers are scanned once, without copying them. Header names are
+    matched case-insensitively, and WSGI environ keys are supported.
+    """
+    # DEV: Header names can be bytes, which are never found as-is
+    names = _EXTRACT_HEADERS  # type: Dict[Any, str]
+    found = {}  # type: Dict[str, str]
+    items = headers.items() if hasattr(headers, "items") else headers
+    for name, value in items:
+        header = names.get(name)
+        if header is None:
+            if isinstance(name, bytes):
+                name = name.decode("latin-1")
+            header = names.get(name.lower())
+            if header is None:
+                continue
+        found[header] = ensure_str(value, errors="backslashreplace")
+    return found
 
 
 def _hex_id_to_dd_id(hex_id):
@@ -150,6 +184,19 @@ class _DatadogMultiHeader:
     def _is_valid_datadog_trace_tag_key(key):
         return key.startswith("_dd.p.")
 
+    @staticmethod
+    @cached()
+    def _decode_tags(tags_value):
+        # type: (str) -> Dict[str, str]
+        return {
+            k: v
+            for (k, v) in decode_tagset_string(tags_value).items()
+            if (
+                k not in _DatadogMultiHeader._X_DATADOG_TAGS_EXTRACT_REJECT
+                and _DatadogMultiHeader._is_valid_datadog_trace_tag_key(k)
+            )
+        }
+
     @staticmethod
     def _inject(span_context, headers):
         # type: (Context, Dict[str, str]) -> None
@@ -209,7 +256,7 @@ class _DatadogMultiHeader:
     @staticmethod
     def _extract(headers):
         # type: (Dict[str, str]) -> Optional[Context]
-        trace_id_str = _extract_header_value(POSSIBLE_HTTP_HEADER_TRACE_IDS, headers)
+        trace_id_str = headers.get(HTTP_HEADER_TRACE_ID)
         if trace_id_str is None:
             return None
         try:
@@ -223,37 +270,17 @@ class _DatadogMultiHeader:
             )
             return None
 
-        parent_span_id = _extract_header_value(
-            POSSIBLE_HTTP_HEADER_PARENT_IDS,
-            headers,
-            default="0",
-        )
-        sampling_priority = _extract_header_value(
-            POSSIBLE_HTTP_HEADER_SAMPLING_PRIORITIES,
-            headers,
-        )
-        origin = _extract_header_value(
-            POSSIBLE_HTTP_HEADER_ORIGIN,
-            headers,
-        )
+        parent_span_id = headers.get(HTTP_HEADER_PARENT_ID, "0")
+        sampling_priority = headers.get(HTTP_HEADER_SAMPLING_PRIORITY)
+        origin = headers.get(HTTP_HEADER_ORIGIN)
 
         meta = None
-        tags_value = _extract_header_value(
-            _POSSIBLE_HTTP_HEADER_TAGS,
-            headers,
-            default="",
-        )
+        tags_value = headers.get(_HTTP_HEADER_TAGS, "")
         if tags_value:
             # Do not fail if the tags are malformed
             try:
-                meta = {
-                    k: v
-                    for (k, v) in decode_tagset_string(tags_value).items()
-                    if (
-                        k not in _DatadogMultiHeader._X_DATADOG_TAGS_EXTRACT_REJECT
-                        and _DatadogMultiHeader._is_valid_datadog_trace_tag_key(k)
-                    )
-                }
+                # DEV: The decoded tags are cached, copy them before they are changed
+                meta = _DatadogMultiHeader._decode_tags(tags_value).copy()
             except TagsetMaxSizeDecodeError:
                 meta = {
                     "_dd.propagation_error": "extract_max_size",
@@ -294,7 +321,7 @@ class _DatadogMultiHeader:
             return Context(
                 # DEV: Do not allow `0` for trace id or span id, use None instead
                 trace_id=trace_id or None,
-                span_id=int(parent_span_id) or None,  # type: ignore[arg-type]
+                span_id=int(parent_span_id) or None,
                 sampling_priority=sampling_priority,  # type: ignore[arg-type]
                 dd_origin=origin,
                 # DEV: This cast is needed because of the type requirements of
@@ -377,25 +404,13 @@ class _B3MultiHeader:
     @staticmethod
     def _extract(headers):
         # type: (Dict[str, str]) -> Optional[Context]
-        trace_id_val = _extract_header_value(
-            _POSSIBLE_HTTP_HEADER_B3_TRACE_IDS,
-            headers,
-        )
+        trace_id_val = headers.get(_HTTP_HEADER_B3_TRACE_ID)
         if trace_id_val is None:
             return None
 
-        span_id_val = _extract_header_value(
-            _POSSIBLE_HTTP_HEADER_B3_SPAN_IDS,
-            headers,
-        )
-        sampled = _extract_header_value(
-            _POSSIBLE_HTTP_HEADER_B3_SAMPLEDS,
-            headers,
-        )
-        flags = _extract_header_value(
-            _POSSIBLE_HTTP_HEADER_B3_FLAGS,
-            headers,
-        )
+        span_id_val = headers.get(_HTTP_HEADER_B3_SPAN_ID)
+        sampled = headers.get(_HTTP_HEADER_B3_SAMPLED)
+        flags = headers.get(_HTTP_HEADER_B3_FLAGS)
 
         # Try to parse values into their expected types
         try:
@@ -493,7 +508,7 @@ class _B3SingleHeader:
     @staticmethod
     def _extract(headers):
         # type: (Dict[str, str]) -> Optional[Context]
-        single_header = _extract_header_value(_POSSIBLE_HTTP_HEADER_B3_SINGLE_HEADER, headers)
+        single_header = headers.get(_HTTP_HEADER_B3_SINGLE)
         if not single_header:
             return None
 
@@ -682,6 +697,26 @@ class _TraceContext:
         else:
             return None, {}, None
 
+    @staticmethod
+    @cached()
+    def _decode_tracestate(ts):
+        # type: (str) -> Tuple[str, bool, Optional[Tuple[Optional[int], Dict[str, str], Optional[str]]]]
+        """Return the normalized tracestate, whether it is valid and the values of its dd list member,
+        or ``None`` if they are invalid.
+        """
+        # whitespace is allowed, but whitespace to start or end values should be trimmed
+        # e.g. "foo=1 \t , \t bar=2, \t baz=3" -> "foo=1,bar=2,baz=3"
+        ts_l = [member.strip() for member in ts.split(",")]
+        ts = ",".join(ts_l)
+        # the value MUST contain only ASCII characters in the
+        # range of 0x20 to 0x7E
+        if re.search(r"[^\x20-\x7E]+", ts):
+            return ts, False, None
+        try:
+            return ts, True, _TraceContext._get_tracestate_values(ts_l)
+        except (TypeError, ValueError):
+            return ts, True, None
+
     @staticmethod
     def _get_sampling_priority(traceparent_sampled, tracestate_sampling_priority):
         # type: (int, Optional[int]) -> int
@@ -711,7 +746,7 @@ class _TraceContext:
         # type: (Dict[str, str]) -> Optional[Context]
 
         try:
-            tp = _extract_header_value(_POSSIBLE_HTTP_HEADER_TRACEPARENT, headers)
+            tp = headers.get(_HTTP_HEADER_TRACEPARENT)
             if tp is None:
                 log.debug("no traceparent header")
                 return None
@@ -722,25 +757,17 @@ class _TraceContext:
         origin = None
         meta = {W3C_TRACEPARENT_KEY: tp}  # type: _MetaDictType
 
-        ts = _extract_header_value(_POSSIBLE_HTTP_HEADER_TRACESTATE, headers)
+        tracestate = headers.get(_HTTP_HEADER_TRACESTATE)
 
-        if ts:
-            # whitespace is allowed, but whitespace to start or end values should be trimmed
-            # e.g. "foo=1 \t , \t bar=2, \t baz=3" -> "foo=1,bar=2,baz=3"
-            ts_l = [member.strip() for member in ts.split(",")]
-            ts = ",".join(ts_l)
-            # the value MUST contain only ASCII characters in the
-            # range of 0x20 to 0x7E
-            if re.search(r"[^\x20-\x7E]+", ts):
+        if tracestate:
+            ts, valid, tracestate_values = _TraceContext._decode_tracestate(tracestate)
+            if not valid:
                 log.debug("received invalid tracestate header: %r", ts)
             else:
                 # store tracestate so we keep other vendor data for injection, even if dd ends up being invalid
                 meta[W3C_TRACESTATE_KEY] = ts
-                try:
-                    tracestate_values = _TraceContext._get_tracestate_values(ts_l)
-                except (TypeError, ValueError):
+                if tracestate_values is None:
                     log.debug("received invalid dd header value in tracestate: %r ", ts)
-                    tracestate_values = None
 
                 if tracestate_values:
                     sampling_priority_ts, other_propagated_tags, origin = tracestate_values
@@ -770,6 +797,22 @@ class _TraceContext:
                 headers[_HTTP_HEADER_TRACESTATE] = ts
 
 
+# The injectors of the propagation styles, in the order the headers are injected
+_INJECTORS = (
+    (PROPAGATION_STYLE_DATADOG, _DatadogMultiHeader._inject),
+    (PROPAGATION_STYLE_B3_MULTI, _B3MultiHeader._inject),
+    (PROPAGATION_STYLE_B3_SINGLE, _B3SingleHeader._inject),
+    (_PROPAGATION_STYLE_W3C_TRACECONTEXT, _TraceContext._inject),
+)
+
+
+@cached()
+def _get_injectors(styles):
+    # type: (Tuple[str, ...]) -> Tuple[Callable[[Context, Dict[str, str]], None], ...]
+    """Return the injectors of the given propagation styles."""
+    return tuple(inject for style, inject in _INJECTORS if style in styles)
+
+
 class _NOP_Propagator:
     @staticmethod
     def _extract(headers):
@@ -822,18 +865,43 @@ class HTTPPropagator(object):
             log.debug("tried to inject invalid context %r", span_context)
             return
 
-        if PROPAGATION_STYLE_DATADOG in config._propagation_style_inject:
-            _DatadogMultiHeader._inject(span_context, headers)
-        if PROPAGATION_STYLE_B3_MULTI in config._propagation_style_inject:
-            _B3MultiHeader._inject(span_context, headers)
-        if PROPAGATION_STYLE_B3_SINGLE in config._propagation_style_inject:
-            _B3SingleHeader._inject(span_context, headers)
-        if _PROPAGATION_STYLE_W3C_TRACECONTEXT in config._propagation_style_inject:
-            _TraceContext._inject(span_context, headers)
+        injectors = _get_injectors(tuple(config._propagation_style_inject))
+        tags_enabled = config._x_datadog_tags_enabled
+        tags_max_length = config._x_datadog_tags_max_length
+
+        # Reuse the headers last injected for the context if it has not changed since
+        cache = span_context._injected_headers
+        if (
+            cache is None
+            or cache[0] is not injectors
+            or cache[1] is not tags_enabled
+            or cache[2] != tags_max_length
+            or cache[3] != span_context.trace_id
+            or cache[4] != span_context.span_id
+            or cache[5] != span_context._meta
+            or cache[6] != span_context._metrics
+        ):
+            injected = {}  # type: Dict[str, str]
+            for inject in injectors:
+                inject(span_context, injected)
+            # DEV: Injecting can add tags to the context, keep a copy of the tags they were injected with
+            cache = span_context._injected_headers = (
+                injectors,
+                tags_enabled,
+                tags_max_length,
+                span_context.trace_id,
+                span_context.span_id,
+                span_context._meta.copy(),
+                span_context._metrics.copy(),
+                injected,
+            )
+
+        for name, value in cache[7].items():
+            headers[name] = value
 
     @staticmethod
     def extract(headers):
-        # type: (Dict[str,str]) -> Context
+        # type: (Union[Mapping[str, str], Iterable[Tuple[Union[str, bytes], Union[str, bytes]]]]) -> Context
         """Extract a Context from HTTP headers into a new Context.
 
         Here is an example from a web endpoint::
@@ -848,19 +916,23 @@ class HTTPPropagator(object):
                 with tracer.trace('my_controller') as span:
                     span.set_tag('http.url', url)
 
-        :param dict headers: HTTP headers to extract tracing attributes.
+        :param dict headers: HTTP headers to extract tracing attributes. A WSGI environ, or an iterable of
+            ``(name, value)`` pairs like ASGI headers, are also accepted.
         :return: New `Context` with propagated attributes.
         """
         if not headers:
             return Context()
 
         try:
-            normalized_headers = {name.lower(): v for name, v in headers.items()}
+            # DEV: Scan the headers once for all the propagation styles
+            extract_headers = _read_extract_headers(headers)
+            if not extract_headers:
+                return Context()
 
             # loop through the extract propagation styles specified in order
             for prop_style in config._propagation_style_extract:
                 propagator = _PROP_STYLES[prop_style]
-                context = propagator._extract(normalized_headers)  # type: ignore
+                context = propagator._extract(extract_headers)  # type: ignore
                 if context is not None:
                     return context
 
@@ -20,8 +20,9 @@ from .internal.constants import DEFAULT_SAMPLING_RATE_LIMIT
 from .internal.constants import MAX_UINT_64BITS as _MAX_UINT_64BITS
 from .internal.logger import get_logger
 from .internal.rate_limiter import RateLimiter
+from .internal.sampling import SamplingRuleList
+from .internal.sampling import SamplingRuleMatcher
 from .internal.sampling import _apply_rate_limit
-from .internal.sampling import _get_highest_precedence_rule_matching
 from .internal.sampling import _set_sampling_tags
 from .sampling_rule import SamplingRule
 from .settings import _config as ddconfig
@@ -202,14 +203,15 @@ class DatadogSampler(RateByServiceSampler):
         ])
 
     Rules are evaluated in the order they are provided, and the first rule that matches is used.
-    If no rule matches, then the agent sample rates are used.
+    If no rule matches, then the agent sample rates are used. To update the rules, assign a new list
+    to ``rules``.
 
     This sampler can be configured with a rate limit. This will ensure the max number of
     sampled traces per second does not exceed the supplied limit. The default is 100 traces kept
     per second.
     """
 
-    __slots__ = ("limiter", "rules")
+    __slots__ = ("limiter", "_rules")
 
     NO_RATE_LIMIT = -1
     # deprecate and remove the DEFAULT_RATE_LIMIT field from DatadogSampler
@@ -249,18 +251,17 @@ class DatadogSampler(RateByServiceSampler):
                 rules = self._parse_rules_from_env_variable(env_sampling_rules)
             else:
                 rules = []
-            self.rules = rules
         else:
-            self.rules = []
             # Validate that rules is a list of SampleRules
             for rule in rules:
                 if not isinstance(rule, SamplingRule):
                     raise TypeError("Rule {!r} must be a sub-class of type ddtrace.sampler.SamplingRules".format(rule))
-                self.rules.append(rule)
+            rules = list(rules)
 
         # DEV: Default sampling rule must come last
         if default_sample_rate is not None:
-            self.rules.append(SamplingRule(sample_rate=default_sample_rate))
+            rules.append(SamplingRule(sample_rate=default_sample_rate))
+        self.rules = rules
 
         # Configure rate limiter
         self.limiter = RateLimiter(rate_limit)
@@ -275,6 +276,26 @@ class DatadogSampler(RateByServiceSampler):
 
     __repr__ = __str__
 
+    @property
+    def rules(self):
+        # type: () -> List[SamplingRule]
+        """The trace sampling rules, in order of precedence.
+
+        The rules can be replaced or modified in place: the cached sampling
+        decisions are dropped on the next sampled span.
+        """
+        return self._rules
+
+    @rules.setter
+    def rules(self, rules):
+        # type: (List[SamplingRule]) -> None
+        self._rules = SamplingRuleList(rules)
+
+    @property
+    def _rule_matcher(self):
+        # type: () -> SamplingRuleMatcher
+        return self._rules.matcher
+
     def _parse_rules_from_env_variable(self, rules):
         # type: (str) -> List[SamplingRule]
         sampling_rules = []
@@ -304,7 +325,7 @@ class DatadogSampler(RateByServiceSampler):
         """
         If allow_false is False, this function will return True regardless of the sampling decision
         """
-        matched_rule = _get_highest_precedence_rule_matching(span, self.rules)
+        matched_rule = self._rules.matcher.match(span)
 
         if matched_rule:
             sampled = matched_rule.sample(span)
@@ -120,10 +120,8 @@ class SamplingRule(object):
         # Exact match on the values
         return prop == pattern
 
-    @cachedmethod()
-    def _matches(self, key):
+    def _props_match(self, key):
         # type: (Tuple[Optional[str], str, Optional[str]]) -> bool
-        # self._matches exists to maintain legacy pattern values such as regex and functions
         service, name, resource = key
         for prop, pattern in [(service, self.service), (name, self.name), (resource, self.resource)]:
             if not self._pattern_matches(prop, pattern):
@@ -131,6 +129,12 @@ class SamplingRule(object):
         else:
             return True
 
+    @cachedmethod()
+    def _matches(self, key):
+        # type: (Tuple[Optional[str], str, Optional[str]]) -> bool
+        # self._matches exists to maintain legacy pattern values such as regex and functions
+        return self._props_match(key)
+
     def matches(self, span):
         # type: (Span) -> bool
         """
@@ -21,10 +21,13 @@ from ddtrace.vendor.debtcollector import deprecate
 from ..internal import gitmetadata
 from ..internal.constants import _PROPAGATION_STYLE_DEFAULT
 from ..internal.constants import DEFAULT_BUFFER_SIZE
+from ..internal.constants import DEFAULT_FLUSH_HIGH_WATER_MARK
 from ..internal.constants import DEFAULT_MAX_PAYLOAD_SIZE
 from ..internal.constants import DEFAULT_PROCESSING_INTERVAL
 from ..internal.constants import DEFAULT_REUSE_CONNECTIONS
 from ..internal.constants import DEFAULT_SAMPLING_RATE_LIMIT
+from ..internal.constants import DEFAULT_SPOOL_MAX_AGE
+from ..internal.constants import DEFAULT_SPOOL_MAX_SIZE
 from ..internal.constants import DEFAULT_TIMEOUT
 from ..internal.constants import PROPAGATION_STYLE_ALL
 from ..internal.constants import PROPAGATION_STYLE_B3_SINGLE
@@ -274,6 +277,19 @@ class Config(object):
             os.getenv("DD_TRACE_WRITER_REUSE_CONNECTIONS", DEFAULT_REUSE_CONNECTIONS)
         )
         self._trace_writer_log_err_payload = asbool(os.environ.get("_DD_TRACE_WRITER_LOG_ERROR_PAYLOADS", False))
+        self._trace_writer_encoder_buffers = int(os.getenv("DD_TRACE_WRITER_ENCODER_BUFFERS", default=1))
+        self._trace_writer_connection_pool_size = int(os.getenv("DD_TRACE_WRITER_CONNECTION_POOL_SIZE", default=1))
+        self._trace_writer_flush_high_water_mark = float(
+            os.getenv("DD_TRACE_WRITER_FLUSH_HIGH_WATER_MARK", default=DEFAULT_FLUSH_HIGH_WATER_MARK)
+        )
+        self._trace_writer_compression = os.getenv("DD_TRACE_WRITER_COMPRESSION") or None
+        self._trace_writer_spool_dir = os.getenv("DD_TRACE_WRITER_SPOOL_DIR")
+        self._trace_writer_spool_max_size = int(
+            os.getenv("DD_TRACE_WRITER_SPOOL_MAX_SIZE_BYTES", default=DEFAULT_SPOOL_MAX_SIZE)
+        )
+        self._trace_writer_spool_max_age_seconds = float(
+            os.getenv("DD_TRACE_WRITER_SPOOL_MAX_AGE_SECONDS", default=DEFAULT_SPOOL_MAX_AGE)
+        )
 
         self._trace_agent_hostname = os.environ.get("DD_AGENT_HOST", os.environ.get("DD_TRACE_AGENT_HOSTNAME"))
         self._trace_agent_port = os.environ.get("DD_AGENT_PORT", os.environ.get("DD_TRACE_AGENT_PORT"))
@@ -421,6 +437,10 @@ class Config(object):
             os.environ["OTEL_PYTHON_CONTEXT"] = "ddcontextvars_context"
         self._ddtrace_bootstrapped = False
         self._span_aggregator_rlock = asbool(os.getenv("DD_TRACE_SPAN_AGGREGATOR_RLOCK", True))
+        self._span_aggregator_shards = int(os.getenv("DD_TRACE_SPAN_AGGREGATOR_SHARDS", default=16))
+        self._trace_async_processing_enabled = asbool(os.getenv("DD_TRACE_ASYNC_PROCESSING_ENABLED", default=False))
+        self._trace_async_processing_queue_size = int(os.getenv("DD_TRACE_ASYNC_PROCESSING_QUEUE_SIZE", default=1000))
+        self._trace_shared_tags_enabled = asbool(os.getenv("DD_TRACE_SHARED_TAGS_ENABLED", default=False))
 
         self._iast_redaction_enabled = asbool(os.getenv("DD_IAST_REDACTION_ENABLED", default=True))
         self._iast_redaction_name_pattern = os.getenv(
@@ -165,6 +165,15 @@ class ProfilingConfig(En):
             help="Whether to enable the stack profiler",
         )
 
+        aggregate = En.v(
+            bool,
+            "aggregate",
+            default=False,
+            help_type="Boolean",
+            help="Whether to aggregate the stack samples as they are collected. This bounds the memory used by "
+            "the number of distinct stacks rather than by the number of samples",
+        )
+
     class Lock(En):
         __item__ = __prefix__ = "lock"
 
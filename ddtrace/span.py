@@ -8,6 +8,7 @@ from typing import Dict
 from typing import List
 from typing import Optional
 from typing import Text
+from typing import Tuple
 from typing import Union
 
 import six
@@ -32,7 +33,7 @@ from .context import Context
 from .ext import http
 from .ext import net
 from .internal._rand import rand64bits as _rand64bits
-from .internal._rand import rand128bits as _rand128bits
+from .internal._rand import rand_trace_span_ids as _rand_trace_span_ids
 from .internal.compat import NumericType
 from .internal.compat import StringIO
 from .internal.compat import ensure_text
@@ -50,6 +51,7 @@ from .tracing import _span_link
 
 
 _NUMERIC_TAGS = (ANALYTICS_SAMPLE_RATE_KEY,)
+_MAX_INT_METRIC = 2 ** 53
 _TagNameType = Union[Text, bytes]
 _MetaDictType = Dict[_TagNameType, Text]
 _MetricDictType = Dict[_TagNameType, NumericType]
@@ -81,6 +83,7 @@ class Span(object):
         "trace_id",
         "parent_id",
         "_meta",
+        "_shared_meta",
         "error",
         "_metrics",
         "_store",
@@ -153,6 +156,8 @@ class Span(object):
 
         # tags / metadata
         self._meta = {}  # type: _MetaDictType
+        # Tags shared with other spans, which the span's own tags and metrics take precedence over
+        self._shared_meta = None  # type: Optional[_MetaDictType]
         self.error = 0
         self._metrics = {}  # type: _MetricDictType
 
@@ -161,13 +166,13 @@ class Span(object):
         self.duration_ns = None  # type: Optional[int]
 
         # tracing
-        if trace_id is not None:
-            self.trace_id = trace_id  # type: int
-        elif config._128_bit_trace_id_enabled:
-            self.trace_id = _rand128bits()
+        if trace_id is None:
+            # Root of a new trace: generate both ids at once
+            trace_id, random_span_id = _rand_trace_span_ids(config._128_bit_trace_id_enabled)
+            self.span_id = span_id or random_span_id  # type: int
         else:
-            self.trace_id = _rand64bits()
-        self.span_id = span_id or _rand64bits()  # type: int
+            self.span_id = span_id or _rand64bits()
+        self.trace_id = trace_id  # type: int
         self.parent_id = parent_id  # type: Optional[int]
         self._on_finish_callbacks = [] if on_finish is None else on_finish
 
@@ -175,7 +180,7 @@ class Span(object):
         self.sampled = True  # type: bool
 
         self._context = context._with_span(self) if context else None  # type: Optional[Context]
-        self._links = links or []
+        self._links = links or None  # type: Optional[List[_span_link.SpanLink]]
         self._parent = None  # type: Optional[Span]
         self._ignored_exceptions = None  # type: Optional[List[Exception]]
         self._local_root = None  # type: Optional[Span]
@@ -306,75 +311,100 @@ class Span(object):
             log.warning("Ignoring tag pair %s:%s. Key must be a string.", key, value)
             return
 
-        # Special case, force `http.status_code` as a string
+        handler = _TAG_HANDLERS.get(key)
+        if handler is not None:
+            handler(self, key, value)
+        elif type(value) is str:
+            # Fast path for the most common case: a string value for an ordinary key
+            self._meta[key] = value
+            if key in self._metrics:
+                del self._metrics[key]
+        elif not self._set_numeric_tag(key, value):
+            self._set_meta_tag(key, value)
+
+    def _set_numeric_tag(self, key, value):
+        # type: (_TagNameType, Any) -> bool
+        """Set integers that are less than equal to 2^53 and floats as metrics.
+
+        Return whether the tag was set.
+        """
+        if (value is not None and is_integer(value) and abs(value) <= _MAX_INT_METRIC) or isinstance(value, float):
+            self.set_metric(key, value)
+            return True
+        return False
+
+    def _set_meta_tag(self, key, value):
+        # type: (_TagNameType, Any) -> None
+        try:
+            self._meta[key] = stringify(value)
+            if key in self._metrics:
+                del self._metrics[key]
+        except Exception:
+            log.warning("error setting tag %s, ignoring it", key, exc_info=True)
+
+    def _set_status_code_tag(self, key, value):
+        # type: (_TagNameType, Any) -> None
         # DEV: `http.status_code` *has* to be in `meta` for metrics
         #   calculated in the trace agent
-        if key == http.STATUS_CODE:
-            value = str(value)
-
-        # Determine once up front
-        val_is_an_int = is_integer(value)
+        self._set_meta_tag(key, str(value))
 
+    def _set_int_tag(self, key, value):
+        # type: (_TagNameType, Any) -> None
         # Explicitly try to convert expected integers to `int`
         # DEV: Some integrations parse these values from strings, but don't call `int(value)` themselves
-        INT_TYPES = (net.TARGET_PORT,)
-        if key in INT_TYPES and not val_is_an_int:
+        if not is_integer(value):
             try:
                 value = int(value)
-                val_is_an_int = True
             except (ValueError, TypeError):
                 pass
+        if not self._set_numeric_tag(key, value):
+            self._set_meta_tag(key, value)
 
-        # Set integers that are less than equal to 2^53 as metrics
-        if value is not None and val_is_an_int and abs(value) <= 2 ** 53:
-            self.set_metric(key, value)
+    def _set_float_tag(self, key, value):
+        # type: (_TagNameType, Any) -> None
+        # Key should explicitly be converted to a float if needed
+        if self._set_numeric_tag(key, value):
             return
 
-        # All floats should be set as a metric
-        elif isinstance(value, float):
-            self.set_metric(key, value)
+        if value is None:
+            log.debug("ignoring not number metric %s:%s", key, value)
             return
 
-        # Key should explicitly be converted to a float if needed
-        elif key in _NUMERIC_TAGS:
-            if value is None:
-                log.debug("ignoring not number metric %s:%s", key, value)
-                return
-
-            try:
-                # DEV: `set_metric` will try to cast to `float()` for us
-                self.set_metric(key, value)
-            except (TypeError, ValueError):
-                log.warning("error setting numeric metric %s:%s", key, value)
-
-            return
+        try:
+            # DEV: `set_metric` will try to cast to `float()` for us
+            self.set_metric(key, value)
+        except (TypeError, ValueError):
+            log.warning("error setting numeric metric %s:%s", key, value)
 
-        elif key == MANUAL_KEEP_KEY:
+    def _set_manual_keep_tag(self, key, value):
+        # type: (_TagNameType, Any) -> None
+        if not self._set_numeric_tag(key, value):
             self._override_sampling_decision(USER_KEEP)
-            return
-        elif key == MANUAL_DROP_KEY:
+
+    def _set_manual_drop_tag(self, key, value):
+        # type: (_TagNameType, Any) -> None
+        if not self._set_numeric_tag(key, value):
             self._override_sampling_decision(USER_REJECT)
-            return
-        elif key == SERVICE_KEY:
+
+    def _set_service_tag(self, key, value):
+        # type: (_TagNameType, Any) -> None
+        if not self._set_numeric_tag(key, value):
             self.service = value
-        elif key == SERVICE_VERSION_KEY:
+            self._set_meta_tag(key, value)
+
+    def _set_service_version_tag(self, key, value):
+        # type: (_TagNameType, Any) -> None
+        if not self._set_numeric_tag(key, value):
             # Also set the `version` tag to the same value
-            # DEV: Note that we do no return, we want to set both
             self.set_tag(VERSION_KEY, value)
-        elif key == SPAN_MEASURED_KEY:
-            # Set `_dd.measured` tag as a metric
-            # DEV: `set_metric` will ensure it is an integer 0 or 1
-            if value is None:
-                value = 1
-            self.set_metric(key, value)
-            return
+            self._set_meta_tag(key, value)
 
-        try:
-            self._meta[key] = stringify(value)
-            if key in self._metrics:
-                del self._metrics[key]
-        except Exception:
-            log.warning("error setting tag %s, ignoring it", key, exc_info=True)
+    def _set_measured_tag(self, key, value):
+        # type: (_TagNameType, Any) -> None
+        # Set `_dd.measured` tag as a metric
+        # DEV: `set_metric` will ensure it is an integer 0 or 1
+        if not self._set_numeric_tag(key, value):
+            self.set_metric(key, 1 if value is None else value)
 
     def set_tag_str(self, key: _TagNameType, value: Text) -> None:
         """Set a value for a tag. Values are coerced to unicode in Python 2 and
@@ -388,25 +418,57 @@ class Span(object):
                 raise e
             log.warning("Failed to set text tag '%s'", key, exc_info=True)
 
+    def _unshare_meta(self) -> None:
+        """Copy the shared tags to the span, so that they can be changed."""
+        if self._shared_meta is not None:
+            self._meta = self.get_tags()
+            self._shared_meta = None
+
     def _remove_tag(self, key: _TagNameType) -> None:
+        if self._shared_meta is not None and key in self._shared_meta:
+            self._unshare_meta()
         if key in self._meta:
             del self._meta[key]
 
     def get_tag(self, key: _TagNameType) -> Optional[Text]:
         """Return the given tag or None if it doesn't exist."""
-        return self._meta.get(key, None)
+        value = self._meta.get(key, None)
+        if value is None and self._shared_meta is not None and key not in self._metrics:
+            return self._shared_meta.get(key, None)
+        return value
 
     def get_tags(self) -> _MetaDictType:
         """Return all tags."""
-        return self._meta.copy()
+        if self._shared_meta is None:
+            return self._meta.copy()
+        tags = {k: v for k, v in self._shared_meta.items() if k not in self._metrics}
+        tags.update(self._meta)
+        return tags
 
     def set_tags(self, tags: Dict[_TagNameType, Any]) -> None:
         """Set a dictionary of tags on the given span. Keys and values
         must be strings (or stringable)
         """
         if tags:
+            meta = self._meta
+            metrics = self._metrics
             for k, v in iter(tags.items()):
-                self.set_tag(k, v)
+                if type(v) is str and type(k) is str and k not in _TAG_HANDLERS:
+                    meta[k] = v
+                    if k in metrics:
+                        del metrics[k]
+                else:
+                    self.set_tag(k, v)
+
+    def _set_tags_str(self, tags):
+        # type: (Dict[_TagNameType, Text]) -> None
+        """Set a dictionary of text tags on the span, like ``set_tag_str``."""
+        meta = self._meta
+        for k, v in tags.items():
+            if type(v) is str:
+                meta[k] = v
+            else:
+                self.set_tag_str(k, v)
 
     def set_metric(self, key: _TagNameType, value: NumericType) -> None:
         # This method sets a numeric tag value for the given key.
@@ -505,7 +567,7 @@ class Span(object):
             ("end", None if not self.duration else self.start + self.duration),
             ("duration", self.duration),
             ("error", self.error),
-            ("tags", dict(sorted(self._meta.items()))),
+            ("tags", dict(sorted(self.get_tags().items()))),
             ("metrics", dict(sorted(self._metrics.items()))),
         ]
         return " ".join(
@@ -541,6 +603,8 @@ class Span(object):
         if attributes is None:
             attributes = dict()
 
+        if self._links is None:
+            self._links = []
         self._links.append(
             _span_link.SpanLink(
                 trace_id=trace_id,
@@ -583,6 +647,19 @@ class Span(object):
         )
 
 
+# Handlers of the tags that are not stored as-is by Span.set_tag
+_TAG_HANDLERS = {
+    http.STATUS_CODE: Span._set_status_code_tag,
+    net.TARGET_PORT: Span._set_int_tag,
+    MANUAL_KEEP_KEY: Span._set_manual_keep_tag,
+    MANUAL_DROP_KEY: Span._set_manual_drop_tag,
+    SERVICE_KEY: Span._set_service_tag,
+    SERVICE_VERSION_KEY: Span._set_service_version_tag,
+    SPAN_MEASURED_KEY: Span._set_measured_tag,
+}  # type: Dict[str, Callable[[Span, _TagNameType, Any], None]]
+_TAG_HANDLERS.update((key, Span._set_float_tag) for key in _NUMERIC_TAGS)
+
+
 def _is_top_level(span):
     # type: (Span) -> bool
     """Return whether the span is a "top level" span.
@@ -593,3 +670,18 @@ def _is_top_level(span):
     return (span._local_root is span) or (
         span._parent is not None and span._parent.service != span.service and span.service is not None
     )
+
+
+def _split_shared_tags(tags):
+    # type: (Dict[str, Any]) -> Tuple[_MetaDictType, Dict[_TagNameType, Any]]
+    """Split tags into the ones that can be shared as-is by the meta of many
+    spans and the ones that have to be set on each span with ``Span.set_tags``.
+    """
+    shared = {}  # type: _MetaDictType
+    others = {}  # type: Dict[_TagNameType, Any]
+    for k, v in tags.items():
+        if isinstance(k, six.string_types) and isinstance(v, six.string_types) and k not in _TAG_HANDLERS:
+            shared[k] = ensure_text(v, errors="replace")
+        else:
+            others[k] = v
+    return shared, others
@@ -60,6 +60,8 @@ from .sampler import BaseSampler
 from .sampler import DatadogSampler
 from .sampler import RateSampler
 from .span import Span
+from .span import _MetaDictType
+from .span import _split_shared_tags
 
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -214,6 +216,7 @@ class Tracer(object):
 
         # globally set tags
         self._tags = config.tags.copy()
+        self._update_shared_tags()
 
         # collection of services seen, used for runtime metrics tags
         # a buffer for service info so we don't perpetually send the same things
@@ -705,17 +708,10 @@ class Tracer(object):
                 span.set_tag_str(HOSTNAME_KEY, hostname.get_hostname())
 
         if not span._parent:
-            span.set_tag_str("runtime-id", get_runtime_id())
             span._metrics[PID] = self._pid
 
-        # Apply default global tags.
-        if self._tags:
-            span.set_tags(self._tags)
-
-        if config.env:
-            span.set_tag_str(ENV_KEY, config.env)
-
         # Only set the version tag on internal spans.
+        version = None
         if config.version:
             root_span = self.current_root_span()
             # if: 1. the span is the root span and the span's service matches the global config; or
@@ -725,7 +721,27 @@ class Tracer(object):
             if (root_span is None and service == config.service) or (
                 root_span and root_span.service == service and root_span.get_tag(VERSION_KEY) is not None
             ):
-                span.set_tag_str(VERSION_KEY, config.version)
+                version = config.version
+
+        if config._trace_shared_tags_enabled:
+            # The runtime id, global tags, env and version are the same for
+            # many spans: share them instead of copying them to every span.
+            span._shared_meta = self._get_shared_meta(not span._parent, version)
+            if self._unshared_tags:
+                span.set_tags(self._unshared_tags)
+        else:
+            if not span._parent:
+                span.set_tag_str("runtime-id", get_runtime_id())
+
+            # Apply default global tags.
+            if self._tags:
+                span.set_tags(self._tags)
+
+            if config.env:
+                span.set_tag_str(ENV_KEY, config.env)
+
+            if version:
+                span.set_tag_str(VERSION_KEY, version)
 
         if activate:
             self.context_provider.activate(span)
@@ -747,6 +763,24 @@ class Tracer(object):
 
     start_span = _start_span
 
+    def _get_shared_meta(self, local_root, version):
+        # type: (bool, Optional[str]) -> _MetaDictType
+        """Return the tags shared by the spans with the given runtime id, env and version."""
+        runtime_id = get_runtime_id() if local_root else None
+        key = (runtime_id, config.env, version)
+        shared_meta = self._shared_meta.get(key)
+        if shared_meta is None:
+            shared_meta = {}
+            if runtime_id:
+                shared_meta["runtime-id"] = runtime_id
+            shared_meta.update(self._shared_tags)
+            if config.env:
+                shared_meta[ENV_KEY] = config.env
+            if version:
+                shared_meta[VERSION_KEY] = version
+            self._shared_meta[key] = shared_meta
+        return shared_meta
+
     def _on_span_finish(self, span):
         # type: (Span) -> None
         active = self.current_span()
@@ -874,6 +908,9 @@ class Tracer(object):
 
     def flush(self):
         """Flush the buffer of the trace writer. This does nothing if an unbuffered trace writer is used."""
+        for processor in self._deferred_processors:
+            if isinstance(processor, SpanAggregator):
+                processor.join()
         self._writer.flush_queue()
 
     def wrap(
@@ -981,6 +1018,12 @@ class Tracer(object):
         :param dict tags: dict of tags to set at tracer level
         """
         self._tags.update(tags)
+        self._update_shared_tags()
+
+    def _update_shared_tags(self):
+        # type: () -> None
+        self._shared_tags, self._unshared_tags = _split_shared_tags(self._tags)
+        self._shared_meta = {}  # type: Dict[Tuple[Optional[str], Optional[str], Optional[str]], _MetaDictType]
 
     def shutdown(self, timeout=None):
         # type: (Optional[float]) -> None
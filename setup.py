@@ -626,6 +626,7 @@ setup(
                 "ddtrace.profiling.collector._traceback",
                 sources=["ddtrace/profiling/collector/_traceback.pyx"],
                 language="c",
+                extra_compile_args=extra_compile_args,
             ),
             Cython.Distutils.Extension(
                 "ddtrace.profiling._threading",
@@ -637,6 +638,11 @@ setup(
                 sources=["ddtrace/profiling/collector/_task.pyx"],
                 language="c",
             ),
+            Cython.Distutils.Extension(
+                "ddtrace.profiling.collector._lock_proxy",
+                sources=["ddtrace/profiling/collector/_lock_proxy.pyx"],
+                language="c",
+            ),
             Cython.Distutils.Extension(
                 "ddtrace.profiling.exporter.pprof",
                 sources=["ddtrace/profiling/exporter/pprof.pyx"],
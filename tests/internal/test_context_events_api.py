@@ -52,6 +52,50 @@ class TestContextEventsApi(unittest.TestCase):
         assert results[0] == handler_return.format(dynamic_value)
         assert results[1] == handler_return + str(dynamic_value) + "!"
 
+    def test_core_reset_listeners(self):
+        event_name = "my.cool.event"
+        core.on(event_name, lambda: True)
+        core.reset_listeners()
+        assert not core.has_listeners(event_name)
+        assert core.dispatch(event_name, []) == ([], [])
+
+    def test_core_on_same_listener(self):
+        event_name = "my.cool.event"
+        handler = mock.Mock(return_value=42)
+        core.on(event_name, handler)
+        core.on(event_name, handler)
+        results, exceptions = core.dispatch(event_name, [])
+        assert results == [42]
+        assert exceptions == [None]
+
+    def test_core_notify(self):
+        event_name = "my.cool.event"
+        calls = []
+
+        def failing_listener(*args):
+            calls.append(("failing", args))
+            raise ValueError
+
+        core.on(event_name, failing_listener)
+        core.on(event_name, lambda *args: calls.append(("ok", args)))
+        assert core.notify(event_name, [1, 2], 3) is None
+        assert calls == [("failing", ([1, 2], 3)), ("ok", ([1, 2], 3))]
+
+    def test_core_listener_exceptions_logged(self):
+        event_name = "my.cool.event"
+        exc = ValueError()
+        core.on(event_name, mock.Mock(side_effect=exc))
+        with mock.patch.object(core, "log") as log:
+            assert core.dispatch(event_name, []) == ([None], [exc])
+            core.notify(event_name)
+        assert log.debug.call_args_list == [
+            mock.call("listener of event %s failed", event_name, exc_info=True),
+            mock.call("listener of event %s failed", event_name, exc_info=True),
+        ]
+
+    def test_core_notify_no_listeners(self):
+        assert core.notify("my.cool.event", 42) is None
+
     def test_core_dispatch_multiple_listeners_multiple_threads(self):
         event_name = "my.cool.event"
 
@@ -180,6 +224,69 @@ class TestContextEventsApi(unittest.TestCase):
                 assert core.get_item(data_key) == new_data_value
             assert core.get_item(data_key) == original_data_value
 
+    def test_core_context_with_data_parent_changes(self):
+        with core.context_with_data("foo", **{"a": 1}) as parent:
+            with core.context_with_data("bar"):
+                with core.context_with_data("baz", **{"b": 2}) as child:
+                    assert core.get_item("a") == 1
+                    parent.set_item("a", 3)
+                    parent.set_item("c", 4)
+                    assert core.get_item("a") == 3
+                    assert core.get_item("c") == 4
+                    child.set_item("a", 5)
+                    assert core.get_item("a") == 5
+                    parent.set_item("a", 6)
+                    assert core.get_item("a") == 5
+                    assert core.get_item("b") == 2
+                assert core.get_item("a") == 6
+                assert core.get_item("b") is None
+
+    def test_core_context_with_data_other_chain_changes(self):
+        base = core._CURRENT_CONTEXT.get()
+        with core.context_with_data("foo", parent=base, **{"b": 2}) as foo:
+            with core.context_with_data("bar", parent=base, **{"c": 3}) as bar:
+                assert foo.get_item("b") == 2
+                flat = foo._flat
+
+                # A change to another chain does not invalidate the flattened data
+                bar.set_item("c", 4)
+                assert bar.get_item("c") == 4
+                assert foo.get_item("b") == 2
+                assert foo._flat is flat
+
+                base.set_item("a", 5)
+                try:
+                    assert foo.get_item("a") == 5
+                    assert bar.get_item("a") == 5
+                finally:
+                    del base._data["a"]
+
+    def test_core_context_with_data_chain_changes(self):
+        with core.context_with_data("root", **{"a": 1}) as root:
+            with core.context_with_data("foo", parent=root, **{"b": 2}) as foo:
+                with core.context_with_data("bar", parent=foo) as bar:
+                    assert bar.get_item("a") == 1
+                    # The data of a context that has none of its own is shared with its parent
+                    assert bar._flat is foo._flat
+
+                    foo.set_item("b", 3)
+                    assert bar.get_item("b") == 3
+                    root.set_item("a", 4)
+                    assert bar.get_item("a") == 4
+                    assert foo.get_item("a") == 4
+
+    def test_core_context_stats(self):
+        with mock.patch.object(core.log, "isEnabledFor", return_value=True), mock.patch.object(
+            core.log, "debug"
+        ) as debug:
+            with core.context_with_data("foo", **{"a": 1}):
+                with core.context_with_data("bar"):
+                    core.get_item("a")
+                    core.get_item("b")
+                core.get_item("a")
+
+        debug.assert_called_once_with("execution context %r ended: depth %d, %d data lookups", "foo", 2, 3)
+
 
 def test_core_context_data_concurrent_safety():
     data_key = "banana"
@@ -28,6 +28,13 @@ from ddtrace.internal.glob_matching import GlobMatcher
         ("test/na{2}/string", "test/na{2}/string", True),
         ("*a*a*a*a*a*a", "aaaaaaaaaaaaaaaaaaaaaaaaaax", False),
         ("*a*a*a*a*a*a", "aaaaaaaarrrrrrraaaraaarararaarararaarararaaa", True),
+        ("*a?b*", "xxaxbyy", True),
+        ("*a?b*", "xxabyy", False),
+        ("a*?", "a", False),
+        ("?*?", "ab", True),
+        ("*?", "", False),
+        ("a*b*a", "aba", True),
+        ("a*b*a", "ab", False),
     ],
 )
 def test_matching(pattern, string, result):
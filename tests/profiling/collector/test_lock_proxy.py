@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+from six.moves import _thread
+
+from ddtrace.profiling import collector
+from ddtrace.profiling import recorder
+from ddtrace.profiling.collector import _lock_proxy
+from ddtrace.profiling.collector import threading as collector_threading
+
+
+def test_capture_sampler():
+    cs = _lock_proxy.CaptureSampler(15)
+    py_cs = collector.CaptureSampler(15)
+    for _ in range(40):
+        assert cs.capture() is py_cs.capture()
+
+
+def test_capture_sampler_bad_value():
+    with pytest.raises(ValueError):
+        _lock_proxy.CaptureSampler(-1)
+
+    with pytest.raises(ValueError):
+        _lock_proxy.CaptureSampler(102)
+
+
+def test_not_sampled():
+    r = recorder.Recorder()
+    with collector_threading.ThreadingLockCollector(r, capture_pct=0):
+        lock = threading.Lock()
+        for _ in range(10):
+            assert lock.acquire()
+            assert lock.locked()
+            lock.release()
+        with lock:
+            assert lock.locked()
+    assert not lock.locked()
+    assert len(r.events[collector_threading.ThreadingLockAcquireEvent]) == 0
+    assert len(r.events[collector_threading.ThreadingLockReleaseEvent]) == 0
+
+
+def test_proxy():
+    r = recorder.Recorder()
+    with collector_threading.ThreadingLockCollector(r, capture_pct=100):
+        lock = threading.Lock()
+    assert isinstance(lock, collector_threading._ProfiledThreadingLock)
+    assert isinstance(lock.__wrapped__, _thread.LockType)
+    assert lock.name == "test_lock_proxy.py:45"
+    assert repr(lock).startswith("<_ProfiledThreadingLock at 0x")
+    assert lock.acquire_lock()
+    lock.release()
+    assert lock.acquire(True, 1)
+    assert not lock.acquire(blocking=False)
+    lock.release()
+    # The failed acquisition is recorded too, like the ones that succeed
+    assert len(r.events[collector_threading.ThreadingLockAcquireEvent]) == 3
+    assert len(r.events[collector_threading.ThreadingLockReleaseEvent]) == 2
+
+
+def test_frames():
+    r = recorder.Recorder()
+    with collector_threading.ThreadingLockCollector(r, capture_pct=100):
+        lock = threading.Lock()
+        lock.acquire()
+        lock.release()
+    (acquire_event,) = r.events[collector_threading.ThreadingLockAcquireEvent]
+    (release_event,) = r.events[collector_threading.ThreadingLockReleaseEvent]
+    # The compiled proxy does not appear in the stacks
+    assert acquire_event.frames[0] == (__file__.replace(".pyc", ".py"), 64, "test_frames", "")
+    assert release_event.frames[0] == (__file__.replace(".pyc", ".py"), 65, "test_frames", "")
@@ -320,8 +320,8 @@ def test_repr():
     test_collector._test_repr(
         stack.StackCollector,
         "StackCollector(status=<ServiceStatus.STOPPED: 'stopped'>, "
-        "recorder=Recorder(default_max_events=16384, max_events={}), min_interval_time=0.01, max_time_usage_pct=1.0, "
-        "nframes=64, ignore_profiler=False, endpoint_collection_enabled=None, tracer=None)",
+        "recorder=Recorder(default_max_events=16384, max_events={}, aggregate_stack_samples=False), "
+        "min_interval_time=0.01, max_time_usage_pct=1.0, nframes=64, ignore_profiler=False, endpoint_collection_enabled=None, tracer=None)",
     )
 
 
@@ -19,8 +19,8 @@ def test_repr():
     test_collector._test_repr(
         collector_threading.ThreadingLockCollector,
         "ThreadingLockCollector(status=<ServiceStatus.STOPPED: 'stopped'>, "
-        "recorder=Recorder(default_max_events=16384, max_events={}), capture_pct=1.0, nframes=64, "
-        "endpoint_collection_enabled=True, tracer=None)",
+        "recorder=Recorder(default_max_events=16384, max_events={}, aggregate_stack_samples=False), "
+        "capture_pct=1.0, nframes=64, endpoint_collection_enabled=True, tracer=None)",
     )
 
 
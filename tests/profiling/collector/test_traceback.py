@@ -20,3 +20,66 @@ def test_check_traceback_to_frames():
         (this_file, 7, "_x", ""),
         (this_file, 15, "test_check_traceback_to_frames", ""),
     ]
+
+
+class _Foo(object):
+    def frame(self):
+        return sys._getframe()
+
+
+class _Bar(_Foo):
+    pass
+
+
+def _frame():
+    return sys._getframe()
+
+
+def test_pyframe_to_frames_interned():
+    frames, nframes = _traceback.pyframe_to_frames(_frame(), 1)
+    assert nframes > 1
+    assert frames == [(__file__.replace(".pyc", ".py"), 35, "_frame", "")]
+
+    other_frames, other_nframes = _traceback.pyframe_to_frames(_frame(), 1)
+    assert other_nframes == nframes
+    assert other_frames is frames
+
+    # The frames of a method are interned along with the class of the instance
+    foo_frames, _ = _traceback.pyframe_to_frames(_Foo().frame(), 1)
+    bar_frames, _ = _traceback.pyframe_to_frames(_Bar().frame(), 1)
+    assert foo_frames[0].class_name == "_Foo"
+    assert bar_frames[0].class_name == "_Bar"
+
+
+def test_pyframe_to_frames_interned_filename():
+    frames = []
+    for filename in ("a.py", "b.py"):
+        namespace = {"sys": sys}
+        exec(compile("def _frame():\n    return sys._getframe()\n", filename, "exec"), namespace)
+        frames.append(_traceback.pyframe_to_frames(namespace["_frame"](), 1)[0])
+
+    # The code objects compare equal, but the frames come from different files
+    assert frames == [[("a.py", 2, "_frame", "")], [("b.py", 2, "_frame", "")]]
+
+
+class _Baz(object):
+    def closure(self):
+        return (lambda: self)() and sys._getframe()
+
+    def deleted(self):
+        del self
+        return sys._getframe()
+
+    @classmethod
+    def klass(cls):
+        return sys._getframe()
+
+
+def test_extract_class_name():
+    assert _traceback._extract_class_name(_Foo().frame()) == "_Foo"
+    assert _traceback._extract_class_name(_Bar().frame()) == "_Bar"
+    assert _traceback._extract_class_name(_Baz.klass()) == "_Baz"
+    # self is stored in a cell when captured by a closure
+    assert _traceback._extract_class_name(_Baz().closure()) == "_Baz"
+    assert _traceback._extract_class_name(_Baz().deleted()) == ""
+    assert _traceback._extract_class_name(_frame()) == ""
@@ -207,6 +207,27 @@ def test_export(endpoint_test_server):
     exp.export(test_pprof.TEST_EVENTS, 0, compat.time_ns())
 
 
+def test_build_then_upload(endpoint_test_server):
+    exp = http.PprofHTTPExporter(
+        endpoint=_ENDPOINT, api_key=_API_KEY, endpoint_call_counter_span_processor=_get_span_processor()
+    )
+    upload = exp.build(test_pprof.TEST_EVENTS, 0, compat.time_ns())
+    upload()
+
+
+def test_build_server_down():
+    exp = http.PprofHTTPExporter(
+        endpoint="http://localhost:2",
+        api_key=_API_KEY,
+        max_retry_delay=2,
+        endpoint_call_counter_span_processor=_get_span_processor(),
+    )
+    # Nothing is sent until the upload
+    upload = exp.build(test_pprof.TEST_EVENTS, 0, 1)
+    with pytest.raises(exporter.ExportError):
+        upload()
+
+
 def test_export_server_down():
     exp = http.PprofHTTPExporter(
         endpoint="http://localhost:2",
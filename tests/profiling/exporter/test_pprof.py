@@ -1,15 +1,20 @@
+import gzip
 import os
 import platform
 
 import mock
+import pytest
 import six
 
 from ddtrace import ext
+from ddtrace.profiling import recorder
 from ddtrace.profiling.collector import _lock
 from ddtrace.profiling.collector import memalloc
 from ddtrace.profiling.collector import stack_event
 from ddtrace.profiling.exporter import pprof
 
+from .. import utils
+
 
 TEST_EVENTS = {
     stack_event.StackExceptionSampleEvent: [
@@ -680,11 +685,103 @@ def test_to_str_none():
     assert id1 == id2 != id_o
 
 
+def _build_pb2_profile(converter, start_time_ns, duration_ns, period, sample_types, program_name):
+    """Build a profile with the protobuf generated classes, in the same order as the exporter."""
+    pprof_pb2 = utils.pprof_pb2
+    sample_type = [
+        pprof_pb2.ValueType(type=converter._str(type_), unit=converter._str(unit)) for type_, unit in sample_types
+    ]
+    sample = [
+        pprof_pb2.Sample(
+            location_id=locations,
+            value=[values.get(sample_type_name, 0) for sample_type_name, unit in sample_types],
+            label=[pprof_pb2.Label(key=converter._str(key), str=converter._str(s)) for key, s in labels],
+        )
+        for (locations, labels), values in converter._location_values.items()
+    ]
+    period_type = pprof_pb2.ValueType(type=converter._str("time"), unit=converter._str("nanoseconds"))
+    mapping = [pprof_pb2.Mapping(id=1, filename=converter._str(program_name))]
+    return pprof_pb2.Profile(
+        sample_type=sample_type,
+        sample=sample,
+        mapping=mapping,
+        location=[
+            pprof_pb2.Location(id=location_id, line=[pprof_pb2.Line(function_id=function_id, line=lineno)])
+            for location_id, function_id, lineno in converter._locations.values()
+        ],
+        function=[
+            pprof_pb2.Function(id=function_id, name=name, filename=filename)
+            for function_id, name, filename in converter._functions.values()
+        ],
+        string_table=list(converter._string_table),
+        time_nanos=start_time_ns,
+        duration_nanos=duration_ns,
+        period=period,
+        period_type=period_type,
+    )
+
+
+@pytest.mark.parametrize("period", (None, 1000000))
+def test_build_profile_pb2_equivalence(period):
+    converter = pprof._PprofConverter()
+    converter.convert_stack_event(
+        "67892304",
+        "123987",
+        "MainThread",
+        "",
+        "",
+        "1322219321",
+        "49343",
+        "GET /",
+        ext.SpanTypes.WEB,
+        (("foobar.py", 23, "func1", "SomeClass"), ("foobar.py", 44000, "func2", "")),
+        5,
+        [stack_event.StackSampleEvent(cpu_time_ns=1321, wall_time_ns=1 << 40)],
+    )
+    converter.convert_memalloc_heap_event(
+        memalloc.MemoryHeapSampleEvent(
+            thread_id=1, thread_name=u"\u00e9t\u00e9", frames=[("foobaz.py", 0, "func3", "")], nframes=1, size=1 << 20
+        )
+    )
+    sample_types = (
+        ("cpu-samples", "count"),
+        ("cpu-time", "nanoseconds"),
+        ("wall-time", "nanoseconds"),
+        ("heap-space", "bytes"),
+    )
+
+    expected = _build_pb2_profile(converter, 0, 60 * 10 ** 9, period, sample_types, "bonjour").SerializeToString()
+    assert converter._build_profile(0, 60 * 10 ** 9, period, sample_types, "bonjour").SerializeToString() == expected
+
+    profile = converter._build_profile(0, 60 * 10 ** 9, period, sample_types, "bonjour", compress=True)
+    assert gzip.decompress(profile.SerializeToGzippedString()) == expected
+    assert profile.SerializeToString() == expected
+    assert profile.program_name == "bonjour"
+
+
+def test_build_profile_compressed_chunks():
+    # Enough strings for the profile to be compressed in several chunks
+    converter = pprof._PprofConverter()
+    for i in range(10000):
+        converter.convert_memalloc_heap_event(
+            memalloc.MemoryHeapSampleEvent(
+                thread_id=i, frames=[("foobar%d.py" % i, i, "func%d" % i, "")], nframes=1, size=i
+            )
+        )
+    sample_types = (("heap-space", "bytes"),)
+
+    expected = _build_pb2_profile(converter, 1, 2, None, sample_types, "bonjour").SerializeToString()
+    assert len(expected) > 1 << 17
+    profile = converter._build_profile(1, 2, None, sample_types, "bonjour", compress=True)
+    assert gzip.decompress(profile.SerializeToGzippedString()) == expected
+
+
 @mock.patch("ddtrace.internal.utils.config.get_application_name")
 def test_pprof_exporter(gan):
     gan.return_value = "bonjour"
     exp = pprof.PprofExporter()
-    exports, _ = exp.export(TEST_EVENTS, 1, 7)
+    profile, _ = exp.export(TEST_EVENTS, 1, 7)
+    exports = utils.parse_profile(profile)
 
     assert len(exports.sample_type) == 11
     assert len(exports.string_table) == 58
@@ -698,6 +795,21 @@ def test_pprof_exporter(gan):
     assert all(_ in exports.string_table for _ in ("time", "nanoseconds", "bonjour"))
 
 
+@mock.patch("ddtrace.internal.utils.config.get_application_name")
+def test_pprof_exporter_stack_sample_aggregate(gan):
+    gan.return_value = "bonjour"
+    stack_events = TEST_EVENTS[stack_event.StackSampleEvent]
+    aggregate = recorder.StackSampleAggregate()
+    aggregate.extend(stack_events)
+
+    exp = pprof.PprofExporter()
+    expected, _ = exp.export({stack_event.StackSampleEvent: stack_events}, 1, 7)
+    exports, _ = exp.export({stack_event.StackSampleEvent: aggregate}, 1, 7)
+
+    assert utils.parse_profile(exports).period == 1000000
+    assert exports.SerializeToString() == expected.SerializeToString()
+
+
 @mock.patch("ddtrace.internal.utils.config.get_application_name")
 def test_pprof_exporter_libs(gan):
     gan.return_value = "bonjour"
@@ -795,4 +907,4 @@ def test_pprof_exporter_empty():
     exp = pprof.PprofExporter()
     export, libs = exp.export({}, 0, 1)
     assert len(libs) > 0
-    assert len(export.sample) == 0
+    assert len(utils.parse_profile(export).sample) == 0
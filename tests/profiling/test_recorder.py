@@ -59,3 +59,69 @@ def test_limit():
 def test_fork():
     stdout, stderr, exitcode, pid = call_program("python", os.path.join(os.path.dirname(__file__), "recorder_fork.py"))
     assert exitcode == 0, (stdout, stderr)
+
+
+def test_aggregate_stack_samples():
+    r = recorder.Recorder(aggregate_stack_samples=True)
+    frames = [("foo.py", 1, "foo", ""), ("bar.py", 2, "bar", "")]
+    r.push_events(
+        [
+            stack_event.StackSampleEvent(
+                thread_id=1, frames=frames, nframes=2, cpu_time_ns=10, wall_time_ns=20, sampling_period=100
+            ),
+            stack_event.StackSampleEvent(
+                thread_id=1, frames=list(frames), nframes=2, cpu_time_ns=1, wall_time_ns=2, sampling_period=300
+            ),
+            stack_event.StackSampleEvent(
+                thread_id=2, frames=frames, nframes=2, cpu_time_ns=5, wall_time_ns=5, sampling_period=200
+            ),
+            stack_event.StackSampleEvent(
+                thread_id=1, frames=frames[1:], nframes=1, cpu_time_ns=3, wall_time_ns=3, sampling_period=200
+            ),
+        ]
+    )
+    r.push_event(stack_event.StackExceptionSampleEvent(thread_id=1, frames=frames, nframes=2))
+
+    events = r.reset()
+    assert len(events[stack_event.StackExceptionSampleEvent]) == 1
+    aggregate = events[stack_event.StackSampleEvent]
+    assert isinstance(aggregate, recorder.StackSampleAggregate)
+    assert len(aggregate) == 4
+    assert aggregate.sum_period == 800
+    assert aggregate.stacks == [(tuple(frames), 2), (tuple(frames[1:]), 1)]
+    assert {(key[0], key[1]): counters[:3] for key, counters in aggregate.samples.items()} == {
+        (0, 1): [2, 11, 22],
+        (0, 2): [1, 5, 5],
+        (1, 1): [1, 3, 3],
+    }
+
+    assert len(r.events[stack_event.StackSampleEvent]) == 0
+
+
+def test_aggregate_stack_samples_limit():
+    r = recorder.Recorder(aggregate_stack_samples=True, max_events={stack_event.StackSampleEvent: 1})
+    r.push_events(
+        [
+            stack_event.StackSampleEvent(thread_id=thread_id, frames=[], nframes=0, sampling_period=1)
+            for thread_id in (1, 2, 1)
+        ]
+    )
+    aggregate = r.events[stack_event.StackSampleEvent]
+    assert list(aggregate.samples) == [(0, 1, None, None, None, None, None, None, None)]
+    assert len(aggregate) == 2
+
+
+def test_aggregate_stack_samples_limit_new_stacks():
+    r = recorder.Recorder(aggregate_stack_samples=True, max_events={stack_event.StackSampleEvent: 1})
+    r.push_events(
+        [
+            stack_event.StackSampleEvent(
+                thread_id=1, frames=[("foo.py", lineno, "foo", "")], nframes=1, sampling_period=1
+            )
+            for lineno in range(10)
+        ]
+    )
+    aggregate = r.events[stack_event.StackSampleEvent]
+    # The stacks of the samples that are dropped are not kept
+    assert aggregate.stacks == [((("foo.py", 0, "foo", ""),), 1)]
+    assert len(aggregate) == 1
@@ -1,5 +1,6 @@
 # -*- encoding: utf-8 -*-
 import logging
+import threading
 
 import mock
 
@@ -74,3 +75,69 @@ def test_serverless_periodic(mock_periodic):
     assert s._profiled_intervals == 0
     assert s.interval == 1
     mock_periodic.assert_called()
+
+
+class _SlowUploadExporter(exporter.Exporter):
+    def __init__(self):
+        self.built = 0
+        self.uploaded = []
+        self.release = threading.Event()
+
+    def build(self, events, start_time_ns, end_time_ns):
+        self.built += 1
+        n = self.built
+
+        def upload():
+            self.release.wait()
+            self.uploaded.append(n)
+
+        return upload
+
+
+def test_upload_in_background():
+    r = recorder.Recorder()
+    exp = _SlowUploadExporter()
+    s = scheduler.Scheduler(r, [exp], upload_queue_size=2)
+    s.start()
+    try:
+        # Flushing does not wait for the uploads, even if they cannot keep up
+        for _ in range(5):
+            s.flush()
+        assert exp.built == 5
+        assert exp.uploaded == []
+    finally:
+        exp.release.set()
+        s.stop()
+        s.join()
+    # The oldest pending profiles have been dropped, the pending ones are uploaded on shutdown
+    assert len(exp.uploaded) <= 3
+    assert exp.uploaded[-2:] == [4, 5]
+
+
+def test_upload_after_stop():
+    r = recorder.Recorder()
+    exp = _SlowUploadExporter()
+    exp.release.set()
+    s = scheduler.Scheduler(r, [exp])
+    s.start()
+    s.stop()
+    s.join()
+    s.flush()
+    assert exp.uploaded == [1]
+
+
+def test_upload_failure(caplog):
+    def upload():
+        raise exporter.ExportError("BOO!")
+
+    class _FailUploadExporter(exporter.Exporter):
+        def build(self, events, start_time_ns, end_time_ns):
+            return upload
+
+    r = recorder.Recorder()
+    s = scheduler.Scheduler(r, [_FailUploadExporter()], upload_queue_size=0)
+    s.flush()
+    ((logger, level, message),) = caplog.record_tuples
+    assert logger == "ddtrace.profiling.scheduler"
+    assert level == logging.WARNING
+    assert message.startswith("Unable to export profile: ") and "BOO!" in message
@@ -1,6 +1,31 @@
 import gzip
+import sys
 
-from ddtrace.profiling.exporter import pprof
+from ddtrace.internal.utils.version import parse_version
+
+
+def _protobuf_version():
+    import google.protobuf
+
+    return parse_version(google.protobuf.__version__)
+
+
+# The exporter encodes the profiles itself: the generated protobuf classes are
+# only used to check its output.
+_pb_version = _protobuf_version()
+for v in [(4, 21), (3, 19), (3, 12)]:
+    if _pb_version >= v:
+        pprof_module = "ddtrace.profiling.exporter.pprof_%s%s_pb2" % v
+        __import__(pprof_module)
+        pprof_pb2 = sys.modules[pprof_module]
+        break
+else:
+    from ddtrace.profiling.exporter import pprof_3_pb2 as pprof_pb2  # type: ignore[no-redef]
+
+
+def parse_profile(profile):
+    """Decode a profile returned by a pprof exporter."""
+    return pprof_pb2.Profile.FromString(profile.SerializeToString())
 
 
 def check_pprof_file(
@@ -9,7 +34,7 @@ def check_pprof_file(
     # type: (...) -> None
     with gzip.open(filename, "rb") as f:
         content = f.read()
-    p = pprof.pprof_pb2.Profile()
+    p = pprof_pb2.Profile()
     p.ParseFromString(content)
     assert len(p.sample_type) == 11
     assert p.string_table[p.sample_type[0].type] == "cpu-samples"
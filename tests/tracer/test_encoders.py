@@ -31,6 +31,7 @@ from ddtrace.internal.encoding import JSONEncoder
 from ddtrace.internal.encoding import JSONEncoderV2
 from ddtrace.internal.encoding import MsgpackEncoderV03
 from ddtrace.internal.encoding import MsgpackEncoderV05
+from ddtrace.internal.encoding import MultiBufferedEncoder
 from ddtrace.internal.encoding import _EncoderBase
 from ddtrace.span import Span
 from ddtrace.tracing._span_link import SpanLink
@@ -331,6 +332,23 @@ def test_custom_msgpack_encode(encoding):
     assert decode(refencoder.encode_traces([[s]])) == decode(encoder.encode())
 
 
+@allencodings
+def test_custom_msgpack_encode_shared_meta(encoding):
+    encoder = MSGPACK_ENCODERS[encoding](1 << 20, 1 << 20)
+    refencoder = REF_MSGPACK_ENCODERS[encoding]()
+
+    shared_meta = {"env": "prod", "version": "1.2.3", "team": "apm"}
+    trace = gen_trace(nspans=10)
+    for span in trace:
+        span._shared_meta = shared_meta
+    # The tags and metrics of the spans take precedence over the shared tags
+    trace[0].set_tag_str("env", "staging")
+    trace[1].set_metric("team", 1)
+
+    encoder.put(trace)
+    assert decode(refencoder.encode_traces([trace])) == decode(encoder.encode())
+
+
 def span_type_span():
     s = Span("span_name")
     s.span_type = SpanTypes.WEB
@@ -621,6 +639,52 @@ def test_msgpack_string_table():
     assert "foobar" not in t
 
 
+def test_msgpack_string_table_encoded_strings():
+    t = MsgpackStringTable(1 << 12)
+    long_string = "x" * 300
+
+    for s in ("foobar", u"\u00e9t\u00e9", long_string):
+        t.index(s)
+    encoded = t.flush()
+    assert decode(encoded + b"\xc0", reconstruct=False)[0][2:] == [
+        b"foobar",
+        u"\u00e9t\u00e9".encode("utf-8"),
+        long_string.encode("utf-8"),
+    ]
+
+    # The encoded strings are kept across flushes, except for long ones
+    assert "foobar" in t._encoded_strings
+    assert u"\u00e9t\u00e9" in t._encoded_strings
+    assert long_string not in t._encoded_strings
+
+    for s in ("foobar", u"\u00e9t\u00e9", long_string):
+        t.index(s)
+    assert t.flush() == encoded
+
+
+def test_msgpack_string_table_encoded_strings_promoted():
+    t = MsgpackStringTable(1 << 20)
+    max_items = t._encoded_strings.max_items
+
+    # Fill the current generation, then a new one
+    for i in range(2 * max_items):
+        t.index("s%d" % i)
+    t.flush()
+
+    # A string of the previous generation is promoted while the current one is full
+    t.index("s0")
+    assert decode(t.flush() + b"\xc0", reconstruct=False)[0][2:] == [b"s0"]
+    assert "s0" in t._encoded_strings
+
+
+def test_msgpack_string_table_dropped_strings_not_cached():
+    t = MsgpackStringTable(1 << 12)
+    t.index("x" * 500)
+    placeholder = "<dropped string of length 500 because it's too long (max allowed length 409)>"
+    assert decode(t.flush() + b"\xc0", reconstruct=False)[0][2:] == [placeholder.encode("utf-8")]
+    assert placeholder not in t._encoded_strings
+
+
 def test_list_string_table():
     t = ListStringTable()
 
@@ -699,6 +763,67 @@ def test_custom_msgpack_encode_thread_safe(encoding):
     assert unpacked is not None
 
 
+@allencodings
+def test_multi_buffered_encoder_rotation(encoding):
+    encoder = MultiBufferedEncoder(MSGPACK_ENCODERS[encoding], 1 << 20, 1 << 20, 3)
+    assert encoder.buffers == 3
+    assert encoder.max_size == 1 << 20
+    assert encoder.content_type == "application/msgpack"
+
+    trace = [Span(name="test", service="foo", resource="bar")]
+    encoder.put(trace)
+    encoder.put(trace)
+    assert len(encoder) == 2
+
+    size = encoder.size
+    encoded = encoder.encode()
+    assert size == len(encoded)
+    assert len(decode(encoded, reconstruct=True)) == 2
+
+    # The retired buffer is empty and the next one is now active
+    assert len(encoder) == 0
+    assert encoder.encode() is None
+
+    encoder.put(trace)
+    assert len(decode(encoder.encode(), reconstruct=True)) == 1
+
+
+def test_multi_buffered_encoder_invalid_buffers():
+    with pytest.raises(ValueError):
+        MultiBufferedEncoder(MsgpackEncoderV03, 1 << 20, 1 << 20, 1)
+
+
+@allencodings
+def test_multi_buffered_encoder_concurrent_flush(encoding):
+    encoder = MultiBufferedEncoder(MSGPACK_ENCODERS[encoding], 2 << 20, 2 << 20)
+    trace = [Span(name="test", service="threads", resource="TEST") for _ in range(5)]
+    ntraces = 1000
+    payloads = []
+    done = threading.Event()
+
+    def flush():
+        while not done.is_set():
+            encoded = encoder.encode()
+            if encoded is not None:
+                payloads.append(encoded)
+
+    flusher = threading.Thread(target=flush)
+    flusher.start()
+    try:
+        for _ in range(ntraces):
+            encoder.put(trace)
+    finally:
+        done.set()
+        flusher.join()
+
+    for _ in range(encoder.buffers):
+        encoded = encoder.encode()
+        if encoded is not None:
+            payloads.append(encoded)
+
+    assert sum(len(decode(payload, reconstruct=True)) for payload in payloads) == ntraces
+
+
 @pytest.mark.subprocess(parametrize={"encoder_cls": ["JSONEncoder", "JSONEncoderV2"]})
 def test_json_encoder_traces_bytes():
     """
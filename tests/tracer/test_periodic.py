@@ -130,3 +130,26 @@ def test_awakeable_periodic_service():
     awake_me.stop()
 
     assert queue == list(range(n + 2))
+
+
+def test_awakeable_periodic_service_no_wait():
+    queue = []
+    awakened = Event()
+
+    class AwakeMe(periodic.AwakeablePeriodicService):
+        def periodic(self):
+            queue.append(len(queue))
+            # The first call happens on start
+            if len(queue) > 1:
+                awakened.set()
+
+    awake_me = AwakeMe(60)
+    awake_me.start()
+
+    awake_me.awake(wait=False)
+    assert awakened.wait(5)
+
+    # Stopping does not wait for the interval to elapse
+    awake_me.stop()
+    awake_me.join(5)
+    assert not awake_me._worker.is_alive()
@@ -1,3 +1,4 @@
+import threading
 from typing import Any
 
 import attr
@@ -13,12 +14,15 @@ from ddtrace.constants import AUTO_KEEP
 from ddtrace.constants import AUTO_REJECT
 from ddtrace.constants import MANUAL_KEEP_KEY
 from ddtrace.constants import SAMPLING_PRIORITY_KEY
+from ddtrace.constants import SPAN_MEASURED_KEY
 from ddtrace.constants import USER_KEEP
 from ddtrace.constants import USER_REJECT
 from ddtrace.context import Context
 from ddtrace.ext import SpanTypes
+from ddtrace.internal import forksafe
 from ddtrace.internal.constants import HIGHER_ORDER_TRACE_ID_BITS
 from ddtrace.internal.processor.endpoint_call_counter import EndpointCallCounterProcessor
+from ddtrace.internal.processor.stats import SpanStatsProcessorV06
 from ddtrace.internal.processor.trace import SpanAggregator
 from ddtrace.internal.processor.trace import SpanProcessor
 from ddtrace.internal.processor.trace import SpanSamplingProcessor
@@ -252,6 +256,208 @@ def test_aggregator_partial_flush_2_spans():
     assert parent.get_metric("_dd.py.partial_flush") is None
 
 
+def test_aggregator_shards():
+    writer = DummyWriter()
+    aggr = SpanAggregator(
+        partial_flush_enabled=False, partial_flush_min_spans=0, trace_processors=[], writer=writer, num_shards=4
+    )
+    assert len(aggr._shards) == 4
+
+    parents = [Span("parent", trace_id=trace_id, on_finish=[aggr.on_span_finish]) for trace_id in range(1, 9)]
+    for parent in parents:
+        aggr.on_span_start(parent)
+    assert [len(shard.traces) for shard in aggr._shards] == [2, 2, 2, 2]
+
+    for parent in reversed(parents):
+        parent.finish()
+        assert writer.pop() == [parent]
+    assert [len(shard.traces) for shard in aggr._shards] == [0, 0, 0, 0]
+
+
+def test_aggregator_shards_concurrent():
+    # DEV: DummyWriter is not thread-safe
+    writer = mock.Mock()
+    aggr = SpanAggregator(
+        partial_flush_enabled=True, partial_flush_min_spans=5, trace_processors=[], writer=writer, num_shards=4
+    )
+
+    def create_traces():
+        for _ in range(100):
+            parent = Span("parent", on_finish=[aggr.on_span_finish])
+            aggr.on_span_start(parent)
+            for _ in range(9):
+                child = Span(
+                    "child", trace_id=parent.trace_id, parent_id=parent.span_id, on_finish=[aggr.on_span_finish]
+                )
+                aggr.on_span_start(child)
+                child.finish()
+            parent.finish()
+
+    threads = [threading.Thread(target=create_traces) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    spans = [span for call in writer.write.call_args_list for span in call[0][0]]
+    assert len(spans) == 8 * 100 * 10
+    assert len(set(span.trace_id for span in spans)) == 8 * 100
+    assert all(len(shard.traces) == 0 for shard in aggr._shards)
+
+
+def test_aggregator_async_processing():
+    class Proc(TraceProcessor):
+        threads = []
+
+        def process_trace(self, trace):
+            self.threads.append(threading.current_thread())
+            return trace
+
+    writer = DummyWriter()
+    aggr = SpanAggregator(
+        partial_flush_enabled=False,
+        partial_flush_min_spans=0,
+        trace_processors=[Proc()],
+        writer=writer,
+        processing_queue_size=10,
+    )
+    try:
+        span = Span("span", on_finish=[aggr.on_span_finish])
+        aggr.on_span_start(span)
+        span.finish()
+        aggr.join()
+
+        assert writer.pop() == [span]
+        assert Proc.threads == [aggr._processing_worker._thread]
+    finally:
+        aggr._processing_worker.stop()
+
+
+def test_aggregator_async_processing_queue_full():
+    started = threading.Event()
+    resume = threading.Event()
+
+    class BlockingProc(TraceProcessor):
+        def process_trace(self, trace):
+            started.set()
+            resume.wait()
+            return trace
+
+    writer = DummyWriter()
+    aggr = SpanAggregator(
+        partial_flush_enabled=False,
+        partial_flush_min_spans=0,
+        trace_processors=[BlockingProc()],
+        writer=writer,
+        processing_queue_size=1,
+    )
+    try:
+        spans = [Span("span", on_finish=[aggr.on_span_finish]) for _ in range(3)]
+        for span in spans:
+            aggr.on_span_start(span)
+
+        spans[0].finish()
+        assert started.wait(5)
+        # The first chunk is being processed and the second one fills the queue
+        spans[1].finish()
+        spans[2].finish()
+        resume.set()
+        aggr.join()
+
+        assert writer.pop() == spans[:2]
+        assert writer._metrics["processing.dropped.traces"] == {("reason:full",): 1}
+        assert writer._metrics["processing.dropped.spans"] == {("reason:full",): 1}
+    finally:
+        resume.set()
+        aggr._processing_worker.stop()
+
+
+def test_aggregator_async_processing_after_fork():
+    writer = DummyWriter()
+    aggr = SpanAggregator(
+        partial_flush_enabled=False,
+        partial_flush_min_spans=0,
+        trace_processors=[],
+        writer=writer,
+        processing_queue_size=10,
+    )
+    worker = aggr._processing_worker
+    try:
+        span = Span("span", on_finish=[aggr.on_span_finish])
+        aggr.on_span_start(span)
+        span.finish()
+        aggr.join()
+        parent_thread, parent_queue = worker._thread, worker._queue
+        assert worker._after_fork in forksafe._registry
+
+        # Simulate the child of a fork where the processing thread does not exist
+        worker._after_fork()
+        assert worker._thread is None
+        assert worker._after_fork not in forksafe._registry
+
+        span = Span("span", on_finish=[aggr.on_span_finish])
+        aggr.on_span_start(span)
+        span.finish()
+        aggr.join()
+
+        assert worker._thread is not None and worker._thread is not parent_thread
+        assert len(writer.pop()) == 2
+    finally:
+        worker.stop()
+        parent_queue.put(None)
+        parent_thread.join()
+    assert worker._after_fork not in forksafe._registry
+
+
+def test_aggregator_async_processing_config():
+    aggr = SpanAggregator(
+        partial_flush_enabled=False, partial_flush_min_spans=0, trace_processors=[], writer=DummyWriter()
+    )
+    assert aggr._processing_worker is None
+
+    with override_global_config(dict(_trace_async_processing_enabled=True, _trace_async_processing_queue_size=5)):
+        aggr = SpanAggregator(
+            partial_flush_enabled=False, partial_flush_min_spans=0, trace_processors=[], writer=DummyWriter()
+        )
+    assert aggr._processing_worker.size == 5
+
+
+def _span_stats(buffer_size):
+    processor = SpanStatsProcessorV06("http://localhost:8126", interval=60, buffer_size=buffer_size)
+    processor.stop()
+    processor.join()
+
+    for i in range(20):
+        span = Span("op", service="svc", resource="/res/%d" % (i % 3), start=1)
+        span.set_metric(SPAN_MEASURED_KEY, 1)
+        span.set_tag("http.status_code", str(200 + 300 * (i % 2)))
+        span.error = int(i % 4 == 0)
+        span.finish(finish_time=1 + i * 0.01)
+        processor.on_span_finish(span)
+
+    pending = len(processor._pending_key_ids)
+    with processor._lock:
+        return pending, processor._serialize_buckets()
+
+
+@pytest.mark.parametrize("buffer_size", [3, 1000])
+def test_span_stats_processor_buffer(buffer_size):
+    pending, stats = _span_stats(buffer_size)
+    assert pending == 20 % buffer_size
+
+    # Buffering the spans gives the same stats as aggregating them one by one
+    _, expected_stats = _span_stats(1)
+    assert stats == expected_stats
+    assert [(s["Resource"], s["HTTPStatusCode"], s["Hits"], s["Errors"]) for s in stats[0]["Stats"]] == [
+        ("/res/0", 200, 4, 2),
+        ("/res/1", 500, 4, 0),
+        ("/res/2", 200, 3, 1),
+        ("/res/0", 500, 3, 0),
+        ("/res/1", 200, 3, 2),
+        ("/res/2", 500, 3, 0),
+    ]
+
+
 def test_trace_top_level_span_processor_partial_flushing():
     """Parent span and child span have the same service name"""
     tracer = Tracer()
@@ -362,6 +568,24 @@ def test_span_truncator():
     assert metrics["m" * MAX_METRIC_KEY_LENGTH] == 1
 
 
+def test_span_truncator_shared_tags():
+    """TruncateSpanProcessor truncates the tags shared with other spans without changing them"""
+    shared_meta = {"env": "prod", "t": "v" * (MAX_META_VALUE_LENGTH + 10)}
+    span = Span("span1")
+    span._shared_meta = shared_meta
+
+    TruncateSpanProcessor().on_span_finish(span)
+
+    assert span.get_tags() == {"env": "prod", "t": "v" * MAX_META_VALUE_LENGTH}
+    assert shared_meta["t"] == "v" * (MAX_META_VALUE_LENGTH + 10)
+
+    # Short shared tags stay shared
+    span = Span("span2")
+    span._shared_meta = shared_meta = {"env": "prod"}
+    TruncateSpanProcessor().on_span_finish(span)
+    assert span._shared_meta is shared_meta
+
+
 def test_span_normalizator():
     """NormalizeSpanProcessor adds missing information to spans"""
     span = Span("", span_type="x" * (MAX_TYPE_LENGTH + 10))
@@ -377,7 +601,10 @@ def test_span_normalizator():
 def test_span_creation_metrics():
     """Test that telemetry metrics are queued in batches of 100 and the remainder is sent on shutdown"""
     writer = DummyWriter()
-    aggr = SpanAggregator(partial_flush_enabled=False, partial_flush_min_spans=0, trace_processors=[], writer=writer)
+    # DEV: Span counts are batched per shard
+    aggr = SpanAggregator(
+        partial_flush_enabled=False, partial_flush_min_spans=0, trace_processors=[], writer=writer, num_shards=1
+    )
 
     with mock.patch("ddtrace.internal.processor.trace.telemetry_writer.add_count_metric") as mock_tm:
         for _ in range(300):
@@ -409,6 +636,69 @@ def test_span_creation_metrics():
         )
 
 
+def test_span_creation_metrics_shards():
+    """Test that the span counts of every shard are sent on shutdown"""
+    writer = DummyWriter()
+    aggr = SpanAggregator(
+        partial_flush_enabled=False, partial_flush_min_spans=0, trace_processors=[], writer=writer, num_shards=4
+    )
+
+    with mock.patch("ddtrace.internal.processor.trace.telemetry_writer.add_count_metric") as mock_tm:
+        for trace_id in range(1, 41):
+            span = Span("span", trace_id=trace_id, on_finish=[aggr.on_span_finish])
+            aggr.on_span_start(span)
+            span.finish()
+
+        mock_tm.assert_not_called()
+        aggr.shutdown(None)
+        mock_tm.assert_has_calls(
+            [
+                mock.call("tracers", "spans_created", 40, tags=(("integration_name", "datadog"),)),
+                mock.call("tracers", "spans_finished", 40, tags=(("integration_name", "datadog"),)),
+            ]
+        )
+    assert all(not shard.span_metrics["spans_created"] for shard in aggr._shards)
+
+
+def test_aggregator_partial_flush_order():
+    """Test that the chunks of a partially flushed trace are written in the order they were flushed"""
+    processing = threading.Event()
+    release = threading.Event()
+
+    class Proc(TraceProcessor):
+        def process_trace(self, trace):
+            if trace[0].name == "first":
+                processing.set()
+                release.wait()
+            return trace
+
+    writer = mock.Mock()
+    aggr = SpanAggregator(
+        partial_flush_enabled=True, partial_flush_min_spans=1, trace_processors=[Proc()], writer=writer
+    )
+    parent = Span("parent", on_finish=[aggr.on_span_finish])
+    aggr.on_span_start(parent)
+    first = Span("first", trace_id=parent.trace_id, parent_id=parent.span_id, on_finish=[aggr.on_span_finish])
+    aggr.on_span_start(first)
+    second = Span("second", trace_id=parent.trace_id, parent_id=parent.span_id, on_finish=[aggr.on_span_finish])
+    aggr.on_span_start(second)
+
+    t1 = threading.Thread(target=first.finish)
+    t1.start()
+    processing.wait()
+    t2 = threading.Thread(target=second.finish)
+    t2.start()
+    # The second chunk waits for the first one to be written
+    t2.join(0.1)
+    assert t2.is_alive()
+    release.set()
+    t1.join()
+    t2.join()
+    parent.finish()
+
+    assert [call[0][0] for call in writer.write.call_args_list] == [[first], [second], [parent]]
+
+
 def test_single_span_sampling_processor():
     """Test that single span sampling tags are applied to spans that should get sampled"""
 
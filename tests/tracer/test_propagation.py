@@ -245,6 +245,46 @@ def test_inject_tags_previous_error(tracer):
         assert _HTTP_HEADER_TAGS not in headers
 
 
+def test_inject_cached_headers():
+    ctx = Context(trace_id=1234, span_id=5678, sampling_priority=1, meta={"_dd.p.dm": "-1"})
+
+    with override_global_config(
+        dict(_propagation_style_inject=[PROPAGATION_STYLE_DATADOG, _PROPAGATION_STYLE_W3C_TRACECONTEXT])
+    ):
+        headers = {}
+        HTTPPropagator.inject(ctx, headers)
+        cached_headers = {}
+        HTTPPropagator.inject(ctx, cached_headers)
+        assert cached_headers == headers
+        assert headers[HTTP_HEADER_SAMPLING_PRIORITY] == "1"
+        assert headers[_HTTP_HEADER_TAGS] == "_dd.p.dm=-1"
+
+        # Changes to the context are injected
+        ctx.sampling_priority = 2
+        ctx._meta["_dd.p.dm"] = "-3"
+        headers = {}
+        HTTPPropagator.inject(ctx, headers)
+        assert headers[HTTP_HEADER_SAMPLING_PRIORITY] == "2"
+        assert headers[_HTTP_HEADER_TAGS] == "_dd.p.dm=-3"
+        assert headers[_HTTP_HEADER_TRACESTATE] == "dd=s:2;t.dm:-3"
+
+    # Changes to the injected propagation styles are injected
+    with override_global_config(dict(_propagation_style_inject=[PROPAGATION_STYLE_B3_SINGLE])):
+        headers = {}
+        HTTPPropagator.inject(ctx, headers)
+        assert headers == {_HTTP_HEADER_B3_SINGLE: "00000000000004d2-000000000000162e-d"}
+
+    # Disabling the x-datadog-tags header is injected
+    ctx = Context(trace_id=1234, span_id=5678, sampling_priority=1, meta={"_dd.p.dm": "-1"})
+    headers = {}
+    HTTPPropagator.inject(ctx, headers)
+    assert headers[_HTTP_HEADER_TAGS] == "_dd.p.dm=-1"
+    with override_global_config(dict(_x_datadog_tags_enabled=False)):
+        headers = {}
+        HTTPPropagator.inject(ctx, headers)
+        assert _HTTP_HEADER_TAGS not in headers
+
+
 def test_extract(tracer):
     headers = {
         "x-datadog-trace-id": "1234",
@@ -278,6 +318,56 @@ def test_extract(tracer):
             }
 
 
+@pytest.mark.parametrize(
+    "headers",
+    [
+        {
+            "X-Datadog-Trace-Id": "1234",
+            "X-Datadog-Parent-Id": "5678",
+            "X-DATADOG-SAMPLING-PRIORITY": "1",
+            "x-datadog-origin": "synthetics",
+        },
+        {
+            get_wsgi_header(HTTP_HEADER_TRACE_ID): "1234",
+            get_wsgi_header(HTTP_HEADER_PARENT_ID): "5678",
+            get_wsgi_header(HTTP_HEADER_SAMPLING_PRIORITY): "1",
+            get_wsgi_header(HTTP_HEADER_ORIGIN): "synthetics",
+            "wsgi.url_scheme": "http",
+        },
+        [
+            (b"x-datadog-trace-id", b"1234"),
+            (b"x-datadog-parent-id", b"5678"),
+            (b"x-datadog-sampling-priority", b"1"),
+            (b"X-Datadog-Origin", b"synthetics"),
+            (b"host", b"localhost"),
+        ],
+    ],
+)
+def test_extract_header_collections(headers):
+    context = HTTPPropagator.extract(headers)
+
+    assert context.trace_id == 1234
+    assert context.span_id == 5678
+    assert context.sampling_priority == 1
+    assert context.dd_origin == "synthetics"
+
+
+def test_extract_cached_tags():
+    headers = {
+        "x-datadog-trace-id": "1234",
+        "x-datadog-parent-id": "5678",
+        "x-datadog-tags": "_dd.p.test=value",
+    }
+
+    first = HTTPPropagator.extract(headers)
+    first._meta["_dd.p.test"] = "changed"
+
+    # The tags decoded for the first context are not shared with the second one
+    second = HTTPPropagator.extract(headers)
+    assert second._meta["_dd.p.test"] == "value"
+    assert second is not first
+
+
 @pytest.mark.subprocess(
     env=dict(DD_TRACE_PROPAGATION_STYLE=PROPAGATION_STYLE_DATADOG),
 )
@@ -61,6 +61,46 @@ def test_rand128bit():
     assert t1 <= unix_time2 <= t2
 
 
+def test_rand_trace_span_ids():
+    t1 = int(time.time()) - 1
+    ids = set()
+    for _ in range(0, 2 ** 12):
+        trace_id, span_id = _rand.rand_trace_span_ids(False)
+        assert 0 <= trace_id <= 2 ** 64 - 1
+        assert 0 <= span_id <= 2 ** 64 - 1
+        ids.update((trace_id, span_id))
+
+        trace_id, span_id = _rand.rand_trace_span_ids(True)
+        assert t1 <= trace_id >> 96 <= int(time.time()) + 1
+        assert (trace_id >> 64) & (2 ** 32 - 1) == 0
+        assert 0 <= span_id <= 2 ** 64 - 1
+        ids.update((trace_id & (2 ** 64 - 1), span_id))
+
+    assert len(ids) == 4 * 2 ** 12, "Collisions found in ids"
+
+
+def test_fork_buffered_ids():
+    q = MPQueue()
+    # Start consuming a batch of numbers so that the rest is still buffered when forking
+    _rand.rand64bits()
+    pid = os.fork()
+
+    if pid > 0:
+        # parent
+        rns = {_rand.rand64bits() for _ in range(100)}
+        child_rns = q.get()
+
+        assert rns & child_rns == set()
+
+    else:
+        # child
+        try:
+            rngs = {_rand.rand64bits() for _ in range(100)}
+            q.put(rngs)
+        finally:
+            os._exit(0)
+
+
 def test_fork_no_pid_check():
     q = MPQueue()
     pid = os.fork()
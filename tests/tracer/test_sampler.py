@@ -776,6 +776,62 @@ def test_datadog_sampler_sample_no_rules(mock_sample, dummy_tracer):
     )
 
 
+def test_datadog_sampler_rule_matcher():
+    rules = [
+        SamplingRule(sample_rate=0.5, service="svc", tags={"env": "prod*"}),
+        SamplingRule(sample_rate=0.25, name="op"),
+    ]
+    sampler = DatadogSampler(rules=rules, default_sample_rate=1.0)
+    matcher = sampler._rule_matcher
+
+    prod = create_span(name="op", service="svc")
+    prod.set_tag("env", "production")
+    staging = create_span(name="op", service="svc")
+    staging.set_tag("env", "staging")
+    other = create_span(name="other", service="svc")
+
+    for _ in range(3):
+        assert matcher.match(prod) is rules[0]
+        assert matcher.match(staging) is rules[1]
+        assert matcher.match(other) is sampler.rules[-1]
+    # The decisions are cached by (service, name, resource, tag values)
+    assert len(matcher._decisions) == 3
+
+    # Updating the rules drops the cached decisions
+    sampler.rules = [SamplingRule(sample_rate=0.1, name="other")]
+    assert sampler._rule_matcher is not matcher
+    assert sampler._rule_matcher.match(prod) is None
+    assert sampler._rule_matcher.match(other) is sampler.rules[0]
+
+
+def test_datadog_sampler_rules_modified_in_place():
+    sampler = DatadogSampler(rules=[SamplingRule(sample_rate=0.5, name="op")])
+    span = create_span(name="other", service="svc")
+    assert sampler._rule_matcher.match(span) is None
+
+    rule = SamplingRule(sample_rate=0.25, name="other")
+    sampler.rules.append(rule)
+    assert sampler._rule_matcher.match(span) is rule
+
+    sampler.rules[1] = SamplingRule(sample_rate=0.1, service="svc")
+    assert sampler._rule_matcher.match(span) is sampler.rules[1]
+
+    del sampler.rules[1]
+    assert sampler._rule_matcher.match(span) is None
+
+
+def test_datadog_sampler_rule_matcher_custom_rule():
+    class NameLengthRule(SamplingRule):
+        def matches(self, span):
+            return len(span.name) > 4
+
+    rule = NameLengthRule(sample_rate=0.5)
+    sampler = DatadogSampler(rules=[rule])
+    assert sampler._rule_matcher.match(create_span(name="short")) is rule
+    assert sampler._rule_matcher.match(create_span(name="tiny")) is None
+    assert len(sampler._rule_matcher._decisions) == 0
+
+
 class MatchSample(SamplingRule):
     def matches(self, span):
         return True
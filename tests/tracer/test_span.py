@@ -18,6 +18,7 @@ from ddtrace.constants import SPAN_MEASURED_KEY
 from ddtrace.constants import VERSION_KEY
 from ddtrace.ext import SpanTypes
 from ddtrace.span import Span
+from ddtrace.span import _split_shared_tags
 from ddtrace.tracing._span_link import SpanLink
 from tests.subprocesstest import run_in_subprocess
 from tests.utils import TracerTestCase
@@ -280,6 +281,21 @@ class SpanTestCase(TracerTestCase):
 
         assert s.get_tags() == {"custom.key": "None"}
 
+    def test_set_tags(self):
+        s = Span(name="root.span", service="s", resource="r")
+        s.set_metric("a", 1)
+        s.set_tags({"a": "1", "b": 2, "c": 1.5, SERVICE_VERSION_KEY: "1.2.3", "service.name": "svc"})
+
+        assert s.get_tags() == {"a": "1", VERSION_KEY: "1.2.3", SERVICE_VERSION_KEY: "1.2.3", "service.name": "svc"}
+        assert s.get_metrics() == {"b": 2, "c": 1.5}
+        assert s.service == "svc"
+
+    def test_set_tags_str(self):
+        s = Span(name="root.span", service="s", resource="r")
+        s._set_tags_str({"a": "1", "b": u"\u00e9", "c": b"\xff"})
+
+        assert s.get_tags() == {"a": "1", "b": u"\u00e9", "c": u"\ufffd"}
+
     def test_duration_zero(self):
         s = Span(name="foo.bar", service="s", resource="r", start=123)
         s.finish(finish_time=123)
@@ -584,6 +600,42 @@ def test_on_finish_multi_callback():
     m2.assert_called_once_with(s)
 
 
+def test_on_finish_callback_added():
+    m = mock.Mock()
+    s = Span("test")
+    s._on_finish_callbacks.append(m)
+    s.finish()
+    m.assert_called_once_with(s)
+
+
+def test_span_shared_meta():
+    shared_meta = {ENV_KEY: "prod", VERSION_KEY: "1.2.3", "team": "apm"}
+    s = Span("test")
+    s._shared_meta = shared_meta
+    s.set_tag(ENV_KEY, "staging")
+    s.set_metric("team", 1)
+
+    # The tags and metrics of the span take precedence over the shared tags
+    assert s.get_tag(ENV_KEY) == "staging"
+    assert s.get_tag(VERSION_KEY) == "1.2.3"
+    assert s.get_tag("team") is None
+    assert s.get_tags() == {ENV_KEY: "staging", VERSION_KEY: "1.2.3"}
+    assert s._meta == {ENV_KEY: "staging"}
+
+    # Removing a shared tag does not change the shared tags
+    s._remove_tag(VERSION_KEY)
+    assert s.get_tag(VERSION_KEY) is None
+    assert s.get_tags() == {ENV_KEY: "staging"}
+    assert s._shared_meta is None
+    assert shared_meta == {ENV_KEY: "prod", VERSION_KEY: "1.2.3", "team": "apm"}
+
+
+def test_split_shared_tags():
+    shared, others = _split_shared_tags({"team": "apm", "answer": 42, SPAN_MEASURED_KEY: "1", "service.name": "svc"})
+    assert shared == {"team": "apm"}
+    assert others == {"answer": 42, SPAN_MEASURED_KEY: "1", "service.name": "svc"}
+
+
 @pytest.mark.parametrize("arg", ["span_id", "trace_id", "parent_id"])
 def test_span_preconditions(arg):
     Span("test", **{arg: None})
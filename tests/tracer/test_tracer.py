@@ -874,6 +874,38 @@ def test_tracer_with_env():
             assert span.get_tag(ENV_KEY) == "config.env"
 
 
+def test_tracer_shared_tags():
+    t = ddtrace.Tracer()
+    t.set_tags({"team": "apm", "answer": 42})
+
+    def _trace():
+        with t.trace("root", service="mysvc") as root:
+            with t.trace("child") as child:
+                child.set_tag(ENV_KEY, "staging")
+        return root, child
+
+    with override_global_config(dict(env="prod", version="1.2.3", service="mysvc")):
+        expected = _trace()
+        with override_global_config(dict(_trace_shared_tags_enabled=True)):
+            root, child = _trace()
+            other_root, _ = _trace()
+
+    # The spans have the same tags as when the tags are not shared
+    for span, expected_span in zip((root, child), expected):
+        assert span.get_tags() == expected_span.get_tags()
+        assert span.get_metrics() == expected_span.get_metrics()
+    assert root.get_tag("runtime-id")
+    assert child.get_tag("runtime-id") is None
+    assert root.get_tag(ENV_KEY) == "prod"
+    assert child.get_tag(ENV_KEY) == "staging"
+    assert root.get_metric("answer") == 42
+
+    # The tags are stored once for all the spans
+    assert ENV_KEY not in root._meta and "team" not in root._meta
+    assert root._shared_meta is other_root._shared_meta
+    assert child._shared_meta is not root._shared_meta
+
+
 class EnvTracerTestCase(TracerTestCase):
     """Tracer test cases requiring environment variables."""
 
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from functools import partial
 import sys
+import threading
 from time import sleep
 import unittest
 
@@ -12,6 +13,7 @@ from ddtrace.internal.utils import ArgumentError
 from ddtrace.internal.utils import get_argument_value
 from ddtrace.internal.utils import set_argument_value
 from ddtrace.internal.utils import time
+from ddtrace.internal.utils.cache import LFUCache
 from ddtrace.internal.utils.cache import cached
 from ddtrace.internal.utils.cache import cachedmethod
 from ddtrace.internal.utils.cache import callonce
@@ -326,6 +328,43 @@ def test_cachedmethod():
     cached_test_recipe(expensive, Foo().cheap, witness, cache_size)
 
 
+def test_lfu_cache_stats():
+    cache = LFUCache(4)
+    f = mock.Mock(side_effect=lambda key: key * 2)
+
+    for key in (1, 2, 1, 3, 4, 1, 2):
+        assert cache.get(key, f) == key * 2
+    assert (cache.hits, cache.misses, cache.evictions) == (3, 4, 0)
+
+    # The cache is full: shrink it to half its size, keeping the most used entries
+    assert cache.get(5, f) == 10
+    assert (cache.hits, cache.misses, cache.evictions) == (3, 5, 2)
+    assert len(cache) == 3
+    assert 1 in cache and 2 in cache and 5 in cache
+
+    cache.clear()
+    assert len(cache) == 0
+    assert 1 not in cache
+
+
+def test_lfu_cache_threads():
+    cache = LFUCache(64)
+
+    def target():
+        for i in range(10000):
+            key = i % 100
+            assert cache.get(key, lambda k: -k) == -key
+
+    threads = [threading.Thread(target=target) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(cache) <= 64
+    assert cache.misses - cache.evictions == len(cache)
+
+
 i = 0
 
 
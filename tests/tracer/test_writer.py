@@ -26,6 +26,8 @@ from ddtrace.internal.writer import AgentWriter
 from ddtrace.internal.writer import LogWriter
 from ddtrace.internal.writer import Response
 from ddtrace.internal.writer import _human_size
+from ddtrace.internal.writer.writer_pool import PayloadSender
+from ddtrace.internal.writer.writer_spool import PayloadSpool
 from ddtrace.span import Span
 from tests.utils import AnyInt
 from tests.utils import BaseTestCase
@@ -259,6 +261,9 @@ class AgentWriterTests(BaseTestCase):
         statsd = mock.Mock()
         writer_encoder = mock.Mock()
         writer_encoder.__len__ = (lambda *args: n_traces).__get__(writer_encoder)
+        # Stay below the flush high-water mark
+        writer_encoder.size = 0
+        writer_encoder.max_size = 1 << 20
         writer_metrics_reset = mock.Mock()
         writer_encoder.encode.side_effect = Exception
         with override_global_config(dict(health_metrics_enabled=False)):
@@ -828,3 +833,359 @@ def test_trace_with_128bit_trace_ids():
     chunk_root = spans[0]
     assert chunk_root.trace_id >= 2 ** 64
     assert chunk_root._meta[HIGHER_ORDER_TRACE_ID_BITS] == "{:016x}".format(parent.trace_id >> 64)
+
+
+@pytest.mark.parametrize("api_version", ["v0.4", "v0.5"])
+def test_writer_encoder_buffers(api_version):
+    from ddtrace.internal.encoding import MultiBufferedEncoder
+
+    with override_global_config({"_trace_writer_encoder_buffers": 1}):
+        writer = AgentWriter("http://localhost:9126", api_version=api_version)
+        assert isinstance(writer._encoder, MSGPACK_ENCODERS[api_version])
+
+    with override_global_config({"_trace_writer_encoder_buffers": 2}):
+        writer = AgentWriter("http://localhost:9126", api_version=api_version)
+        assert isinstance(writer._encoder, MultiBufferedEncoder)
+        assert writer._encoder.buffers == 2
+
+        writer.write([Span(name="foo")])
+        assert len(writer._encoder) == 1
+        with mock.patch.object(writer, "_send_payload_with_backoff") as send:
+            writer.flush_queue()
+        send.assert_called_once()
+        assert len(writer._encoder) == 0
+
+        # Every buffer of the ring is flushed on shutdown
+        with mock.patch.object(writer, "_flush_queue_with_client") as flush_queue_with_client:
+            writer.stop()
+            writer.join()
+        assert flush_queue_with_client.call_count == 2
+
+
+class _SlowAPIEndpointRequestHandlerTest(_BaseHTTPRequestHandler):
+
+    latency = 0.2
+
+    def do_PUT(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(self.latency)
+        self.send_error(200, "OK")
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+_SLOW_PORT = _RESET_PORT + 1
+
+
+@pytest.fixture(scope="module")
+def endpoint_test_slow_server():
+    server = _ThreadingHTTPServer((_HOST, _SLOW_PORT), _SlowAPIEndpointRequestHandlerTest)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        yield thread
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def test_writer_connection_pool(endpoint_test_slow_server):
+    writer = AgentWriter("http://%s:%s" % (_HOST, _SLOW_PORT), connection_pool_size=4, reuse_connections=True)
+    assert writer._sender is not None
+    assert writer.recreate()._connection_pool_size == 4
+
+    with mock.patch.object(writer, "_put", wraps=writer._put) as put:
+        for _ in range(4):
+            writer.write([Span(name="foo")])
+            writer.flush_queue()
+        writer.stop()
+        writer.join()
+
+    assert put.call_count == 4
+    assert all(call.args[0] for call in put.call_args_list)
+
+
+def test_writer_connection_pool_sync_mode():
+    writer = AgentWriter("http://localhost:9126", connection_pool_size=4, sync_mode=True)
+    assert writer._sender is None
+    assert writer._conn_pool is None
+
+
+def test_payload_sender():
+    sending = threading.Event()
+    release = threading.Event()
+    sent = []
+
+    def send(payload):
+        sending.set()
+        release.wait()
+        sent.append(payload)
+
+    sender = PayloadSender(1, send)
+    assert sender.submit(1)
+    sending.wait()
+    # The only worker is busy, the next payload waits in the queue
+    assert sender.submit(2)
+    # The queue is full: the payload is rejected without blocking
+    assert not sender.submit(3)
+
+    release.set()
+    sender.stop()
+    assert sent == [1, 2]
+
+
+def test_writer_connection_pool_busy():
+    writer = AgentWriter("http://localhost:9126", connection_pool_size=2)
+    writer._sender = mock.Mock()
+    writer._sender.submit.return_value = False
+
+    writer._encoder.put([Span(name="foo")])
+    with mock.patch.object(writer, "_metrics_reset"), mock.patch.object(writer, "_send_encoded") as send_encoded:
+        writer.flush_queue()
+
+    # The payload is sent from the flush thread instead of being dropped
+    assert send_encoded.call_count == 1
+    assert send_encoded.call_args.args[1] == 1
+    assert writer._metrics["writer.pool.busy"][tuple()] == 1
+
+
+@pytest.mark.parametrize("flush_high_water_mark", [0, 0.7])
+def test_writer_flush_high_water_mark(flush_high_water_mark):
+    trace = [Span(name="foo", service="bar", resource="baz") for _ in range(10)]
+    writer = AgentWriter(
+        "http://localhost:9126",
+        processing_interval=60,
+        buffer_size=16 << 10,
+        max_payload_size=16 << 10,
+        flush_high_water_mark=flush_high_water_mark,
+    )
+    assert writer.recreate()._flush_high_water_mark == flush_high_water_mark
+
+    with mock.patch.object(writer, "_send_payload_with_backoff"), mock.patch.object(
+        writer, "_metrics_dist", wraps=writer._metrics_dist
+    ) as metrics_dist:
+        for _ in range(500):
+            writer.write(trace)
+            time.sleep(0.001)
+        writer.stop()
+        writer.join()
+
+    calls = metrics_dist.call_args_list
+    early_flushes = [
+        call for call in calls if call.args[0] == "writer.flushes" and call.kwargs["tags"] == ("trigger:early",)
+    ]
+    dropped = [call for call in calls if call.args[0] == "buffer.dropped.traces"]
+    if flush_high_water_mark:
+        assert early_flushes
+        assert not dropped
+    else:
+        assert not early_flushes
+        assert dropped
+
+
+@pytest.mark.parametrize("api_version", ["v0.4", "v0.5"])
+def test_writer_compression(api_version):
+    import zlib
+
+    with override_global_config({"_trace_writer_compression": "gzip"}):
+        writer = AgentWriter("http://localhost:9126", api_version=api_version)
+    client = writer._clients[0]
+    assert client.compression == "gzip"
+    assert writer._get_finalized_headers(1, client)["Content-Encoding"] == "gzip"
+
+    writer._encoder.put([Span(name="foo", service="bar") for _ in range(100)])
+    size = writer._encoder.size
+
+    with mock.patch.object(writer, "_send_payload_with_backoff") as send:
+        writer.flush_queue()
+    payload = send.call_args.args[0]
+    assert len(payload) < size
+    decoded = writer._encoder._decode(zlib.decompress(payload, 16 + zlib.MAX_WBITS))
+    traces = decoded if api_version == "v0.4" else decoded[1]
+    assert len(traces) == 1
+    assert len(traces[0]) == 100
+
+
+def test_writer_no_compression():
+    writer = AgentWriter("http://localhost:9126")
+    client = writer._clients[0]
+    assert client.compression is None
+    assert "Content-Encoding" not in writer._get_finalized_headers(1, client)
+    assert client.compress(b"payload") == b"payload"
+
+
+def test_writer_unsupported_compression():
+    with override_global_config({"_trace_writer_compression": "foo"}):
+        with pytest.raises(ValueError):
+            AgentWriter("http://localhost:9126")
+
+
+def test_payload_spool_replay(tmpdir):
+    spool = PayloadSpool(str(tmpdir), max_size=1 << 20, max_age=60, segment_size=1 << 10)
+    try:
+        for i in range(10):
+            assert spool.append("v0.4/traces", b"payload-%d" % i * 20, i + 1) == 0
+        assert len(spool) == 10
+        assert spool.traces == 55
+        assert spool.size > 1 << 10
+
+        sent = []
+        assert spool.replay(lambda endpoint, payload, count: sent.append((endpoint, payload, count)) or True) == (
+            55,
+            0,
+            0,
+        )
+        assert sent == [("v0.4/traces", b"payload-%d" % i * 20, i + 1) for i in range(10)]
+        assert len(spool) == 0
+        assert spool.traces == 0
+    finally:
+        spool.close()
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_payload_spool_replay_error(tmpdir):
+    spool = PayloadSpool(str(tmpdir), max_size=1 << 20, max_age=60)
+    try:
+        spool.append("v0.4/traces", b"first", 1)
+        spool.append("v0.4/traces", b"second", 2)
+
+        def send(endpoint, payload, count):
+            if payload == b"second":
+                raise IOError("agent unavailable")
+            return True
+
+        with pytest.raises(IOError):
+            spool.replay(send)
+        # The payload that failed is kept in the spool
+        assert len(spool) == 1
+        assert spool.traces == 2
+        assert spool.replay(lambda endpoint, payload, count: False) == (0, 2, 0)
+        assert len(spool) == 0
+    finally:
+        spool.close()
+
+
+def test_payload_spool_eviction(tmpdir):
+    spool = PayloadSpool(str(tmpdir), max_size=4 << 10, max_age=60, segment_size=1 << 10)
+    try:
+        evicted = sum(spool.append("v0.4/traces", b"x" * 500, 1) for _ in range(20))
+        assert spool.size <= 4 << 10
+        assert evicted + spool.traces == 20
+        assert evicted > 0
+
+        with pytest.raises(ValueError):
+            spool.append("v0.4/traces", b"x" * (4 << 10), 1)
+    finally:
+        spool.close()
+
+
+def test_payload_spool_expiry(tmpdir):
+    spool = PayloadSpool(str(tmpdir), max_size=1 << 20, max_age=60)
+    try:
+        with mock.patch("ddtrace.internal.writer.writer_spool.time.time", return_value=1000.0):
+            spool.append("v0.4/traces", b"old", 3)
+        spool.append("v0.4/traces", b"new", 1)
+        sent = []
+        assert spool.replay(lambda endpoint, payload, count: sent.append(payload) or True) == (1, 0, 3)
+        assert sent == [b"new"]
+    finally:
+        spool.close()
+
+
+def test_payload_spool_after_fork(tmpdir):
+    spool = PayloadSpool(str(tmpdir), max_size=1 << 20, max_age=60)
+    try:
+        spool.append("v0.4/traces", b"payload", 1)
+        segments = os.listdir(str(tmpdir))
+        spool._after_fork()
+        # The child starts from an empty spool and leaves the parent's files alone
+        assert len(spool) == 0
+        assert os.listdir(str(tmpdir)) == segments
+    finally:
+        spool.close()
+
+
+@pytest.mark.parametrize("api_version", ["v0.4", "v0.5"])
+def test_writer_spool(tmpdir, api_version):
+    with override_global_config(dict(_trace_writer_spool_dir=str(tmpdir), health_metrics_enabled=True)):
+        writer = AgentWriter("http://asdf:1234", api_version=api_version)
+        statsd = writer.dogstatsd = mock.Mock()
+        try:
+            writer.write([Span(name="name", trace_id=1, span_id=1, parent_id=None)])
+            writer.flush_queue()
+            assert writer._spool.traces == 1
+            statsd.distribution.assert_any_call(
+                "datadog.%s.spool.accepted.traces" % writer.STATSD_NAMESPACE, 1, tags=[]
+            )
+
+            # The spooled payloads stay spooled while the intake is not accepting
+            # them, without holding back the new ones
+            statsd.reset_mock()
+            writer.write([Span(name="name", trace_id=2, span_id=1, parent_id=None)])
+            with mock.patch.object(writer, "_put", return_value=Response(status=503)) as put:
+                writer.flush_queue()
+            assert put.call_count == 2
+            assert writer._spool.traces == 1
+            calls = [call.args[0] for call in statsd.distribution.call_args_list]
+            assert "datadog.%s.spool.replayed.traces" % writer.STATSD_NAMESPACE not in calls
+            statsd.distribution.assert_any_call("datadog.%s.http.requests" % writer.STATSD_NAMESPACE, 2, tags=[])
+
+            statsd.reset_mock()
+            writer.write([Span(name="name", trace_id=3, span_id=1, parent_id=None)])
+            with mock.patch.object(writer, "_put", return_value=Response(status=200)) as put:
+                writer.flush_queue()
+            assert put.call_count == 2
+            assert len(writer._spool) == 0
+            statsd.distribution.assert_any_call(
+                "datadog.%s.spool.replayed.traces" % writer.STATSD_NAMESPACE, 1, tags=[]
+            )
+        finally:
+            writer.on_shutdown()
+        assert os.listdir(str(tmpdir)) == []
+
+
+@pytest.mark.parametrize("status", [400, 413])
+def test_writer_spool_rejected(tmpdir, status):
+    with override_global_config(dict(_trace_writer_spool_dir=str(tmpdir), health_metrics_enabled=True)):
+        writer = AgentWriter("http://asdf:1234", api_version="v0.4")
+        statsd = writer.dogstatsd = mock.Mock()
+        try:
+            for trace_id in (1, 2):
+                writer.write([Span(name="name", trace_id=trace_id, span_id=1, parent_id=None)])
+                writer.flush_queue()
+            assert writer._spool.traces == 2
+
+            # The intake will never accept the payloads: they are discarded
+            statsd.reset_mock()
+            with mock.patch.object(writer, "_put", return_value=Response(status=status)) as put:
+                writer.flush_queue()
+            assert put.call_count == 2
+            assert len(writer._spool) == 0
+            statsd.distribution.assert_any_call(
+                "datadog.%s.spool.dropped.traces" % writer.STATSD_NAMESPACE, 2, tags=["reason:rejected"]
+            )
+        finally:
+            writer.on_shutdown()
+
+
+def test_writer_spool_downgrade(tmpdir):
+    with override_global_config(dict(_trace_writer_spool_dir=str(tmpdir))):
+        writer = AgentWriter("http://asdf:1234", api_version="v0.5")
+    try:
+        for trace_id in (1, 2):
+            writer.write([Span(name="name", trace_id=trace_id, span_id=1, parent_id=None)])
+            writer.flush_queue()
+        assert writer._spool.traces == 2
+
+        # A 404 on replay downgrades the API, and the payloads encoded for the
+        # previous one are discarded
+        with mock.patch.object(writer, "_put", return_value=Response(status=404)) as put:
+            writer.flush_queue()
+        assert put.call_count == 1
+        assert len(writer._spool) == 0
+        assert writer._clients[0].ENDPOINT == "v0.4/traces"
+    finally:
+        writer.on_shutdown()
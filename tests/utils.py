@@ -139,6 +139,17 @@ def override_global_config(values):
         "_trace_writer_interval_seconds",
         "_trace_writer_connection_reuse",
         "_trace_writer_log_err_payload",
+        "_trace_writer_encoder_buffers",
+        "_trace_writer_connection_pool_size",
+        "_trace_writer_flush_high_water_mark",
+        "_trace_writer_compression",
+        "_trace_writer_spool_dir",
+        "_trace_writer_spool_max_size",
+        "_trace_writer_spool_max_age_seconds",
+        "_span_aggregator_shards",
+        "_trace_async_processing_enabled",
+        "_trace_async_processing_queue_size",
+        "_trace_shared_tags_enabled",
     ]
 
     # Grab the current values of all keys